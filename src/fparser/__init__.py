@@ -67,9 +67,30 @@
 
 import logging
 import codecs
-from importlib.metadata import version
 
-__version__ = version("fparser")
+
+def __getattr__(name):
+    """
+    Looks up the version of fparser (using `importlib.metadata`) when
+    `__version__` is first accessed, as importing `importlib.metadata` is
+    a large part of the time taken to import fparser.
+
+    :param str name: the name of the attribute.
+
+    :returns: the version of fparser.
+    :rtype: str
+
+    :raises AttributeError: if the attribute is not `__version__`.
+
+    """
+    if name == "__version__":
+        # pylint: disable=import-outside-toplevel
+        from importlib.metadata import version
+
+        globals()["__version__"] = version("fparser")
+        return globals()["__version__"]
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
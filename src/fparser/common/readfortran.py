@@ -137,11 +137,15 @@ To read a Fortran code from a string, use `FortranStringReader` class::
 """
 
 import logging
+import mmap
 import os
 import re
 import sys
+import threading
 import traceback
+from array import array
 from collections import deque
+from collections.abc import Sequence
 from typing import Optional, Tuple
 from io import StringIO
 
@@ -152,7 +156,10 @@ __all__ = [
     "FortranFileReader",
     "FortranStringReader",
     "FortranReaderError",
+    "INCLUDE_CACHE",
+    "IncludeCache",
     "Line",
+    "ParseCacheStats",
     "SyntaxErrorLine",
     "Comment",
     "MultiLine",
@@ -265,6 +272,42 @@ class FortranReaderError(Exception):
     pass
 
 
+class ParseCacheStats:
+    """
+    Counts how the caches of matches held by the lines from a reader
+    (see :py:meth:`Line.parse_line`) are used. An included file is read
+    with its own reader but shares the statistics of the reader that
+    includes it.
+
+    Attributes::
+
+        hits : int
+          number of matches that were found in a cache
+        misses : int
+          number of matches that had to be performed (and were cached)
+        released : int
+          number of cached entries that have been discarded
+
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+
+    def reset(self):
+        """Sets all of the counts back to zero."""
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+
+    def __repr__(self):
+        return (
+            f"ParseCacheStats(hits={self.hits}, misses={self.misses}, "
+            f"released={self.released})"
+        )
+
+
 class Line:
     """Holds a Fortran source line.
 
@@ -399,22 +442,40 @@ class Line:
 
     def parse_line(self, cls, parent_cls):
         if cls not in self.parse_cache:
+            self.reader.parse_cache_stats.misses += 1
             self.parse_cache[cls] = None
             obj = cls(self.line, parent_cls=parent_cls)
             self.parse_cache[cls] = obj
         else:
+            self.reader.parse_cache_stats.hits += 1
             obj = self.parse_cache[cls]
         return obj
 
     def parse_block(self, reader, cls, parent_cls):
         key = cls, tuple(parent_cls)
         if key not in self.parse_cache:
+            self.reader.parse_cache_stats.misses += 1
             obj = cls(reader, parent_cls=parent_cls)
             self.parse_cache[key] = obj
         else:
+            self.reader.parse_cache_stats.hits += 1
             obj = self.parse_cache[key]
         return obj
 
+    def release_parse_cache(self):
+        """
+        Discards the outcomes of the matches cached by `parse_line` and
+        `parse_block`. This is done once the statement in this line has
+        been accepted into the parse tree, as the cached outcomes (which
+        include the nodes of any matches that were not used) would
+        otherwise be kept for as long as the tree is. Should the line be
+        parsed again, the matches are simply performed again.
+
+        """
+        if self.parse_cache:
+            self.reader.parse_cache_stats.released += len(self.parse_cache)
+            self.parse_cache = {}
+
 
 class SyntaxErrorLine(Line, FortranReaderError):
     """
@@ -567,6 +628,12 @@ class FortranReaderBase:
         specialised Directive nodes. Default is False (in which case
         directives are left as comments). This option overrides the
         ignore_comments input.
+    :param max_source_lines: the maximum number of source lines (the
+        most recently read ones) to keep in `source_lines` for use in
+        messages. Default is None, in which case all of the lines are kept.
+
+    :raises ValueError: if max_source_lines is not None or a positive
+        integer.
 
     The Fortran source is iterated by `get_single_line`,
     `get_next_line`, `put_single_line` methods.
@@ -580,7 +647,15 @@ class FortranReaderBase:
         ignore_comments: bool,
         include_omp_conditional_lines: bool = False,
         process_directives: bool = False,
+        max_source_lines: Optional[int] = None,
     ):
+        if max_source_lines is not None and (
+            not isinstance(max_source_lines, int) or max_source_lines < 1
+        ):
+            raise ValueError(
+                f"The maximum number of source lines to keep must be None or a "
+                f"positive integer but got '{max_source_lines}'"
+            )
         self.source = source
         self._include_omp_conditional_lines = include_omp_conditional_lines
         self.set_format(mode)
@@ -596,7 +671,13 @@ class FortranReaderBase:
 
         self.filo_line = []  # used for un-consuming lines.
         self.fifo_item = deque()
-        self.source_lines = []  # source lines cache
+        self._max_source_lines = max_source_lines
+        if max_source_lines is None:
+            self.source_lines = []  # source lines cache
+        else:
+            self.source_lines = _RecentSourceLines(max_source_lines)
+        # Whether all of the lines read so far are blank or comments.
+        self._only_comments = True
 
         self.f2py_comment_lines = []  # line numbers of f2py directives
 
@@ -607,6 +688,8 @@ class FortranReaderBase:
 
         self.exit_on_error = True
         self.restore_cache = []
+        # How the caches of matches held by the lines read are used.
+        self.parse_cache_stats = ParseCacheStats()
 
     ##########################################################################
 
@@ -622,18 +705,18 @@ class FortranReaderBase:
         """
         Scans registered dependees for a named module.
         """
-        from .utils import get_module_file, module_in_file
+        from .utils import _named_module_file, get_module_index, module_in_file
 
         if self.source_only:
             for sf in self.source_only:
                 if module_in_file(mod_name, sf):
                     return sf
         else:
-            fn = None
             for d in self.include_dirs:
-                fn = get_module_file(mod_name, d)
+                fn = _named_module_file(mod_name, d)
                 if fn is not None:
                     return fn
+            return get_module_index(self.include_dirs).lookup(mod_name)
 
     def set_format(self, mode):
         """
@@ -691,6 +774,15 @@ class FortranReaderBase:
         """
         return self._format
 
+    @property
+    def only_comments(self):
+        """
+        :returns: whether all of the lines that have been read from the \
+            source so far (if any) are blank or are comments.
+        :rtype: bool
+        """
+        return self._only_comments
+
     @property
     def name(self):
         """
@@ -755,18 +847,10 @@ class FortranReaderBase:
             self.close_source()
             return None
         self.linecount += 1
-
-        # expand tabs, replace special symbols, get rid of nl characters
-        line = line.expandtabs().replace("\xa0", " ").rstrip()
-        if self._include_omp_conditional_lines and self._format.is_fixed:
-            # Fixed-format line sentinels can be handled here, since a
-            # continuation line does not depend on the previous line. The
-            # regular expression checks for both an initial or a continuation
-            # line, and if it is found, the sentinel is replaced with two
-            # spaces:
-            line, _ = self.replace_omp_sentinels(line, self._re_omp_sentinel)
-
+        line = self._prepare_line(line)
         self.source_lines.append(line)
+        if self._only_comments and line.strip() and not self.is_comment_line(line):
+            self._only_comments = False
 
         if ignore_comments and (self._format.is_fixed or self._format.is_f77):
             # Check for a fixed-format comment. If the current line *is*
@@ -784,6 +868,29 @@ class FortranReaderBase:
 
         return line
 
+    def _prepare_line(self, line):
+        """
+        Prepares a line read from the source for processing: tabs are
+        expanded, special symbols replaced and trailing white space
+        (including the new line characters) removed.
+
+        :param str line: the line read from the source.
+
+        :returns: the prepared line.
+        :rtype: str
+
+        """
+        # expand tabs, replace special symbols, get rid of nl characters
+        line = line.expandtabs().replace("\xa0", " ").rstrip()
+        if self._include_omp_conditional_lines and self._format.is_fixed:
+            # Fixed-format line sentinels can be handled here, since a
+            # continuation line does not depend on the previous line. The
+            # regular expression checks for both an initial or a continuation
+            # line, and if it is found, the sentinel is replaced with two
+            # spaces:
+            line, _ = self.replace_omp_sentinels(line, self._re_omp_sentinel)
+        return line
+
     def get_next_line(self, ignore_empty=False, ignore_comments=None):
         """Return next non-empty line from FILO line buffer or from source.
 
@@ -873,12 +980,9 @@ class FortranReaderBase:
                 reader = item.reader
                 filename = item.line.strip()[7:].lstrip()[1:-1]
                 include_dirs = self.include_dirs[:]
-                path = filename
-                for incl_dir in include_dirs:
-                    path = os.path.join(incl_dir, filename)
-                    if os.path.exists(path):
-                        break
-                if not os.path.isfile(path):
+                path = INCLUDE_CACHE.resolve(filename, include_dirs)
+                source = None if path is None else INCLUDE_CACHE.source(path)
+                if source is None:
                     # The include file does not exist in the specified
                     # locations.
                     #
@@ -890,9 +994,14 @@ class FortranReaderBase:
                     #
                     return item
                 reader.info("including file %r" % (path), item)
-                self.reader = FortranFileReader(
-                    path, include_dirs=include_dirs, ignore_comments=ignore_comments
+                self.reader = _IncludeFileReader(
+                    path,
+                    source,
+                    include_dirs=include_dirs,
+                    ignore_comments=ignore_comments,
+                    max_source_lines=self._max_source_lines,
                 )
+                self.reader.parse_cache_stats = self.parse_cache_stats
                 result = self.reader.next(ignore_comments=ignore_comments)
                 return result
             return item
@@ -1688,6 +1797,154 @@ class FortranReaderBase:
         return not new_line.strip() and had_comment
 
 
+# Returned by `_RecentSourceLines` for a line that is no longer kept.
+_NOT_RETAINED = "<source line no longer available>"
+
+
+class _RecentSourceLines(Sequence):
+    """
+    The `source_lines` of a reader that only keeps the most recently read
+    lines. The lines are still indexed by their line number (minus one) and
+    the length is the number of lines that have been read. Any line that is
+    no longer kept is represented by a placeholder.
+
+    :param int maxlen: the maximum number of lines to keep.
+
+    """
+
+    def __init__(self, maxlen):
+        self._lines = deque(maxlen=maxlen)
+        self._count = 0
+
+    def append(self, line):
+        """
+        Adds the next line that has been read, discarding the oldest line
+        that is kept if necessary.
+
+        :param str line: the line.
+
+        """
+        self._lines.append(line)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("source line index out of range")
+        first = self._count - len(self._lines)
+        if index < first:
+            return _NOT_RETAINED
+        return self._lines[index - first]
+
+
+class _MappedSource:
+    """
+    The lines of a memory-mapped file. The offset of the start of each
+    line is computed once (using the same line endings as a file opened
+    in text mode) and lines are then only decoded when they are required.
+    The mapping is released when this object is garbage collected.
+
+    :param str filename: the name of the file.
+
+    """
+
+    _NEWLINE = re.compile(rb"\r\n|\r|\n")
+    # Most files only use '\n', which can be found more quickly.
+    _LINE_FEED = re.compile(rb"\n")
+
+    def __init__(self, filename):
+        with open(filename, "rb") as handle:
+            try:
+                self._buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped.
+                self._buffer = b""
+        self._offsets = array("q", [0])
+        newline = self._NEWLINE if b"\r" in self._buffer else self._LINE_FEED
+        self._offsets.extend(match.end() for match in newline.finditer(self._buffer))
+        if self._offsets[-1] != len(self._buffer):
+            # The last line has no new line character(s).
+            self._offsets.append(len(self._buffer))
+        self._next_index = 0
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def line(self, index, errors="fparser-logging"):
+        """
+        :param int index: the (0-based) index of the line.
+        :param str errors: the handler for decoding errors.
+
+        :returns: the specified line, including its new line character(s).
+        :rtype: str
+
+        """
+        start = self._offsets[index]
+        end = self._offsets[index + 1]
+        return self._buffer[start:end].decode("UTF-8", errors=errors)
+
+    def lines(self):
+        """
+        :returns: a generator of the lines of the file. Invalid characters \
+            are silently skipped.
+        :rtype: Iterator[str]
+
+        """
+        return (self.line(index, "ignore") for index in range(len(self)))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next_index >= len(self):
+            raise StopIteration
+        self._next_index += 1
+        return self.line(self._next_index - 1)
+
+
+class _MappedSourceLines(Sequence):
+    """
+    The `source_lines` of a reader of a memory-mapped file. Rather than
+    holding a copy of each line that has been read, the lines are decoded
+    and prepared again from the mapped file when they are required (e.g.
+    for an error message).
+
+    :param reader: the reader.
+    :type reader: :py:class:`fparser.common.readfortran.FortranFileReader`
+    :param source: the lines of the file.
+    :type source: :py:class:`fparser.common.readfortran._MappedSource`
+
+    """
+
+    def __init__(self, reader, source):
+        self._reader = reader
+        self._source = source
+        self._count = 0
+
+    def append(self, _):
+        """Records that another line has been read from the file."""
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("source line index out of range")
+        # pylint: disable=protected-access
+        return self._reader._prepare_line(self._source.line(index, "ignore"))
+
+
 class FortranFileReader(FortranReaderBase):
     """
     Constructs a FortranFileReader object from a file.
@@ -1710,6 +1967,19 @@ class FortranFileReader(FortranReaderBase):
         specialised Directive nodes. Default is False (in which case
         directives are left as comments). This option overrides the
         ignore_comments input.
+    :param use_mmap: whether or not to memory-map the file rather than
+        reading it as a stream. Lines are then only decoded when they are
+        read (the format of the file is determined from as few lines as
+        possible) and the lines that have been read are not copied into
+        `source_lines`. This reduces the memory used for large files.
+        Default is False. A filename must be supplied if this is True.
+    :param max_source_lines: the maximum number of source lines (the
+        most recently read ones) to keep for use in messages. Default is
+        None, in which case all of the lines are kept. This has no effect
+        if use_mmap is True since no lines are then kept.
+
+    :raises ValueError: if use_mmap is True and file_candidate is not a
+        filename.
 
     For example::
 
@@ -1728,13 +1998,30 @@ class FortranFileReader(FortranReaderBase):
         ignore_encoding=True,
         include_omp_conditional_lines=False,
         process_directives: bool = False,
+        use_mmap: bool = False,
+        max_source_lines: Optional[int] = None,
     ):
         # The filename is used as a unique ID. This is then used to cache the
         # contents of the file. Obviously if the file changes content but not
         # filename, problems will ensue.
         #
         self._close_on_destruction = False
-        if isinstance(file_candidate, str):
+        mode = None
+        if use_mmap:
+            if not isinstance(file_candidate, str):
+                raise ValueError(
+                    "FortranFileReader can only memory-map a file that is "
+                    "specified by its name."
+                )
+            self.id = file_candidate
+            self.file = _MappedSource(file_candidate)
+            if os.path.splitext(file_candidate)[1] == ".pyf":
+                mode = fparser.common.sourceinfo.FortranFormat(True, True)
+            else:
+                mode = fparser.common.sourceinfo.get_source_info_lines(
+                    self.file.lines(), ignore_encoding
+                )
+        elif isinstance(file_candidate, str):
             self.id = file_candidate
             # The 'fparser-logging' handler for errors ensures that any invalid
             # characters in the input are skipped but logged.
@@ -1751,9 +2038,10 @@ class FortranFileReader(FortranReaderBase):
             message = "FortranFileReader is used with a filename"
             message += " or file-like object."
             raise ValueError(message)
-        mode = fparser.common.sourceinfo.get_source_info(
-            file_candidate, ignore_encoding
-        )
+        if mode is None:
+            mode = fparser.common.sourceinfo.get_source_info(
+                file_candidate, ignore_encoding
+            )
 
         super().__init__(
             self.file,
@@ -1761,6 +2049,7 @@ class FortranFileReader(FortranReaderBase):
             ignore_comments,
             include_omp_conditional_lines=include_omp_conditional_lines,
             process_directives=process_directives,
+            max_source_lines=max_source_lines,
         )
 
         if include_dirs is None:
@@ -1769,13 +2058,221 @@ class FortranFileReader(FortranReaderBase):
             self.include_dirs = include_dirs[:]
         if source_only is not None:
             self.source_only = source_only[:]
+        if use_mmap:
+            self.source_lines = _MappedSourceLines(self, self.file)
 
     def __del__(self):
         if self._close_on_destruction:
             self.file.close()
 
+    def __getstate__(self):
+        """Excludes the file object (which cannot be pickled) from the state
+        of the reader when it is pickled, e.g. as part of a parse tree. An
+        unpickled reader cannot therefore read any further source.
+
+        :returns: the state of this reader.
+        :rtype: dict
+
+        """
+        state = self.__dict__.copy()
+        state["file"] = None
+        state["source"] = None
+        state["_close_on_destruction"] = False
+        if isinstance(self.source_lines, _MappedSourceLines):
+            state["source_lines"] = list(self.source_lines)
+        return state
+
     def close_source(self):
-        self.file.close()
+        # A memory-mapped file is kept until the reader is destroyed as its
+        # lines are still required by `source_lines`.
+        if not isinstance(self.file, _MappedSource):
+            self.file.close()
+
+
+class IncludeCache:
+    """
+    A process-wide cache of the files named in INCLUDE lines, so that a
+    file included by many sources is only searched for, read and has its
+    format determined once.
+
+    The path found for a file name in a list of include directories is
+    cached. It is checked (by the lookup of its source) that the file
+    still exists but not whether a file of the same name has since been
+    added to an earlier directory. A file name that was not found is
+    looked for again if the modification time of any of the directories
+    has changed. The lines and format of a file are cached until its
+    modification time or size changes. `clear` empties the cache. The
+    cache may be used by several threads at once.
+
+    Attributes::
+
+        hits : int
+          number of sources that were found in the cache
+        misses : int
+          number of sources that had to be read
+
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._paths = {}
+        self._sources = {}
+        # Guards the counts and dictionaries above.
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Discards all of the cached paths and sources."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._paths.clear()
+            self._sources.clear()
+
+    def resolve(self, filename, include_dirs):
+        """
+        :param str filename: the name of a file from an INCLUDE line.
+        :param include_dirs: the directories in which to look for the file.
+        :type include_dirs: List[str]
+
+        :returns: the path of the file in the first of the directories \
+            that contains it or None if it is not found.
+        :rtype: Optional[str]
+
+        """
+        key = (os.getcwd(), tuple(include_dirs), filename)
+        with self._lock:
+            entry = self._paths.get(key)
+        if entry is not None:
+            path, mtimes = entry
+            if path is not None:
+                return path
+            if mtimes == self._directory_mtimes(include_dirs):
+                return None
+        path = filename
+        for incl_dir in include_dirs:
+            path = os.path.join(incl_dir, filename)
+            if os.path.exists(path):
+                break
+        if os.path.isfile(path):
+            entry = (path, None)
+        else:
+            path = None
+            entry = (None, self._directory_mtimes(include_dirs))
+        with self._lock:
+            self._paths[key] = entry
+        return path
+
+    @staticmethod
+    def _directory_mtimes(include_dirs):
+        """
+        :param include_dirs: a list of directories.
+        :type include_dirs: List[str]
+
+        :returns: the modification time of each directory (None if it \
+            does not exist).
+        :rtype: Tuple[Optional[int], ...]
+
+        """
+        mtimes = []
+        for incl_dir in include_dirs:
+            try:
+                mtimes.append(os.stat(incl_dir).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def source(self, path):
+        """
+        :param str path: the path of an included file.
+
+        :returns: the lines of the file and its format or None if it \
+            cannot be read (in which case any cached path to it is \
+            discarded).
+        :rtype: Optional[Tuple[Tuple[str, ...], \
+            :py:class:`fparser.common.sourceinfo.FortranFormat`]]
+
+        """
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._sources.pop(key, None)
+                self._forget(path)
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._sources.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # The file is read without holding the lock.
+        # The 'fparser-logging' handler for errors ensures that any invalid
+        # characters in the input are skipped but logged.
+        with open(path, "r", encoding="UTF-8", errors="fparser-logging") as file:
+            lines = tuple(file)
+        if os.path.splitext(path)[1] == ".pyf":
+            mode = fparser.common.sourceinfo.FortranFormat(True, True)
+        else:
+            mode = fparser.common.sourceinfo.get_source_info_str("".join(lines))
+        with self._lock:
+            self._sources[key] = (version, (lines, mode))
+        return lines, mode
+
+    def _forget(self, path):
+        """
+        Discards the cached resolutions of file names to the supplied path.
+        The lock must be held by the caller.
+
+        :param str path: the path of a file that no longer exists.
+
+        """
+        for key in [key for key, entry in self._paths.items() if entry[0] == path]:
+            del self._paths[key]
+
+
+#: The cache of included files shared by all readers.
+INCLUDE_CACHE = IncludeCache()
+
+
+class _IncludeFileReader(FortranFileReader):
+    """
+    Reads a file named in an INCLUDE line using the lines and format
+    held by the :py:class:`IncludeCache`.
+
+    :param str path: the path of the included file.
+    :param source: the lines and format of the file.
+    :type source: Tuple[Tuple[str, ...], \
+        :py:class:`fparser.common.sourceinfo.FortranFormat`]
+    :param include_dirs: directories in which to look for inclusions.
+    :type include_dirs: List[str]
+    :param bool ignore_comments: whether or not to discard comments.
+    :param max_source_lines: the maximum number of source lines to keep \
+        for use in messages.
+    :type max_source_lines: Optional[int]
+
+    """
+
+    def __init__(
+        self, path, source, include_dirs, ignore_comments, max_source_lines
+    ):  # pylint: disable=super-init-not-called
+        lines, mode = source
+        self._close_on_destruction = False
+        self.id = path
+        self.file = iter(lines)
+        FortranReaderBase.__init__(
+            self,
+            self.file,
+            mode,
+            ignore_comments,
+            max_source_lines=max_source_lines,
+        )
+        self.include_dirs = include_dirs[:]
+
+    def close_source(self):
+        pass
 
 
 class FortranStringReader(FortranReaderBase):
@@ -1800,6 +2297,9 @@ class FortranStringReader(FortranReaderBase):
         specialised Directive nodes. Default is False (in which case
         directives are left as comments). This option overrides the
         ignore_comments input.
+    :param max_source_lines: the maximum number of source lines (the
+        most recently read ones) to keep for use in messages. Default is
+        None, in which case all of the lines are kept.
 
     For example:
 
@@ -1823,6 +2323,7 @@ class FortranStringReader(FortranReaderBase):
         ignore_encoding=True,
         include_omp_conditional_lines=False,
         process_directives: bool = False,
+        max_source_lines: Optional[int] = None,
     ):
         # The Python ID of the string was used to uniquely identify it for
         # caching purposes. Unfortunately this ID is only unique for the
@@ -1844,6 +2345,7 @@ class FortranStringReader(FortranReaderBase):
             ignore_comments,
             include_omp_conditional_lines=include_omp_conditional_lines,
             process_directives=process_directives,
+            max_source_lines=max_source_lines,
         )
         if include_dirs is not None:
             self.include_dirs = include_dirs[:]
@@ -70,6 +70,7 @@ I'm not sure what that is.
 
 """
 
+import itertools
 import os
 import re
 
@@ -238,34 +239,55 @@ def get_source_info_str(source, ignore_encoding=True):
     :rtype: :py:class:`fparser.common.sourceinfo.FortranFormat`
 
     """
-    lines = source.splitlines()
-    if not lines:
+    return get_source_info_lines(source.splitlines(), ignore_encoding)
+
+
+def get_source_info_lines(lines, ignore_encoding=True):
+    """
+    Determines the format of Fortran source from its lines. Only as many
+    lines as are required to determine the format are taken from the
+    supplied iterable.
+
+    :param lines: the lines of Fortran source.
+    :type lines: Iterable[str]
+    :param bool ignore_encoding: whether or not to ignore any Python-style \
+                                 encoding information in the first line of the file.
+
+    :returns: a FortranFormat object.
+    :rtype: :py:class:`fparser.common.sourceinfo.FortranFormat`
+
+    """
+    lines = iter(lines)
+    firstline = next(lines, None)
+    if firstline is None:
         return FortranFormat(False, False)
 
     if not ignore_encoding:
         # We check to see whether the file contains a comment describing its
         # encoding. This has nothing to do with the Fortran standard (see e.g.
         # https://peps.python.org/pep-0263/) and hence is not done by default.
-        firstline = lines[0].lstrip()
-        if _HAS_F_HEADER(firstline):
+        header = firstline.lstrip()
+        if _HAS_F_HEADER(header):
             # -*- fortran -*- implies Fortran77 so fixed format.
             return FortranFormat(False, True)
-        if _HAS_FIX_HEADER(firstline):
+        if _HAS_FIX_HEADER(header):
             return FortranFormat(False, False)
-        if _HAS_FREE_HEADER(firstline):
+        if _HAS_FREE_HEADER(header):
             return FortranFormat(True, False)
-        if _HAS_PYF_HEADER(firstline):
+        if _HAS_PYF_HEADER(header):
             return FortranFormat(True, True)
 
     line_tally = 10000  # Check up to this number of non-comment lines
     is_free = False
-    while line_tally > 0 and lines:
-        line = lines.pop(0).rstrip()
+    for line in itertools.chain([firstline], lines):
+        line = line.rstrip()
         if line and line[0] != "!":
             line_tally -= 1
             if line[0] != "\t" and _FREE_FORMAT_START(line[:5]) or line[-1:] == "&":
                 is_free = True
                 break
+            if line_tally == 0:
+                break
 
     return FortranFormat(is_free, False)
 
@@ -74,7 +74,10 @@ First version created: May 2006
 
 """
 
+import functools
 import re
+import threading
+from collections import OrderedDict
 from typing import List, Tuple, Optional, Union
 
 
@@ -104,6 +107,17 @@ _f2py_findall = re.compile(
 exponential_constant = re.compile(
     r"(?:[^\w.]|^)((\d+[.]\d*|\d*[.]\d+|\d+)[edED][+-]?\d+(_\w+)?)"
 )
+# A (possibly unterminated) quoted string in which a quote is escaped by
+# repeating it, as found by `splitquote`.
+_STRINGS = re.compile(r"""'(?:[^']|'')*'?|"(?:[^"]|"")*"?""", re.S)
+# The lexical elements of a line that are significant when finding
+# parenthesised expressions as `splitparen` does: a quoted string (in which
+# a backslash also escapes the following character), a backslash together
+# with the character that it escapes or a bracket. All other characters
+# are skipped by the regular expression engine rather than by Python code.
+_LEXER = re.compile(
+    r"""'(?:[^'\\]|\\.?|'')*'?|"(?:[^"\\]|\\.?|"")*"?|\\.?|[()\[\]]""", re.S
+)
 
 
 class StringReplaceDict(dict):
@@ -124,34 +138,192 @@ class StringReplaceDict(dict):
         return line
 
 
-def memoize(function):
-    """Simple memoization decorator.
+class MemoCache:
+    """A bounded, thread-safe cache of the results of a function. Once
+    `maxsize` entries are stored, the least-recently used one is discarded
+    whenever a new one is added. This keeps the memory used by the cache
+    constant while retaining the entries for lines that are used
+    repeatedly (e.g. while a statement is matched against many rules).
+
+    :param int maxsize: the maximum number of entries to store.
+
+    :raises ValueError: if maxsize is not a positive integer.
+
+    """
+
+    def __init__(self, maxsize=1024):
+        self._check_maxsize(maxsize)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check_maxsize(maxsize):
+        """
+        :param int maxsize: a maximum number of entries.
+
+        :raises ValueError: if maxsize is not a positive integer.
+
+        """
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError(
+                f"The maximum size of the cache must be a positive integer "
+                f"but got '{maxsize}'"
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key, default=None):
+        """
+        :param key: the key of the entry.
+        :type key: Hashable
+
+        :returns: the value of the entry with the supplied key or `default` \
+            if there is no such entry.
+        :rtype: Any
+
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def store(self, key, value):
+        """
+        Adds an entry to the cache, discarding the least-recently used
+        entry if the cache is full.
+
+        :param key: the key of the entry.
+        :type key: Hashable
+        :param value: the value of the entry.
+        :type value: Any
+
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        """Discards the least-recently used entries until there are no more
+        than `maxsize`. Must be called with the lock held."""
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        """
+        Changes the maximum number of entries stored, discarding the
+        least-recently used entries if there are now too many.
+
+        :param int maxsize: the new maximum number of entries to store.
+
+        :raises ValueError: if maxsize is not a positive integer.
+
+        """
+        self._check_maxsize(maxsize)
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Discards all stored entries and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        :returns: the number of hits, misses and evictions and the current \
+            and maximum number of entries.
+        :rtype: Dict[str, int]
+
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+def memoize(function, maxsize=1024):
+    """Memoization decorator that uses a bounded, thread-safe cache. The
+    cache is available as the `cache` attribute of the returned function.
 
     :param function: The function to memoize.
     :type function: Callable
+    :param int maxsize: the maximum number of results to store.
 
-    TODO # 472 Python 3.9 comes with a thread-safe and more efficient cache as
-    it can be bounded and we are interested in lines that have temporal
-    locality. It's the: @functools.lru_cache(maxsize=8)
+    :returns: the memoized function.
+    :rtype: Callable
 
     """
-    memo = {}
+    cache = MemoCache(maxsize)
+    missing = object()
 
+    @functools.wraps(function)
     def wrapper(*args, **kwargs):
         key = args
         if kwargs:
             for item in kwargs.items():
                 key += item
-        result = memo.get(key, None)
-        if result is not None:
+        result = cache.lookup(key, missing)
+        if result is not missing:
             return result
+        # The function is called without holding the lock so a result may
+        # occasionally be computed by two threads at once, which is harmless.
         result = function(*args, **kwargs)
-        memo[key] = result
+        cache.store(key, result)
         return result
 
+    wrapper.cache = cache
     return wrapper
 
 
+def _bracket_groups(line):
+    """
+    Finds the top-level parenthesised (or bracketed) expressions in a
+    line in a single pass. As in `splitparen`, brackets within quoted
+    strings are ignored and a backslash (even within a string) escapes
+    the following character.
+
+    :param str line: the line of text to scan.
+
+    :returns: the (start, end) offsets of each complete top-level \
+        parenthesised expression.
+    :rtype: List[Tuple[int, int]]
+
+    """
+    groups = []
+    stack = []
+    start = 0
+    for match in _LEXER.finditer(line):
+        char = match.group()[0]
+        if char in "([":
+            if not stack:
+                start = match.start()
+            stack.append(")" if char == "(" else "]")
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                groups.append((start, match.end()))
+    return groups
+
+
 @memoize
 def string_replace_map(line, lower=False):
     """
@@ -173,11 +345,17 @@ def string_replace_map(line, lower=False):
     const_idx = 0
     parens_idx = 0
 
-    items = []
     string_map = StringReplaceDict()
     rev_string_map = {}
-    for item in splitquote(line, lower=lower)[0]:
-        if isinstance(item, String) and not _is_simple_str(item[1:-1]):
+    items = []
+    pos = 0
+    for match in _STRINGS.finditer(line):
+        start, end = match.span()
+        text = line[pos:start]
+        items.append(text.lower() if lower else text)
+        pos = end
+        item = match.group()
+        if not _is_simple_str(item[1:-1]):
             key = rev_string_map.get(item)
             if key is None:
                 str_idx += 1
@@ -188,6 +366,8 @@ def string_replace_map(line, lower=False):
             items.append(item[0] + key + item[-1])
         else:
             items.append(item)
+    text = line[pos:]
+    items.append(text.lower() if lower else text)
     newline = "".join(items)
 
     const_keys = []
@@ -205,10 +385,16 @@ def string_replace_map(line, lower=False):
             const_keys.append(key)
         newline = newline.replace(found, key)
 
+    # The brackets are found in the new line, exactly as `splitparen`
+    # would find them.
     items = []
     expr_keys = []
-    for item in splitparen(newline):
-        if isinstance(item, ParenString) and not _is_name(item[1:-1].strip()):
+    pos = 0
+    for start, end in _bracket_groups(newline):
+        items.append(newline[pos:start])
+        pos = end
+        item = newline[start:end]
+        if not _is_name(item[1:-1].strip()):
             key = rev_string_map.get(item)
             if key is None:
                 parens_idx += 1
@@ -220,16 +406,15 @@ def string_replace_map(line, lower=False):
             items.append(item[0] + key + item[-1])
         else:
             items.append(item)
+    items.append(newline[pos:])
 
     # Ensure that any entries in the map do not themselves contain
     # substitutions
-    found_keys = set()
     for key in expr_keys + const_keys:
         entry = string_map[key]
         # Find any keys within this map entry
         included_keys = _f2py_findall(entry)
         if included_keys:
-            found_keys = found_keys.union(included_keys)
             for inc_key in included_keys:
                 entry = entry.replace(inc_key, string_map[inc_key], 1)
             string_map[key] = entry
@@ -44,6 +44,8 @@ Test battery associated with fparser.common.readfortran package.
 
 import io
 import os.path
+import pickle
+import threading
 import pytest
 
 from fparser.common.readfortran import (
@@ -51,7 +53,10 @@ from fparser.common.readfortran import (
     FortranStringReader,
     FortranReaderBase,
     FortranReaderError,
+    INCLUDE_CACHE,
+    IncludeCache,
     Line,
+    ParseCacheStats,
     extract_label,
     extract_construct_name,
     CppDirective,
@@ -470,6 +475,137 @@ FORTRAN_CODE = (
 EXPECTED_CODE = "program test\n" "print *, 'Hello'\n" "end program"
 
 
+def test_line_parse_cache():
+    """Test that the outcomes cached by Line.parse_line are counted in the
+    statistics of the reader and can be released."""
+    reader = FortranStringReader("x = 1")
+    stats = reader.parse_cache_stats
+    assert isinstance(stats, ParseCacheStats)
+    line = reader.next()
+    calls = []
+
+    def match(string, parent_cls=None):
+        calls.append(string)
+        return string.upper()
+
+    assert line.parse_line(match, []) == "X = 1"
+    assert line.parse_line(match, []) == "X = 1"
+    assert calls == ["x = 1"]
+    assert repr(stats) == "ParseCacheStats(hits=1, misses=1, released=0)"
+    line.release_parse_cache()
+    assert not line.parse_cache
+    assert stats.released == 1
+    # Releasing an empty cache has no effect.
+    line.release_parse_cache()
+    assert stats.released == 1
+    # The match is performed again once the cache has been released.
+    assert line.parse_line(match, []) == "X = 1"
+    assert len(calls) == 2
+    stats.reset()
+    assert (stats.hits, stats.misses, stats.released) == (0, 0, 0)
+
+
+def test_include_parse_cache_stats(tmpdir):
+    """Test that the reader of an include file shares the parse-cache
+    statistics of the reader that includes it."""
+    include_file = tmpdir.join("prog.inc")
+    include_file.write("x = 1\n")
+    reader = FortranStringReader(
+        "include 'prog.inc'", include_dirs=[str(tmpdir)], ignore_comments=True
+    )
+    line = reader.next()
+    assert line.reader is not reader
+    assert line.reader.parse_cache_stats is reader.parse_cache_stats
+
+
+def test_include_cache(tmpdir):
+    """Test that an included file is only read once while it is unchanged
+    and that its lines and format are taken from the include cache."""
+    INCLUDE_CACHE.clear()
+    include_file = tmpdir.join("prog.inc")
+    include_file.write("      x = 1\n")
+    for _ in range(3):
+        reader = FortranStringReader(
+            "include 'prog.inc'", include_dirs=[str(tmpdir)], ignore_comments=True
+        )
+        assert str(reader.next()) == "line #1'x = 1'"
+        assert isinstance(reader.reader, FortranFileReader)
+        assert reader.reader.id == include_file.strpath
+        assert reader.reader.format == FortranFormat(False, False)
+    assert (INCLUDE_CACHE.hits, INCLUDE_CACHE.misses) == (2, 1)
+    # A modified file is read again.
+    include_file.write("y = 2\n")
+    include_file.setmtime(include_file.mtime() + 10)
+    reader = FortranStringReader(
+        "include 'prog.inc'", include_dirs=[str(tmpdir)], ignore_comments=True
+    )
+    assert str(reader.next()) == "line #1'y = 2'"
+    assert reader.reader.format == FortranFormat(True, False)
+    assert INCLUDE_CACHE.misses == 2
+    INCLUDE_CACHE.clear()
+    assert (INCLUDE_CACHE.hits, INCLUDE_CACHE.misses) == (0, 0)
+
+
+def test_include_cache_resolve(tmpdir):
+    """Test that the include cache finds a file in the first directory
+    that contains it and notices when files are added or removed."""
+    cache = IncludeCache()
+    first = tmpdir.mkdir("first")
+    second = tmpdir.mkdir("second")
+    dirs = [first.strpath, second.strpath]
+    assert cache.resolve("my.inc", dirs) is None
+    assert cache.resolve("my.inc", dirs) is None
+    second.join("my.inc").write("x = 1\n")
+    second.setmtime(second.mtime() + 10)
+    path = second.join("my.inc").strpath
+    assert cache.resolve("my.inc", dirs) == path
+    assert cache.source(path) == (("x = 1\n",), FortranFormat(True, False))
+    # The cached path is used even though the file now exists in the
+    # first directory.
+    first.join("my.inc").write("y = 1\n")
+    assert cache.resolve("my.inc", dirs) == path
+    # The cached path is discarded if the file no longer exists.
+    second.join("my.inc").remove()
+    assert cache.source(path) is None
+    assert cache.resolve("my.inc", dirs) == first.join("my.inc").strpath
+    # A directory is not a file that can be included.
+    first.mkdir("sub.inc")
+    assert cache.resolve("sub.inc", dirs) is None
+
+
+def test_include_cache_threads(tmpdir):
+    """Test that the include cache can be used by several threads at once,
+    including while files are removed and the cache is cleared."""
+    cache = IncludeCache()
+    dirs = [tmpdir.strpath]
+    names = [f"inc{idx}.h" for idx in range(20)]
+    for name in names:
+        tmpdir.join(name).write("x = 1\n")
+    errors = []
+
+    def use_cache():
+        try:
+            for _ in range(20):
+                for name in names:
+                    path = cache.resolve(name, dirs)
+                    if path is not None:
+                        cache.source(path)
+        except Exception as err:  # pylint: disable=broad-except
+            errors.append(err)
+
+    threads = [threading.Thread(target=use_cache) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for name in names[::2]:
+        tmpdir.join(name).remove()
+    cache.clear()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert cache.source(tmpdir.join(names[1]).strpath)[0] == ("x = 1\n",)
+    assert cache.source(tmpdir.join(names[0]).strpath) is None
+
+
 def test_include1(tmpdir):
     """Test that FortranReaderBase can parse an include file when the
     original program consists only of an include.
@@ -892,6 +1028,140 @@ def test_none_in_fifo(tmpdir, log):
             assert log.messages[log_level] == []
 
 
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        FULL_FREE_SOURCE.encode("UTF-8"),
+        b"program a\r\n\tx = 1\xa0! c\r\ny = '\xff'\rend",
+        b"      program a\nc comment\n!$    x = 1\n     & + 2\n      end\n",
+    ],
+)
+@pytest.mark.parametrize("ignore_comments", [True, False])
+def test_mmap_file_reader(tmpdir, content, ignore_comments):
+    """
+    Tests that a memory-mapped file is read in exactly the same way as a
+    file that is read as a stream.
+    """
+    filename = os.path.join(str(tmpdir), "out.f90")
+    with open(filename, "wb") as source_file:
+        source_file.write(content)
+    reader = FortranFileReader(
+        filename, ignore_comments=ignore_comments, include_omp_conditional_lines=True
+    )
+    mapped_reader = FortranFileReader(
+        filename,
+        ignore_comments=ignore_comments,
+        include_omp_conditional_lines=True,
+        use_mmap=True,
+    )
+    assert mapped_reader.format == reader.format
+    assert [repr(item) for item in mapped_reader] == [repr(item) for item in reader]
+    assert mapped_reader.isclosed
+    assert len(mapped_reader.source_lines) == len(reader.source_lines)
+    assert list(mapped_reader.source_lines) == reader.source_lines
+    assert mapped_reader.source_lines[-2:] == reader.source_lines[-2:]
+    if reader.source_lines:
+        assert mapped_reader.source_lines[-1] == reader.source_lines[-1]
+    with pytest.raises(IndexError):
+        _ = mapped_reader.source_lines[len(reader.source_lines)]
+
+
+def test_mmap_file_reader_lazy(tmpdir):
+    """
+    Tests that a memory-mapped file does not hold a copy of the lines that
+    have been read, that its format is determined from the start of the
+    file and that it can be pickled.
+    """
+    filename = os.path.join(str(tmpdir), "out.f90")
+    with open(filename, "w", encoding="UTF-8") as source_file:
+        source_file.write("program test\n" + "x = 1\n" * 100 + "end\n")
+    reader = FortranFileReader(filename, use_mmap=True)
+    assert reader.format == FortranFormat(True, False)
+    assert reader.get_single_line() == "program test"
+    assert reader.get_single_line() == "x = 1"
+    assert len(reader.source_lines) == 2
+    assert reader.source_lines[0] == "program test"
+    new_reader = pickle.loads(pickle.dumps(reader))
+    assert new_reader.source_lines == ["program test", "x = 1"]
+    with pytest.raises(ValueError) as err:
+        with open(filename, encoding="UTF-8") as source_file:
+            FortranFileReader(source_file, use_mmap=True)
+    assert "FortranFileReader can only memory-map a file that is specified " in str(
+        err.value
+    )
+
+
+def test_max_source_lines(tmpdir):
+    """
+    Tests that a reader only keeps the specified number of the most
+    recently read lines in source_lines, including for an included file.
+    """
+    include_file = tmpdir.join("test.inc")
+    include_file.write("b = 1\nc = 2\nd = 3\n")
+    code = "program test\n  a = 1\n  include 'test.inc'\n  e = 4\nend\n"
+    reader = FortranStringReader(code, include_dirs=[str(tmpdir)], max_source_lines=2)
+    items = []
+    include_reader = None
+    for item in reader:
+        items.append(item)
+        include_reader = include_reader or reader.reader
+    assert [item.line for item in items] == [
+        "program test",
+        "a = 1",
+        "b = 1",
+        "c = 2",
+        "d = 3",
+        "e = 4",
+        "end",
+    ]
+    assert len(reader.source_lines) == 5
+    assert list(reader.source_lines) == [
+        "<source line no longer available>",
+        "<source line no longer available>",
+        "<source line no longer available>",
+        "  e = 4",
+        "end",
+    ]
+    assert reader.source_lines[-1] == "end"
+    assert reader.source_lines[3:] == ["  e = 4", "end"]
+    with pytest.raises(IndexError):
+        _ = reader.source_lines[5]
+    # The reader for the included file also only kept two lines.
+    assert len(include_reader.source_lines) == 3
+    assert include_reader.source_lines[0] == "<source line no longer available>"
+    # Messages use the lines that are still available.
+    message = reader.format_message("ERROR", "problem", 5, 5)
+    assert "    4:  e = 4\n    5:end <== problem" in message
+    for value in [0, -1, 2.5]:
+        with pytest.raises(ValueError) as err:
+            FortranStringReader(code, max_source_lines=value)
+        assert (
+            f"The maximum number of source lines to keep must be None or a "
+            f"positive integer but got '{value}'" in str(err.value)
+        )
+
+
+@pytest.mark.parametrize(
+    "code, only_comments",
+    [
+        ("", True),
+        ("\n   \n! comment\n", True),
+        ("! comment\n  x = 1 ! comment\n! comment\n", False),
+        ("c comment\n      x = 1\n", False),
+    ],
+)
+def test_only_comments(code, only_comments):
+    """
+    Tests that a reader records whether all of the lines read so far are
+    blank or comments.
+    """
+    reader = FortranStringReader(code, ignore_comments=False)
+    assert reader.only_comments
+    _ = list(reader)
+    assert reader.only_comments is only_comments
+
+
 def test_bad_file_reader():
     """
     Tests that the file reader can spot when it is given something to read
@@ -48,6 +48,7 @@ import pytest
 from fparser.common.sourceinfo import (
     FortranFormat,
     get_source_info_str,
+    get_source_info_lines,
     get_source_info,
 )
 
@@ -291,6 +292,24 @@ def test_get_source_info_str(header, content):
         assert source_info == content[1]
 
 
+def test_get_source_info_lines():
+    """
+    Tests that only as many lines as are required to determine the format
+    are taken from the iterable passed to get_source_info_lines.
+    """
+    consumed = []
+
+    def lines():
+        for line in ["! comment", "program test", "      x = 1"] * 10:
+            consumed.append(line)
+            yield line
+
+    assert get_source_info_lines(lines()) == FortranFormat(True, False)
+    assert consumed == ["! comment", "program test"]
+    assert get_source_info_lines([]) == FortranFormat(False, False)
+    assert get_source_info_lines(["! -*- f77 -*-"], False) == FortranFormat(False, True)
+
+
 ##############################################################################
 
 
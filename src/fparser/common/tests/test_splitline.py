@@ -72,10 +72,22 @@ Test parsing single Fortran lines.
 
 """
 
+import random
+import threading
+
 import pytest
 
 from fparser.common.splitline import (
+    MemoCache,
+    memoize,
+    _bracket_groups,
+    _f2py_findall,
+    _is_name,
+    _is_simple_str,
     _next_quote,
+    exponential_constant,
+    ParenString,
+    String,
     splitparen,
     splitquote,
     string_replace_map,
@@ -379,6 +391,130 @@ def test_string_replace_map(test_str, result, result_map):
     assert string_map(string) == test_str
 
 
+def test_bracket_groups():
+    """Tests that _bracket_groups finds the top-level parenthesised
+    expressions in a line."""
+    assert _bracket_groups("a = b") == []
+    line = 'a(1, \'x)\') = [b(2), "y""z"] // \'open'
+    assert [line[start:end] for start, end in _bracket_groups(line)] == [
+        "(1, 'x)')",
+        '[b(2), "y""z"]',
+    ]
+    # Unbalanced or escaped brackets do not form an expression.
+    assert _bracket_groups("a(b]") == []
+    assert _bracket_groups("a\\(b)") == []
+    # A backslash before a quotation mark escapes it, as in splitparen.
+    line = "a = \\'(b)' + (c)"
+    assert [line[start:end] for start, end in _bracket_groups(line)] == ["(b)"]
+    assert splitparen(line) == ["a = \\'", "(b)", "' + (c)"]
+
+
+def _reference_string_replace_map(line, lower=False):
+    """
+    The original implementation of `string_replace_map`, which performs
+    the substitutions using separate passes of `splitquote`, the search
+    for real constants and `splitparen`. It is kept as a reference
+    against which to check the results of `string_replace_map`.
+
+    :param str line: the line of text in which to perform substitutions.
+    :param bool lower: whether or not the call to splitquote() should return
+        items as lowercase (default is to leave the case unchanged).
+
+    :returns: a new line and the replacement map.
+    :rtype: Tuple[str, :py:class:`fparser.common.splitline.StringReplaceDict`]
+
+    """
+
+    str_idx = 0
+    const_idx = 0
+    parens_idx = 0
+
+    items = []
+    string_map = StringReplaceDict()
+    rev_string_map = {}
+    for item in splitquote(line, lower=lower)[0]:
+        if isinstance(item, String) and not _is_simple_str(item[1:-1]):
+            key = rev_string_map.get(item)
+            if key is None:
+                str_idx += 1
+                key = "_F2PY_STRING_CONSTANT_{0}_".format(str_idx)
+                trimmed = item[1:-1]
+                string_map[key] = trimmed
+                rev_string_map[trimmed] = key
+            items.append(item[0] + key + item[-1])
+        else:
+            items.append(item)
+    newline = "".join(items)
+
+    const_keys = []
+    for item in exponential_constant.finditer(newline):
+        # Get the first captured group as that corresponds to the literal
+        # *without* any preceding non-word character.
+        found = item.group(1)
+
+        key = rev_string_map.get(found)
+        if key is None:
+            const_idx += 1
+            key = "F2PY_REAL_CONSTANT_{0}_".format(const_idx)
+            string_map[key] = found
+            rev_string_map[found] = key
+            const_keys.append(key)
+        newline = newline.replace(found, key)
+
+    items = []
+    expr_keys = []
+    for item in splitparen(newline):
+        if isinstance(item, ParenString) and not _is_name(item[1:-1].strip()):
+            key = rev_string_map.get(item)
+            if key is None:
+                parens_idx += 1
+                key = "F2PY_EXPR_TUPLE_{0}".format(parens_idx)
+                trimmed = item[1:-1].strip()
+                string_map[key] = trimmed
+                rev_string_map[trimmed] = key
+                expr_keys.append(key)
+            items.append(item[0] + key + item[-1])
+        else:
+            items.append(item)
+
+    # Ensure that any entries in the map do not themselves contain
+    # substitutions
+    found_keys = set()
+    for key in expr_keys + const_keys:
+        entry = string_map[key]
+        # Find any keys within this map entry
+        included_keys = _f2py_findall(entry)
+        if included_keys:
+            found_keys = found_keys.union(included_keys)
+            for inc_key in included_keys:
+                entry = entry.replace(inc_key, string_map[inc_key], 1)
+            string_map[key] = entry
+
+    return "".join(items), string_map
+
+
+@pytest.mark.parametrize("lower", [False, True])
+def test_string_replace_map_differential(lower):
+    """Tests that string_replace_map gives exactly the same result as the
+    separate passes of _reference_string_replace_map for many (randomly
+    generated) lines."""
+    alphabet = list("ab1e5d.+-_ ()[]'\"\\,=*/:E") + ["1.0e-3", "x1e5", "'a b'"]
+    alphabet += ["\\'", "\\\\"]
+    rng = random.Random(472)
+    lines = [
+        "x = (a + b(i) * 3) / sqrt(c) + 'a b'",
+        "call foo(x, 'txt', (/1,2/), 1.0e-3, (1.0e-3))",
+        "print *, 'it''s', \"a(\", (b, 'c)')",
+    ]
+    for _ in range(2000):
+        lines.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25))))
+    for line in lines:
+        result, result_map = string_replace_map.__wrapped__(line, lower)
+        expected, expected_map = _reference_string_replace_map(line, lower)
+        assert result == expected
+        assert list(result_map.items()) == list(expected_map.items())
+
+
 def test_string_replace_dict():
     """Tests for the StringReplaceDict class."""
     repmap = StringReplaceDict()
@@ -395,3 +531,84 @@ def test_string_replace_dict():
     repmap["F2PY_EXPR_TUPLE_11"] = "0.5d0*val"
     new_line = repmap("text with F2PY_EXPR_TUPLE_11 and F2PY_EXPR_TUPLE_1")
     assert new_line == "text with 0.5d0*val and 3 + 5"
+
+
+def test_memo_cache():
+    """Test the LRU eviction, statistics and resizing of MemoCache."""
+    cache = MemoCache(maxsize=2)
+    assert cache.lookup("a") is None
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.lookup("a") == 1
+    # "b" is now the least-recently used entry.
+    cache.store("c", 3)
+    assert cache.lookup("b", "missing") == "missing"
+    assert cache.lookup("c") == 3
+    assert len(cache) == 2
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "size": 2,
+        "maxsize": 2,
+    }
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.lookup("c") == 3
+    assert cache.evictions == 2
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 0
+    for maxsize in [0, -1, None]:
+        with pytest.raises(ValueError) as err:
+            MemoCache(maxsize)
+        assert (
+            f"The maximum size of the cache must be a positive integer but "
+            f"got '{maxsize}'" in str(err.value)
+        )
+    with pytest.raises(ValueError):
+        cache.resize(0)
+
+
+def test_memoize():
+    """Test that memoize stores results (including None) in a bounded
+    cache and that it can be used from several threads."""
+    calls = []
+
+    @memoize
+    def double(value, extra=None):
+        """Doubles the value."""
+        calls.append(value)
+        return None if value is None else 2 * value
+
+    assert double.__doc__ == "Doubles the value."
+    assert double(1) == 2
+    assert double(1) == 2
+    assert double(None) is None
+    assert double(None) is None
+    assert double(1, extra=True) == 2
+    assert calls == [1, None, 1]
+    assert double.cache.hits == 2
+    double.cache.resize(8)
+
+    def work():
+        for value in range(100):
+            assert double(value) == 2 * value
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(double.cache) == 8
+    assert double.cache.evictions > 0
+
+
+def test_string_replace_map_cache():
+    """Test that string_replace_map memoizes its results."""
+    cache = string_replace_map.cache
+    cache.clear()
+    result = string_replace_map("a = 'text' // b")
+    assert string_replace_map("a = 'text' // b") is result
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["size"] == 1
@@ -37,9 +37,18 @@ Test the various utility functions
 
 """
 
+import os
+
 import pytest
 
-from fparser.common.utils import split_comma, ParseError
+from fparser.common.readfortran import FortranStringReader
+from fparser.common.utils import (
+    ModuleIndex,
+    ParseError,
+    get_module_file,
+    get_module_index,
+    split_comma,
+)
 
 
 def test_split_comma():
@@ -122,3 +131,103 @@ def test_extract_bracketed_list_err():
     with pytest.raises(ParseError) as excinfo:
         _ = extract_bracketed_list_items("hello )this, is, wrong( too")
     assert "failed to find expression within parentheses in" in str(excinfo.value)
+
+
+def test_module_index(tmpdir):
+    """Test that a ModuleIndex finds the file defining a module and is
+    brought up to date when files are modified, added or removed."""
+    first = tmpdir.mkdir("first")
+    second = tmpdir.mkdir("second")
+    first.join("a.f90").write("module mod_a\n  integer :: use\nend module\n")
+    first.join("b.F90").write("module mod_b\nend module\n")
+    first.join("notes.txt").write("module mod_text\n")
+    second.join("a.f90").write("MODULE Mod_A ! Again\nend module\n")
+    second.join("c.f").write(
+        "      module mod_c\n      module procedure proc\n      end module\n"
+    )
+    index = ModuleIndex([first.strpath, second.strpath], jobs=2)
+    # The first file defining a module is used.
+    assert index.modules == {
+        "mod_a": first.join("a.f90").strpath,
+        "mod_c": second.join("c.f").strpath,
+    }
+    assert index.lookup("MOD_C") == second.join("c.f").strpath
+    assert index.lookup("mod_b") is None
+    assert index.lookup("proc") is None
+    # Nothing is scanned again if nothing has changed.
+    assert index.refresh() == 0
+    # A modified file is scanned again when a module it defined is looked up.
+    first.join("a.f90").write("module mod_d\nend module\n")
+    first.join("a.f90").setmtime(first.join("a.f90").mtime() + 10)
+    assert index.lookup("mod_a") == second.join("a.f90").strpath
+    assert index.lookup("mod_d") == first.join("a.f90").strpath
+    # An edited file that now defines a new module is found without a
+    # refresh.
+    second.join("c.f").write("      module mod_f\n      end module\n")
+    second.join("c.f").setmtime(second.join("c.f").mtime() + 10)
+    assert index.lookup("mod_f") == second.join("c.f").strpath
+    assert index.lookup("mod_c") is None
+    # New and removed files are found when a module is not in the index.
+    second.join("e.f90").write("module mod_e\nend module\n")
+    second.setmtime(second.mtime() + 10)
+    assert index.lookup("mod_e") == second.join("e.f90").strpath
+    second.join("e.f90").remove()
+    second.setmtime(second.mtime() + 20)
+    assert index.lookup("mod_e") is None
+    assert "mod_e" not in index.modules
+
+
+def test_get_module_file(tmpdir):
+    """Test that get_module_file and get_module_index share an index for
+    each list of directories."""
+    tmpdir.join("my_mod.f90").write("module my_mod\nend module\n")
+    tmpdir.join("other.f08").write("module other_module\nend module\n")
+    tmpdir.join("short.f90").write("module short\nend module\n")
+    index = get_module_index([tmpdir.strpath])
+    assert get_module_index([tmpdir.strpath]) is index
+    assert get_module_index([tmpdir.strpath, tmpdir.strpath]) is not index
+    assert get_module_file("my_mod", tmpdir.strpath) == (
+        tmpdir.join("my_mod.f90").strpath
+    )
+    assert get_module_file("other_module", tmpdir.strpath) == (
+        tmpdir.join("other.f08").strpath
+    )
+    # A file named after a module ending in "_module" is assumed to define it.
+    assert get_module_file("short_module", tmpdir.strpath) == (
+        tmpdir.join("short.f90").strpath
+    )
+    assert get_module_file("missing", tmpdir.strpath) is None
+
+
+def test_get_module_file_relative(tmpdir, monkeypatch):
+    """Test that a file found in a relative directory is returned joined
+    to the directory as supplied and that an index of relative directories
+    is not shared between working directories."""
+    monkeypatch.chdir(tmpdir)
+    tmpdir.mkdir("modd").join("a.f90").write("module mod_a\nend module\n")
+    other = tmpdir.mkdir("other")
+    other.mkdir("modd")
+    assert get_module_file("mod_a", "modd") == os.path.join("modd", "a.f90")
+    assert get_module_file("mod_a", tmpdir.join("modd").strpath) == (
+        tmpdir.join("modd", "a.f90").strpath
+    )
+    monkeypatch.chdir(other)
+    assert get_module_file("mod_a", "modd") is None
+
+
+def test_find_module_source_file(tmpdir):
+    """Test that a reader finds the file defining a module in its include
+    directories, including a file named after a module ending in
+    "_module"."""
+    first = tmpdir.mkdir("first")
+    second = tmpdir.mkdir("second")
+    first.join("a.f90").write("module mod_a\nend module\n")
+    second.join("short.f90").write("module short\nend module\n")
+    reader = FortranStringReader(
+        "program p\nend\n", include_dirs=[first.strpath, second.strpath]
+    )
+    assert reader.find_module_source_file("mod_a") == first.join("a.f90").strpath
+    assert reader.find_module_source_file("short_module") == (
+        second.join("short.f90").strpath
+    )
+    assert reader.find_module_source_file("missing") is None
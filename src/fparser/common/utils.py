@@ -81,6 +81,8 @@ __all__ = [
     "ParseError",
     "AnalyzeError",
     "get_module_file",
+    "get_module_index",
+    "ModuleIndex",
     "parse_bind",
     "parse_result",
     "is_name",
@@ -95,6 +97,7 @@ import glob
 import io
 import os
 import re
+import threading
 import traceback
 
 
@@ -272,26 +275,42 @@ def get_module_files(directory, _cache={}):
     return d
 
 
-def get_module_file(name, directory, _cache={}):
-    fn = _cache.get(name, None)
-    if fn is not None:
-        return fn
+def _named_module_file(name, directory):
+    """
+    :param str name: the name of a module.
+    :param str directory: the directory in which to look for the module.
+
+    :returns: the file in the directory named after the module (without \
+        its "_module" suffix) if the name of the module ends with \
+        "_module" and such a file exists, otherwise None.
+    :rtype: Optional[str]
+
+    """
     if name.endswith("_module"):
         for ext in module_file_extensions:
             f1 = os.path.join(directory, name[:-7] + ext)
             if os.path.isfile(f1):
-                _cache[name] = fn
                 return f1
-    files = []
-    for ext in module_file_extensions:
-        files += glob.glob(os.path.join(directory, "*" + ext))
-    for fn in files:
-        if module_in_file(name, fn):
-            _cache[name] = fn
-            return fn
     return None
 
 
+def get_module_file(name, directory):
+    """
+    :param str name: the name of a module.
+    :param str directory: the directory in which to look for the module.
+
+    :returns: the name of the file in the directory that defines the \
+        module (joined to the directory as supplied) or None if there is \
+        no such file.
+    :rtype: Optional[str]
+
+    """
+    fn = _named_module_file(name, directory)
+    if fn is not None:
+        return fn
+    return get_module_index([directory]).lookup(name)
+
+
 def module_in_file(name, filename):
     name = name.lower()
     pattern = re.compile(r"\s*module\s+(?P<name>[a-z]\w*)", re.I).match
@@ -305,6 +324,203 @@ def module_in_file(name, filename):
     f.close()
 
 
+_module_statement = re.compile(
+    r"^[ \t]*module[ \t]+(?P<name>[a-z]\w*)[ \t]*(?:!.*)?$", re.I | re.M
+)
+
+
+def _mtime(path):
+    """
+    :param str path: the name of a file or directory.
+
+    :returns: the modification time of the file or directory in \
+        nanoseconds or None if it does not exist.
+    :rtype: Optional[int]
+
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _modules_in_file(filename):
+    """
+    :param str filename: the name of a Fortran source file.
+
+    :returns: the (lower-case) names of the modules defined in the file, \
+        which is empty if the file cannot be read.
+    :rtype: List[str]
+
+    """
+    try:
+        with io.open(filename, "r", encoding="UTF-8", errors="replace") as source:
+            text = source.read()
+    except (IOError, OSError):
+        return []
+    return [name.lower() for name in _module_statement.findall(text)]
+
+
+class ModuleIndex:
+    """
+    An index of the modules defined by the Fortran source files (i.e.
+    those with one of the `module_file_extensions`) in a list of
+    directories, giving the name of the file that defines a module
+    without reading any source.
+
+    The files are scanned (using a pool of threads) when the index is
+    created. Afterwards, a file is only scanned again if its modification
+    time has changed. This is checked for the file found by a lookup and,
+    when a module is not found, for every file in the index and for the
+    directories themselves (which change when a file is added or
+    removed).
+
+    If more than one file defines a module then the first one is used,
+    going by the order of the directories and then of the
+    `module_file_extensions`.
+
+    :param directories: the directories in which to look for modules.
+    :type directories: List[str]
+    :param jobs: the number of threads used to scan the files. Defaults \
+        to the number chosen by :py:class:`ThreadPoolExecutor`.
+    :type jobs: Optional[int]
+
+    """
+
+    def __init__(self, directories, jobs=None):
+        self.directories = tuple(directories)
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        # The modification time of each directory, the modification time
+        # and modules of each file and the file defining each module. These
+        # are replaced together so that a lookup always sees a consistent
+        # index without taking the lock.
+        self._state = ({}, {}, {})
+        self.refresh()
+
+    def _source_files(self):
+        """
+        :returns: the names of the source files in the directories.
+        :rtype: List[str]
+
+        """
+        files = []
+        for directory in self.directories:
+            for ext in module_file_extensions:
+                files.extend(sorted(glob.glob(os.path.join(directory, "*" + ext))))
+        return list(dict.fromkeys(files))
+
+    def refresh(self):
+        """
+        Brings the index up to date with the files in the directories.
+        Only files that are new or whose modification time has changed
+        are scanned.
+
+        :returns: the number of files that were scanned.
+        :rtype: int
+
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        """
+        Brings the index up to date (see `refresh`) while holding the lock.
+
+        :returns: the number of files that were scanned.
+        :rtype: int
+
+        """
+        directory_mtimes = {
+            directory: _mtime(directory) for directory in self.directories
+        }
+        files = self._state[1]
+        filenames = self._source_files()
+        mtimes = {filename: _mtime(filename) for filename in filenames}
+        stale = [
+            filename
+            for filename in filenames
+            if filename not in files or files[filename][0] != mtimes[filename]
+        ]
+        if len(stale) > 1 and self.jobs != 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                scanned = list(executor.map(_modules_in_file, stale))
+        else:
+            scanned = [_modules_in_file(filename) for filename in stale]
+        files = {filename: files.get(filename) for filename in filenames}
+        for filename, names in zip(stale, scanned):
+            files[filename] = (mtimes[filename], names)
+        modules = {}
+        for filename in filenames:
+            for name in files[filename][1]:
+                modules.setdefault(name, filename)
+        self._state = (directory_mtimes, files, modules)
+        return len(stale)
+
+    @property
+    def modules(self):
+        """
+        :returns: the name of the file defining each (lower-case) module \
+            name, as of the last refresh.
+        :rtype: Dict[str, str]
+
+        """
+        return dict(self._state[2])
+
+    def lookup(self, name):
+        """
+        :param str name: the name of a module (in any case).
+
+        :returns: the name of the file that defines the module or None \
+            if no file in the directories defines it.
+        :rtype: Optional[str]
+
+        """
+        name = name.lower()
+        directory_mtimes, files, modules = self._state
+        filename = modules.get(name)
+        if filename is not None:
+            if _mtime(filename) == files[filename][0]:
+                return filename
+        elif all(
+            _mtime(directory) == mtime for directory, mtime in directory_mtimes.items()
+        ) and all(_mtime(filename) == entry[0] for filename, entry in files.items()):
+            return None
+        self.refresh()
+        return self._state[2].get(name)
+
+
+# The shared module indices, keyed on the directories as supplied (and,
+# if any of them is relative, the current working directory).
+_MODULE_INDICES = {}
+_MODULE_INDICES_LOCK = threading.Lock()
+
+
+def get_module_index(directories):
+    """
+    :param directories: the directories in which to look for modules.
+    :type directories: List[str]
+
+    :returns: the (shared) index of the modules defined in the \
+        directories, which is created on the first call for each list \
+        of directories.
+    :rtype: :py:class:`fparser.common.utils.ModuleIndex`
+
+    """
+    directories = tuple(directories)
+    cwd = None
+    if not all(os.path.isabs(directory) for directory in directories):
+        cwd = os.getcwd()
+    key = (cwd, directories)
+    with _MODULE_INDICES_LOCK:
+        index = _MODULE_INDICES.get(key)
+        if index is None:
+            index = _MODULE_INDICES[key] = ModuleIndex(directories)
+    return index
+
+
 def str2stmt(string, isfree=True, isstrict=False):
     """Convert Fortran code to Statement tree."""
     from .readfortran import Line, FortranStringReader
@@ -91,6 +91,25 @@ def runner(_, options, args):
     if not args:
         print("Error: No fortran files specified", file=sys.stderr)
         raise SystemExit(1)
+    jobs = getattr(options, "jobs", 1)
+    if jobs < 1:
+        print(
+            f"Error: The number of jobs must be a positive integer but got "
+            f"'{jobs}'",
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+    profile = getattr(options, "profile", False)
+    if profile and jobs > 1:
+        print("Error: --profile cannot be used with --jobs", file=sys.stderr)
+        raise SystemExit(1)
+    if jobs > 1:
+        _parallel_runner(options, args, jobs)
+        return
+    if profile:
+        from fparser.two.profiler import RuleProfiler
+
+        profiler = RuleProfiler()
     for filename in args:
         print("File: '{0}'".format(filename), file=sys.stderr)
         try:
@@ -100,7 +119,11 @@ def runner(_, options, args):
             continue
         try:
             fparser = ParserFactory().create(std=options.std)
-            program = fparser(reader)
+            if profile:
+                with profiler:
+                    program = fparser(reader)
+            else:
+                program = fparser(reader)
             if options.task == "show":
                 print(str(program))
             if options.task == "repr":
@@ -109,6 +132,30 @@ def runner(_, options, args):
             print(f"Syntax error: {msg}", file=sys.stderr)
         except InternalError as msg:
             print(f"Internal error in fparser: {msg}", file=sys.stderr)
+    if profile:
+        print(profiler.table(), file=sys.stderr)
+
+
+def _parallel_runner(options, args, jobs):
+    """
+    Function to parse Fortran source code using several processes and
+    output it in the same way (and order) as `runner`.
+
+    :param options: object constructed by OptionParser with cmd-line flags.
+    :param args: list of Fortran files to parse.
+    :type args: list of str
+    :param int jobs: the number of processes to use.
+
+    """
+    from fparser.two.parallel import parse_files
+
+    output = {"show": "fortran", "repr": "repr", "none": "none"}[options.task]
+    for result in parse_files(args, std=options.std, jobs=jobs, output=output):
+        print("File: '{0}'".format(result.filename), file=sys.stderr)
+        if result.error:
+            print(result.error, file=sys.stderr)
+        elif result.result is not None:
+            print(result.result)
 
 
 def main():
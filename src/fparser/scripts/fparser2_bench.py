@@ -38,10 +38,28 @@ Generates a large Fortran program in memory and then measures how long
 it takes fparser2 to parse it. This is based on the benchmark suggested
 by Ondřej Čertík via Ioannis Nikiteas.
 
+In addition, a suite of benchmark scenarios, each of which generates code
+that exercises a different part of fparser (e.g. deeply-nested
+expressions, fixed-format code or coarrays), reports the time taken, the
+peak memory used and the number of items (statements, loops, values, ...)
+parsed per second for each scenario. The results can be output as JSON
+so that they can be compared between releases.
+
 """
 
+import json
+import platform
+import sys
+import tracemalloc
+from collections import namedtuple
+from optparse import OptionParser
 from time import perf_counter
 
+import fparser
+from fparser.common.sourceinfo import FortranFormat
+from fparser.common.readfortran import FortranStringReader
+from fparser.two.parser import ParserFactory
+
 from fparser.common.sourceinfo import FortranFormat
 from fparser.common.readfortran import FortranStringReader
 from fparser.two.parser import ParserFactory
@@ -126,5 +144,644 @@ def runner(num_routines: int):
     print(f"Time taken for parse = {tstop - tstart:.2f}s")
 
 
+def gen_deep_expressions(size: int, depth: int = 12):
+    """
+    Constructs a subroutine containing assignments of deeply-nested
+    expressions.
+
+    :param size: the number of assignments.
+    :param depth: the depth of the nesting of each expression.
+
+    :returns: Fortran subroutine and the number of assignments.
+    :rtype: Tuple[str, int]
+
+    """
+    code = ["subroutine deep(a, x)", "  real :: a, x"]
+    for num in range(size):
+        expr = "a"
+        for level in range(depth):
+            if level % 2:
+                expr = f"({expr} + {level}.0) * a"
+            else:
+                expr = f"sin({expr}) - {num}"
+        code.append(f"  x = {expr}")
+    code.append("end subroutine deep")
+    return "\n".join(code) + "\n", size
+
+
+def gen_continuations(size: int, length: int = 40):
+    """
+    Constructs a subroutine containing statements that are each continued
+    over many lines.
+
+    :param size: the number of statements.
+    :param length: the number of lines that each statement spans.
+
+    :returns: Fortran subroutine and the number of statements.
+    :rtype: Tuple[str, int]
+
+    """
+    code = ["subroutine cont(a, x, msg)", "  real :: a(*), x", "  character(*) :: msg"]
+    for num in range(size):
+        terms = [f"a({num + idx + 1})" for idx in range(length)]
+        code.append("  x = " + " + &\n      ".join(terms))
+        parts = [f"'part {idx} of message {num}'" for idx in range(length)]
+        code.append("  msg = " + " // &\n        ".join(parts))
+    code.append("end subroutine cont")
+    return "\n".join(code) + "\n", 2 * size
+
+
+def gen_fixed_format(size: int):
+    """
+    Constructs fixed-format (Fortran 77) subroutines with comments and
+    continuation lines.
+
+    :param size: the number of subroutines.
+
+    :returns: Fortran subroutines and the number of subroutines.
+    :rtype: Tuple[str, int]
+
+    """
+    code = []
+    for num in range(size):
+        code.extend(
+            [
+                f"      SUBROUTINE F{num}(N, A, B)",
+                "C     A FIXED-FORMAT ROUTINE",
+                "      INTEGER N, I",
+                "      REAL A(N), B(N)",
+                "      DO 10 I = 1, N",
+                f"         A(I) = B(I) * {num}.0 +",
+                "     &          B(N - I + 1)",
+                "   10 CONTINUE",
+                "      IF (N .GT. 1) THEN",
+                "         A(1) = 0.0",
+                "      ELSE",
+                "         GOTO 20",
+                "      END IF",
+                "   20 RETURN",
+                "      END",
+            ]
+        )
+    return "\n".join(code) + "\n", size
+
+
+def gen_labelled_do(size: int, depth: int = 6):
+    """
+    Constructs a subroutine containing nests of labelled DO loops that
+    share a terminating statement. Such nests used to take a time that
+    was exponential in their depth to parse (see issue #499).
+
+    :param size: the number of loop nests.
+    :param depth: the depth of each nest.
+
+    :returns: Fortran subroutine and the number of loops.
+    :rtype: Tuple[str, int]
+
+    """
+    names = ", ".join(f"i{level}" for level in range(depth))
+    code = ["subroutine loops(a)", "  real :: a(10)", f"  integer :: {names}"]
+    for num in range(size):
+        label = (num + 1) * 10
+        for level in range(depth):
+            code.append("  " * (level + 1) + f"do {label} i{level} = 1, 10")
+        code.append("  " * (depth + 1) + f"a(i0) = a(i0) + i{depth - 1}")
+        code.append(f"{label} continue")
+    code.append("end subroutine loops")
+    return "\n".join(code) + "\n", size * depth
+
+
+def gen_data_tables(size: int, length: int = 200):
+    """
+    Constructs a module containing large PARAMETER arrays and DATA
+    statements.
+
+    :param size: the number of tables.
+    :param length: the number of values in each table.
+
+    :returns: Fortran module and the number of values.
+    :rtype: Tuple[str, int]
+
+    """
+    code = ["module tables", "  implicit none"]
+    for num in range(size):
+        values = [str(num + idx) for idx in range(length)]
+        rows = [", ".join(values[idx : idx + 10]) for idx in range(0, length, 10)]
+        code.append(
+            f"  integer, parameter :: p{num}({length}) = (/ &\n      "
+            + ", &\n      ".join(rows)
+            + " /)"
+        )
+        code.append(f"  real :: d{num}({length})")
+        rows = [
+            ", ".join(f"{val}.5" for val in values[idx : idx + 10])
+            for idx in range(0, length, 10)
+        ]
+        code.append(f"  data d{num} / &\n      " + ", &\n      ".join(rows) + " /")
+    code.append("end module tables")
+    return "\n".join(code) + "\n", 2 * size * length
+
+
+def gen_use_symbols(size: int, num_vars: int = 20):
+    """
+    Constructs modules and subroutines that USE them, populating the
+    symbol tables.
+
+    :param size: the number of modules (and of subroutines).
+    :param num_vars: the number of variables declared in each module.
+
+    :returns: Fortran modules and subroutines and the number of USE \
+        statements.
+    :rtype: Tuple[str, int]
+
+    """
+    code = []
+    for num in range(size):
+        code.append(f"module mod{num}")
+        for prev in range(max(0, num - 3), num):
+            code.append(f"  use mod{prev}, only: v{prev}_0, v{prev}_1")
+        names = ", ".join(f"v{num}_{idx}" for idx in range(num_vars))
+        code.extend(["  implicit none", f"  real :: {names}", f"end module mod{num}"])
+    for num in range(size):
+        code.extend(
+            [
+                f"subroutine user{num}(x)",
+                f"  use mod{num}",
+                f"  use mod{(num + 1) % size}, only: y => v{(num + 1) % size}_0",
+                "  implicit none",
+                "  real :: x, z",
+                f"  z = v{num}_1 + y",
+                "  x = x + z",
+                f"end subroutine user{num}",
+            ]
+        )
+    num_uses = sum(1 for line in code if line.startswith("  use "))
+    return "\n".join(code) + "\n", num_uses
+
+
+def gen_cpp_directives(size: int):
+    """
+    Constructs subroutines laden with C preprocessor directives.
+
+    :param size: the number of subroutines.
+
+    :returns: Fortran code and the number of directives.
+    :rtype: Tuple[str, int]
+
+    """
+    code = []
+    for num in range(size):
+        code.extend(
+            [
+                f"#define N{num} {num}",
+                f"subroutine cpp{num}(x)",
+                "  real :: x",
+                "#ifdef USE_MPI",
+                "  x = x + 1.0",
+                "#elif defined(USE_OPENMP) && N{num} > 2",
+                "  x = x + 2.0",
+                "#else",
+                "  x = x + 3.0",
+                "#endif",
+                "#if !defined(NDEBUG)",
+                "  print *, x",
+                "#endif",
+                f"end subroutine cpp{num}",
+                f"#undef N{num}",
+            ]
+        )
+    return "\n".join(code) + "\n", 9 * size
+
+
+def gen_comments(size: int):
+    """
+    Constructs subroutines with many comments.
+
+    :param size: the number of subroutines.
+
+    :returns: Fortran code and the number of subroutines.
+    :rtype: Tuple[str, int]
+
+    """
+    code = []
+    for num in range(size):
+        code.extend(
+            [
+                f"! The routine number {num}.",
+                "! It adds things up.",
+                f"subroutine com{num}(x)",
+                "  ! The argument.",
+                "  real, intent(inout) :: x  ! In and out.",
+                "  integer :: i",
+                "  ! Loop over things.",
+                "  do i = 1, 10",
+                "    ! Add them up.",
+                "    x = x + i  ! Accumulate.",
+                "  end do",
+                "  ! All done.",
+                f"end subroutine com{num}",
+            ]
+        )
+    return "\n".join(code) + "\n", size
+
+
+def gen_coarrays(size: int):
+    """
+    Constructs Fortran 2008 subroutines that declare coarrays and use
+    CRITICAL constructs. (Image selectors and image-control statements
+    such as SYNC ALL are not yet supported by fparser2.)
+
+    :param size: the number of subroutines.
+
+    :returns: Fortran code and the number of subroutines.
+    :rtype: Tuple[str, int]
+
+    """
+    code = []
+    for num in range(size):
+        code.extend(
+            [
+                f"subroutine coarray{num}(n)",
+                "  integer, intent(in) :: n",
+                "  real, allocatable, codimension[:] :: a(:)",
+                "  real, codimension[*] :: b(10)",
+                "  real, codimension[2, *] :: c",
+                "  integer, codimension[*] :: counter",
+                "  allocate(a(n))",
+                f"  b(:) = {num}.0",
+                "  critical",
+                "    counter = counter + 1",
+                "  end critical",
+                "  if (n < 0) then",
+                "    error stop 1",
+                "  end if",
+                "  c = b(1)",
+                "  deallocate(a)",
+                f"end subroutine coarray{num}",
+            ]
+        )
+    return "\n".join(code) + "\n", size
+
+
+#: A benchmark scenario: the name of the scenario, a description of it,
+#: the function that generates the code (and the number of items in it),
+#: the name of the items, the Fortran standard and source format to use,
+#: whether comments are ignored and the default size passed to the
+#: function that generates the code.
+Scenario = namedtuple(
+    "Scenario",
+    "name description generate unit std mode ignore_comments size",
+)
+
+#: The available benchmark scenarios.
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            "subroutines",
+            "many small subroutines (the original benchmark)",
+            lambda size: (create_bench(size), size),
+            "subroutines",
+            "f2003",
+            "pyf",
+            True,
+            1000,
+        ),
+        Scenario(
+            "deep_expressions",
+            "deeply-nested expressions",
+            gen_deep_expressions,
+            "statements",
+            "f2003",
+            "free",
+            True,
+            100,
+        ),
+        Scenario(
+            "continuations",
+            "statements continued over many lines",
+            gen_continuations,
+            "statements",
+            "f2003",
+            "free",
+            True,
+            50,
+        ),
+        Scenario(
+            "fixed_format",
+            "fixed-format Fortran 77",
+            gen_fixed_format,
+            "subroutines",
+            "f2003",
+            "f77",
+            True,
+            500,
+        ),
+        Scenario(
+            "labelled_do",
+            "nests of labelled DO loops with shared terminators",
+            gen_labelled_do,
+            "loops",
+            "f2003",
+            "free",
+            True,
+            200,
+        ),
+        Scenario(
+            "data_tables",
+            "large PARAMETER arrays and DATA statements",
+            gen_data_tables,
+            "values",
+            "f2003",
+            "free",
+            True,
+            20,
+        ),
+        Scenario(
+            "use_symbols",
+            "modules USEd by subroutines, with symbol tables",
+            gen_use_symbols,
+            "use statements",
+            "f2003",
+            "free",
+            True,
+            200,
+        ),
+        Scenario(
+            "cpp_directives",
+            "code laden with C preprocessor directives",
+            gen_cpp_directives,
+            "directives",
+            "f2003",
+            "free",
+            True,
+            300,
+        ),
+        Scenario(
+            "comments_kept",
+            "subroutines with many comments, kept in the tree",
+            gen_comments,
+            "subroutines",
+            "f2003",
+            "free",
+            False,
+            500,
+        ),
+        Scenario(
+            "comments_ignored",
+            "subroutines with many comments, ignored",
+            gen_comments,
+            "subroutines",
+            "f2003",
+            "free",
+            True,
+            500,
+        ),
+        Scenario(
+            "coarrays",
+            "Fortran 2008 coarrays",
+            gen_coarrays,
+            "subroutines",
+            "f2008",
+            "free",
+            True,
+            300,
+        ),
+    ]
+}
+
+#: The result of running a benchmark scenario. The time is in seconds
+#: (the fastest of the repeats) and the peak memory in bytes (None if it
+#: was not measured).
+BenchResult = namedtuple(
+    "BenchResult",
+    "scenario size items unit lines time peak_memory items_per_second",
+)
+
+
+def _parse(context, scenario, code):
+    """
+    Parses the supplied code as specified by the scenario.
+
+    :param context: the parser context to use.
+    :type context: :py:class:`fparser.two.context.ParserContext`
+    :param scenario: the benchmark scenario.
+    :type scenario: :py:class:`fparser.scripts.fparser2_bench.Scenario`
+    :param str code: the Fortran code to parse.
+
+    :returns: the time taken to parse the code.
+    :rtype: float
+
+    """
+    reader = FortranStringReader(code, ignore_comments=scenario.ignore_comments)
+    reader.set_format(FortranFormat.from_mode(scenario.mode))
+    tstart = perf_counter()
+    context(reader)
+    return perf_counter() - tstart
+
+
+def run_scenario(scenario, scale=1.0, repeat=1, memory=True):
+    """
+    Runs a benchmark scenario.
+
+    :param scenario: the scenario to run.
+    :type scenario: :py:class:`fparser.scripts.fparser2_bench.Scenario`
+    :param float scale: the factor by which to scale the default size of \
+        the scenario.
+    :param int repeat: the number of times to parse the code. The fastest \
+        time is reported.
+    :param bool memory: whether to measure the peak memory used. This \
+        requires the code to be parsed once more (with tracemalloc, \
+        which slows parsing down, enabled).
+
+    :returns: the result of the benchmark.
+    :rtype: :py:class:`fparser.scripts.fparser2_bench.BenchResult`
+
+    :raises ValueError: if scale is not positive or repeat < 1.
+
+    """
+    if scale <= 0:
+        raise ValueError(f"The scale must be positive but got: {scale}")
+    if repeat < 1:
+        raise ValueError(
+            f"The number of repeats must be a positive, non-zero integer but "
+            f"got: {repeat}"
+        )
+    size = max(1, int(scenario.size * scale))
+    code, items = scenario.generate(size)
+    context = ParserFactory().create_context(std=scenario.std)
+    elapsed = min(_parse(context, scenario, code) for _ in range(repeat))
+    peak_memory = None
+    if memory:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        _parse(context, scenario, code)
+        peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+        if not tracing:
+            tracemalloc.stop()
+    return BenchResult(
+        scenario.name,
+        size,
+        items,
+        scenario.unit,
+        code.count("\n"),
+        elapsed,
+        peak_memory,
+        items / elapsed if elapsed > 0 else float("inf"),
+    )
+
+
+def run_suite(names=None, scale=1.0, repeat=1, memory=True):
+    """
+    Runs a number of benchmark scenarios.
+
+    :param names: the names of the scenarios to run (all of them if None).
+    :type names: Optional[List[str]]
+    :param float scale: the factor by which to scale the default size of \
+        each scenario.
+    :param int repeat: the number of times to parse the code of each \
+        scenario.
+    :param bool memory: whether to measure the peak memory used.
+
+    :returns: the results of the benchmarks, in the order of the names.
+    :rtype: List[:py:class:`fparser.scripts.fparser2_bench.BenchResult`]
+
+    :raises ValueError: if a name is not that of a scenario.
+
+    """
+    if names is None:
+        names = list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(
+                f"Unknown benchmark scenario '{name}'. It must be one of "
+                f"{list(SCENARIOS)}."
+            )
+    return [
+        run_scenario(SCENARIOS[name], scale=scale, repeat=repeat, memory=memory)
+        for name in names
+    ]
+
+
+def format_table(results):
+    """
+    :param results: the results of the benchmarks.
+    :type results: List[:py:class:`fparser.scripts.fparser2_bench.BenchResult`]
+
+    :returns: the results as a table of text, one line per scenario.
+    :rtype: str
+
+    """
+    lines = [
+        f"{'scenario':<18} {'lines':>8} {'items':>8} {'time (s)':>9} "
+        f"{'peak (KiB)':>10} {'items/s':>10}  unit"
+    ]
+    for result in results:
+        peak = "-" if result.peak_memory is None else result.peak_memory // 1024
+        lines.append(
+            f"{result.scenario:<18} {result.lines:>8} {result.items:>8} "
+            f"{result.time:>9.3f} {peak:>10} {result.items_per_second:>10.1f}"
+            f"  {result.unit}"
+        )
+    return "\n".join(lines)
+
+
+def to_json(results, scale=1.0, repeat=1):
+    """
+    :param results: the results of the benchmarks.
+    :type results: List[:py:class:`fparser.scripts.fparser2_bench.BenchResult`]
+    :param float scale: the scale with which the benchmarks were run.
+    :param int repeat: the number of repeats with which the benchmarks \
+        were run.
+
+    :returns: the results, and the versions of fparser and Python that \
+        produced them, as JSON.
+    :rtype: str
+
+    """
+    return json.dumps(
+        {
+            "fparser": fparser.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "scale": scale,
+            "repeat": repeat,
+            "results": [result._asdict() for result in results],
+        },
+        indent=2,
+    )
+
+
+def main(argv=None):
+    """
+    Entry point for running the benchmark suite from the command line.
+
+    :param argv: the command-line arguments (sys.argv[1:] if None).
+    :type argv: Optional[List[str]]
+
+    """
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Run the specified scenario (may be given more than once). "
+        "Default: all of them.",
+    )
+    parser.add_option(
+        "--scale",
+        type="float",
+        default=1.0,
+        help="Scale the size of the generated code. Default: %default.",
+    )
+    parser.add_option(
+        "--repeat",
+        type="int",
+        default=1,
+        help="Report the fastest of this number of parses. Default: %default.",
+    )
+    parser.add_option(
+        "--no-memory",
+        action="store_false",
+        dest="memory",
+        default=True,
+        help="Do not measure the peak memory used.",
+    )
+    parser.add_option(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Specify the output format. Default: %default.",
+    )
+    parser.add_option(
+        "--list",
+        action="store_true",
+        default=False,
+        help="List the scenarios and exit.",
+    )
+    options, _ = parser.parse_args(argv)
+    if options.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<18} {scenario.description}")
+        return
+    try:
+        results = run_suite(
+            options.scenario,
+            scale=options.scale,
+            repeat=options.repeat,
+            memory=options.memory,
+        )
+    except ValueError as err:
+        print(f"Error: {err}", file=sys.stderr)
+        raise SystemExit(1) from err
+    if options.format == "json":
+        print(to_json(results, options.scale, options.repeat))
+    else:
+        print(format_table(results))
+
+
 if __name__ == "__main__":
-    runner(10000)  # pragma: no cover
+    main()  # pragma: no cover
@@ -122,6 +122,21 @@ Description:
         choices=["f2003", "f2008"],
         help="Specify the Fortran standard to use. Default: %default.",
     )
+    parser.add_option(
+        "--jobs",
+        default=1,
+        type="int",
+        help="Specify the number of processes to use to parse the files. "
+        "Default: %default.",
+    )
+    parser.add_option(
+        "--profile",
+        default=False,
+        action="store_true",
+        help="Print the number of attempts, matches and the time spent for "
+        "each grammar rule to stderr once all files are parsed. Cannot be "
+        "used with --jobs.",
+    )
 
 
 def get_fortran_code_group(parser):
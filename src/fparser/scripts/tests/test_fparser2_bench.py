@@ -31,6 +31,7 @@
 
 """Tests for the fparser2_bench script."""
 
+import json
 import pytest
 from fparser.scripts import fparser2_bench
 
@@ -71,3 +72,84 @@ def test_runner(capsys):
     assert stderr == ""
     assert "Constructing benchmark code with 3 subroutines" in stdout
     assert "Time taken for parse =" in stdout
+
+
+@pytest.mark.parametrize("name", list(fparser2_bench.SCENARIOS))
+def test_scenarios(name):
+    """Check that the code generated by each scenario is valid (i.e. can be
+    parsed) and that the results are reported as expected."""
+    scenario = fparser2_bench.SCENARIOS[name]
+    result = fparser2_bench.run_scenario(scenario, scale=0.01, memory=False)
+    assert isinstance(result, fparser2_bench.BenchResult)
+    assert result.scenario == name
+    assert result.size == max(1, int(scenario.size * 0.01))
+    assert result.items > 0
+    assert result.unit == scenario.unit
+    assert result.lines > 0
+    assert result.time > 0
+    assert result.peak_memory is None
+    assert result.items_per_second == pytest.approx(result.items / result.time)
+
+
+def test_run_scenario_memory():
+    """Check that the peak memory is measured if requested and that the
+    scale and the number of repeats are checked."""
+    scenario = fparser2_bench.SCENARIOS["subroutines"]
+    result = fparser2_bench.run_scenario(scenario, scale=0.002, repeat=2)
+    assert result.size == 2
+    assert result.peak_memory > 0
+    with pytest.raises(ValueError) as err:
+        fparser2_bench.run_scenario(scenario, scale=0)
+    assert "The scale must be positive but got: 0" in str(err.value)
+    with pytest.raises(ValueError) as err:
+        fparser2_bench.run_scenario(scenario, repeat=0)
+    assert (
+        "The number of repeats must be a positive, non-zero integer but "
+        "got: 0" in str(err.value)
+    )
+
+
+def test_run_suite():
+    """Check that run_suite runs the requested scenarios in order and
+    rejects unknown ones."""
+    results = fparser2_bench.run_suite(
+        ["coarrays", "labelled_do"], scale=0.01, memory=False
+    )
+    assert [result.scenario for result in results] == ["coarrays", "labelled_do"]
+    with pytest.raises(ValueError) as err:
+        fparser2_bench.run_suite(["missing"])
+    assert "Unknown benchmark scenario 'missing'" in str(err.value)
+
+
+def test_main(capsys):
+    """Check the output of the command-line interface in each format."""
+    fparser2_bench.main(["--list"])
+    stdout, _ = capsys.readouterr()
+    assert len(stdout.splitlines()) == len(fparser2_bench.SCENARIOS)
+    assert stdout.startswith("subroutines ")
+
+    args = ["--scenario=comments_kept", "--scenario=cpp_directives", "--scale=0.01"]
+    fparser2_bench.main(args)
+    stdout, _ = capsys.readouterr()
+    lines = stdout.splitlines()
+    assert lines[0].split()[:3] == ["scenario", "lines", "items"]
+    assert lines[1].startswith("comments_kept ")
+    assert lines[2].startswith("cpp_directives ")
+    assert lines[2].endswith("directives")
+
+    fparser2_bench.main(args + ["--format=json", "--no-memory", "--repeat=2"])
+    stdout, _ = capsys.readouterr()
+    result = json.loads(stdout)
+    assert result["scale"] == 0.01
+    assert result["repeat"] == 2
+    assert [item["scenario"] for item in result["results"]] == [
+        "comments_kept",
+        "cpp_directives",
+    ]
+    assert result["results"][0]["peak_memory"] is None
+
+    with pytest.raises(SystemExit) as err:
+        fparser2_bench.main(["--scale=-1"])
+    assert str(err.value) == "1"
+    _, stderr = capsys.readouterr()
+    assert "Error: The scale must be positive but got: -1.0" in stderr
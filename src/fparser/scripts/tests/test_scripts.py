@@ -285,6 +285,73 @@ def test_runner_multi_output_except(tmpdir, capsys):
     assert "broken.f90'" in stderr
 
 
+def test_runner_jobs(tmpdir, capsys):
+    """Test that the script outputs the code it has parsed, in the order of
+    the files specified, when using several processes.
+
+    """
+    my_file1 = tmpdir.mkdir("sub1").join("broken.f90")
+    my_file1.write("prog hello\nen\n")
+    my_file2 = tmpdir.mkdir("sub2").join("hello.f90")
+    my_file2.write("program hello\nend program hello\n")
+    my_file3 = tmpdir.mkdir("sub3").join("bye.f90")
+    my_file3.write("program bye\nend program bye\n")
+
+    class DummyArgsJobs(DummyArgs):
+        """dummy object pretending to be the argument options"""
+
+        jobs = 2
+
+    fparser2.runner(
+        None, DummyArgsJobs(), [my_file1.strpath, my_file2.strpath, my_file3.strpath]
+    )
+    stdout, stderr = capsys.readouterr()
+    assert stdout == (
+        "PROGRAM hello\nEND PROGRAM hello\nPROGRAM bye\nEND PROGRAM bye\n"
+    )
+    assert "Syntax error: at line 1\n>>>prog hello" in stderr
+    assert stderr.index("broken.f90'") < stderr.index("Syntax error")
+    assert stderr.index("Syntax error") < stderr.index("hello.f90'")
+    assert stderr.index("hello.f90'") < stderr.index("bye.f90'")
+
+    DummyArgsJobs.jobs = 0
+    with pytest.raises(SystemExit) as excinfo:
+        fparser2.runner(None, DummyArgsJobs(), [my_file2.strpath])
+    assert str(excinfo.value) == "1"
+    _, stderr = capsys.readouterr()
+    assert "Error: The number of jobs must be a positive integer but got '0'" in stderr
+
+
+def test_runner_profile(tmpdir, capsys):
+    """Test that the script prints a profile of the grammar rules to stderr
+    when --profile is specified and that this cannot be combined with
+    several jobs.
+
+    """
+    my_file = tmpdir.mkdir("sub").join("hello.f90")
+    my_file.write("program hello\nprint *, 'hello'\nend program hello\n")
+
+    class DummyArgsProfile(DummyArgs):
+        """dummy object pretending to be the argument options"""
+
+        profile = True
+
+    fparser2.runner(None, DummyArgsProfile(), [my_file.strpath])
+    stdout, stderr = capsys.readouterr()
+    assert stdout == "PROGRAM hello\n  PRINT *, 'hello'\nEND PROGRAM hello\n"
+    table = stderr.split("\n", 1)[1]
+    assert table.startswith("rule ")
+    assert "\nPrint_Stmt " in table
+    assert "\nBlockBase.match(Program_Stmt) " in table
+
+    DummyArgsProfile.jobs = 2
+    with pytest.raises(SystemExit) as excinfo:
+        fparser2.runner(None, DummyArgsProfile(), [my_file.strpath])
+    assert str(excinfo.value) == "1"
+    _, stderr = capsys.readouterr()
+    assert "Error: --profile cannot be used with --jobs" in stderr
+
+
 # fparser2.py script function main()
 
 
@@ -38,6 +38,12 @@ Test the setup performed for the fparser module.
 """
 
 import os
+import subprocess
+import sys
+from importlib.metadata import version
+
+import pytest
+import fparser
 
 
 def test_fparser_logging_handler(tmpdir, caplog):
@@ -68,3 +74,41 @@ def test_fparser_logging_handler(tmpdir, caplog):
         "codec can't decode byte 0xc3 in position 1: ordinal not in "
         "range(128)." in caplog.text
     )
+
+
+def test_fparser_version(monkeypatch):
+    """Test that the version of fparser is looked up from the package
+    metadata when it is first accessed."""
+    monkeypatch.delitem(vars(fparser), "__version__", raising=False)
+    assert fparser.__version__ == version("fparser")
+    assert vars(fparser)["__version__"] == version("fparser")
+    with pytest.raises(AttributeError) as err:
+        _ = fparser.not_an_attribute
+    assert "module 'fparser' has no attribute 'not_an_attribute'" in str(err.value)
+
+
+def test_fparser_import_cost():
+    """Test that importing the fparser2 parser does not import modules that
+    are expensive to import but are only needed in particular cases."""
+    code = (
+        "import sys\n"
+        "import fparser.two.parser, fparser.two.Fortran2003\n"
+        "for name in ('importlib.metadata', 'inspect', 'fparser.two.Fortran2008'):\n"
+        "    print(name, name in sys.modules)\n"
+    )
+    # Run without the site module (which may import any of these modules)
+    # but with the same path to fparser.
+    path = [os.path.dirname(os.path.dirname(fparser.__file__))] + sys.path
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    output = subprocess.run(
+        [sys.executable, "-S", "-c", code],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert output.split("\n")[:3] == [
+        "importlib.metadata False",
+        "inspect False",
+        "fparser.two.Fortran2008 False",
+    ]
@@ -70,9 +70,7 @@
 # Original author: Pearu Peterson <pearu@cens.ioc.ee>
 # First version created: Oct 2006
 
-import inspect
 import re
-import sys
 
 from typing import Union
 
@@ -87,6 +85,7 @@ from fparser.two.utils import (
     WORDClsBase,
     NumberBase,
     STRINGBase,
+    StringSet,
     BracketBase,
     StmtBase,
     EndStmtBase,
@@ -100,6 +99,7 @@ from fparser.two.utils import (
     SequenceBase,
     UnaryOpBase,
     walk,
+    clone_node,
     DynamicImport,
 )
 from fparser.two.utils import (
@@ -209,6 +209,16 @@ class Directive(Base):
         self.items = [comment.comment]
         self.item = comment
 
+    def __getnewargs__(self):
+        """Method to dictate the values passed to the __new__() method upon
+        unpickling (see `Base.__getnewargs__`). This node is created from
+        the comment object produced by the reader rather than a string.
+
+        :return: set of arguments for __new__
+        :rtype: tuple[:py:class:`readfortran.Comment`]
+        """
+        return (self.item,)
+
     def tostr(self) -> str:
         """
         :returns: this directive as a string.
@@ -270,6 +280,16 @@ class Comment(Base):
         self.items = [comment.comment]
         self.item = comment
 
+    def __getnewargs__(self):
+        """Method to dictate the values passed to the __new__() method upon
+        unpickling (see `Base.__getnewargs__`). This node is created from
+        the comment object produced by the reader rather than a string.
+
+        :return: set of arguments for __new__
+        :rtype: tuple[:py:class:`readfortran.Comment`]
+        """
+        return (self.item,)
+
     def tostr(self):
         """
         :returns: this comment as a string.
@@ -425,6 +445,67 @@ class Program(BlockBase):  # R201
             pass
         return (content,)
 
+    @staticmethod
+    def iter_units(reader):
+        """Parses the code in the supplied reader one program unit at a time,
+        yielding each unit (and any comments, includes and directives
+        between units) as soon as it has been matched. The nodes are the
+        same as those in the content of the Program that would be created
+        from the reader, except that, if a syntax error is found in a unit
+        and the rest of the code is instead matched as a main program
+        without a program statement, any units that have already been
+        yielded are not discarded. This allows each unit to be processed,
+        and then discarded, without waiting for (or holding) the parse
+        tree for the whole of the code.
+
+        :param reader: the fortran file reader containing the line(s)
+                       of code that we are trying to match
+        :type reader: :py:class:`fparser.common.readfortran.FortranFileReader`
+                      or
+                      :py:class:`fparser.common.readfortran.FortranStringReader`
+
+        :returns: a generator of the program units, comments, includes and \
+            directives in the code, in order.
+        :rtype: Iterator[:py:class:`fparser.two.utils.Base`]
+
+        :raises FortranSyntaxError: if the code is not valid Fortran.
+
+        """
+        try:
+            content = []
+            add_comments_includes_directives(content, reader)
+            yield from content
+            while True:
+                obj = Program_Unit(reader)
+                if obj:
+                    # obj could be None if there are only Comments
+                    yield obj
+                content = []
+                add_comments_includes_directives(content, reader)
+                yield from content
+                # cause a StopIteration exception if there are no more lines
+                next_line = reader.next()
+                # put the line back in the case where there are more lines
+                reader.put_item(next_line)
+        except NoMatchError:
+            # Found a syntax error. As in `match`, look to match the
+            # remaining code as a program containing no program statement.
+            try:
+                result = BlockBase.match(Main_Program0, [], None, reader)
+            except NoMatchError:
+                result = None
+            except InternalSyntaxError as excinfo:
+                raise FortranSyntaxError(reader, excinfo)
+            if not result:
+                raise FortranSyntaxError(reader, "")
+            yield from result[0]
+        except InternalSyntaxError as excinfo:
+            # See `Program.__new__`.
+            raise FortranSyntaxError(reader, excinfo)
+        except StopIteration:
+            # Reader has no more lines.
+            pass
+
 
 class Include_Filename(StringBase):  # pylint: disable=invalid-name
     """Implements the matching of a filename from an include statement."""
@@ -4869,7 +4950,9 @@ class Equivalence_Set(Base):  # R555
         line = string[1:-1].strip()
         if not line:
             return
-        tmp = Equivalence_Object_List(line)
+        # The list is modified below so take a copy in case the match has
+        # been memoized.
+        tmp = clone_node(Equivalence_Object_List(line))
         obj = tmp.items[0]
         tmp.items = tmp.items[1:]
         if not tmp.items:
@@ -9135,8 +9218,9 @@ class Io_Control_Spec_List(SequenceBase):
                 # We matched an unamed unit number. We now need to construct an
                 # Io_Control_Spec for it. In order to do so we have to
                 # temporarily name it so that Io_Control_Spec matches it.
-                io_spec = Io_Control_Spec("unit=" + spec)
-                # Remove the name from the new object
+                io_spec = clone_node(Io_Control_Spec("unit=" + spec))
+                # Remove the name from the new object (which is a copy in
+                # case the match has been memoized).
                 io_spec.items = (None, io_spec.items[1])
                 lst.append(io_spec)
                 # Record that we have found a unit number for the purpose of
@@ -9158,7 +9242,7 @@ class Io_Control_Spec_List(SequenceBase):
                             # We have a match on an un-named entry. We
                             # temporarily add the name so that Io_Control_Spec
                             # matches the correct one.
-                            io_spec = Io_Control_Spec(name + "=" + spec)
+                            io_spec = clone_node(Io_Control_Spec(name + "=" + spec))
                             # Remove the name from the new object
                             io_spec.items = (None, io_spec.items[1])
                             lst.append(io_spec)
@@ -12456,9 +12540,20 @@ class Intrinsic_Name(STRINGBase):  # No explicit rule
     function_names = list(generic_function_names.keys()) + list(
         specific_function_names.keys()
     )
+    # The same names as a set so that they can be matched in constant time.
+    # This is rebuilt for each subclass (see `__init_subclass__`).
+    function_name_set = StringSet(function_names)
 
     subclass_names = []
 
+    def __init_subclass__(cls, **kwargs):
+        """Builds the set of function names of a subclass from its own
+        `function_names`, which it may override.
+
+        """
+        super().__init_subclass__(**kwargs)
+        cls.function_name_set = StringSet(cls.function_names)
+
     @classmethod
     def match(cls, string):
         """Attempt to match the input `string` with the intrinsic function
@@ -12473,7 +12568,7 @@ class Intrinsic_Name(STRINGBase):  # No explicit rule
         :rtype: (str,) or NoneType
 
         """
-        return STRINGBase.match(cls.function_names, string)
+        return STRINGBase.match(cls.function_name_set, string)
 
 
 class Intrinsic_Function_Reference(CallBase):  # No explicit rule
@@ -12521,14 +12616,9 @@ class Intrinsic_Function_Reference(CallBase):  # No explicit rule
         # Check that that this name is not being shadowed (i.e. overridden)
         # by a symbol in scope at this point.
         table = SYMBOL_TABLES.current_scope
-        try:
-            table.lookup(function_name)
+        if table is not None and table.has_symbol(function_name):
             # We found a matching name so refuse to match this intrinsic.
             return None
-        except (KeyError, AttributeError):
-            # There is either no matching name in the table or we have
-            # no current scoping region.
-            pass
 
         nargs = 0 if function_args is None else len(function_args.items)
         if function_name in intrinsic_type.specific_function_names.keys():
@@ -13269,10 +13359,44 @@ class Stmt_Function_Stmt(StmtBase):  # R1238
 #
 
 
+def _sequence_match(name):
+    """
+    :param str name: the name of the class that matches the items of a \
+        comma-separated list.
+
+    :returns: the `match` method of the class for such a list. The class \
+        of the items is looked up in this module when the method is called \
+        as it may be generated after the list class.
+    :rtype: Callable[[str], Optional[Tuple[str, Tuple[Base, ...]]]]
+
+    """
+
+    def match(string):
+        return SequenceBase.match(r",", globals()[name], string)
+
+    return match
+
+
+def _generate_class(name, base, subclass_names, **attributes):
+    """
+    Creates a class in this module (as if it had been defined here) without
+    compiling any source code.
+
+    :param str name: the name of the class.
+    :param type base: the base class.
+    :param subclass_names: the names of the subclasses of the class.
+    :type subclass_names: List[str]
+    :param attributes: any additional attributes of the class.
+
+    """
+    attributes.update({"__module__": __name__, "subclass_names": subclass_names})
+    globals()[name] = type(name, (base,), attributes)
+
+
 ClassType = type(Base)
 _names = dir()
 for clsname in _names:
-    my_cls = eval(clsname)
+    my_cls = globals()[clsname]
     if not (
         isinstance(my_cls, ClassType)
         and issubclass(my_cls, Base)
@@ -13286,29 +13410,16 @@ for clsname in _names:
             continue
         if n.endswith("_List"):
             _names.append(n)
-            n = n[:-5]
             # Generate 'list' class
-            exec("""\
-class %s_List(SequenceBase):
-    subclass_names = [\'%s\']
-    use_names = []
-    def match(string): return SequenceBase.match(r\',\', %s, string)
-
-""" % (n, n, n))
+            _generate_class(
+                n, SequenceBase, [n[:-5]], use_names=[], match=_sequence_match(n[:-5])
+            )
         elif n.endswith("_Name"):
             _names.append(n)
-            n = n[:-5]
-            exec("""\
-class %s_Name(Base):
-    subclass_names = [\'Name\']
-""" % (n))
+            _generate_class(n, Base, ["Name"])
         elif n.startswith("Scalar_"):
             _names.append(n)
-            n = n[7:]
-            exec("""\
-class Scalar_%s(Base):
-    subclass_names = [\'%s\']
-""" % (n, n))
+            _generate_class(n, Base, [n[7:]])
 
 
 DynamicImport().import_now()
@@ -13317,9 +13428,8 @@ DynamicImport().import_now()
 # Inspect the contents of this module and list all of the classes in __all__
 # for automatic documentation generation with AutoDoc.
 
-classes = inspect.getmembers(
-    sys.modules[__name__],
-    lambda member: inspect.isclass(member) and member.__module__ == __name__,
+__all__ = sorted(
+    name
+    for name, member in globals().items()
+    if isinstance(member, type) and member.__module__ == __name__
 )
-
-__all__ = [name[0] for name in classes]
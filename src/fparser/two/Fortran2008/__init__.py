@@ -38,9 +38,6 @@ Fortran 2008 module. Contains classes which extend the Fortran
 
 """
 
-import inspect
-import sys
-
 from fparser.two.Fortran2003 import Base, SequenceBase
 from fparser.two.Fortran2008.program_unit_r202 import Program_Unit
 from fparser.two.Fortran2008.executable_construct_r213 import Executable_Construct
@@ -160,8 +157,8 @@ NEW_CLS = None
 # Determine the generated classes in this module and list these in
 # __all__ to support automatic documentation generation with AutoDoc.
 
-classes = inspect.getmembers(
-    sys.modules[__name__],
-    lambda member: inspect.isclass(member) and member.__module__ == __name__,
+__all__ = sorted(
+    name
+    for name, member in globals().items()
+    if isinstance(member, type) and member.__module__ == __name__
 )
-__all__ = [name[0] for name in classes if name[0]]
@@ -0,0 +1,397 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Parses Fortran source from asyncio code. An `AsyncParser` hands each
+request to one of a pool of worker processes, each of which keeps a
+parser context (see :py:class:`fparser.two.context.ParserContext`) for
+the whole of its lifetime, so that the event loop is never blocked by
+parsing and many requests may be in flight at once. A request may be
+given a timeout and may be cancelled, in which case the worker process
+handling it is replaced by a new one.
+
+For example:
+
+>>> import asyncio
+>>> from fparser.two.async_parser import AsyncParser
+>>> async def main():
+...     async with AsyncParser(std="f2008", jobs=2) as parser:
+...         result = await parser.parse_source(
+...             "program test\\nend program test\\n", output="fortran"
+...         )
+...         print(result.result)
+>>> asyncio.run(main())
+PROGRAM test
+END PROGRAM test
+
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fparser.two.parallel import OUTPUTS, ParseResult, _init_worker, _parse
+
+# The error reported for a request that was waiting for an idle worker
+# when the parser was closed.
+_CLOSED = "The parser was closed before the request was parsed"
+
+
+def _serve(connection, std, packrat):
+    """
+    Sets up the parser context of a worker process and then parses the
+    requests received on the connection until it receives None or is
+    closed.
+
+    :param connection: the worker's end of the connection to the parent.
+    :type connection: :py:class:`multiprocessing.connection.Connection`
+    :param str std: the Fortran standard.
+    :param bool packrat: whether or not to memoize the outcome of matches.
+
+    """
+    _init_worker(std, packrat)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        connection.send(_parse(*request))
+    connection.close()
+
+
+class _Worker:
+    """
+    A worker process and the connection used to send it requests.
+
+    :param str std: the Fortran standard.
+    :param bool packrat: whether or not to memoize the outcome of matches.
+
+    """
+
+    def __init__(self, std, packrat):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, std, packrat), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def stop(self, timeout=None):
+        """
+        Waits for the process to finish and terminates it if it has not
+        done so within the timeout.
+
+        :param timeout: the time to wait in seconds.
+        :type timeout: Optional[float]
+
+        """
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class AsyncParser:
+    """
+    Parses Fortran source using a pool of worker processes, returning
+    awaitable results. The workers are started by `start` (or on entering
+    the parser as an asynchronous context manager, or by the first
+    request) and stopped by `close`.
+
+    :param str std: the Fortran standard. Choices are 'f2003' or \
+                    'f2008'. 'f2003' is the default.
+    :param int jobs: the number of worker processes and hence the \
+        maximum number of requests parsed at the same time. The default \
+        is the number of CPUs.
+    :param bool packrat: whether or not to memoize the outcome of matches \
+        (see :py:class:`fparser.two.utils.PackratCache`). The default is \
+        False.
+    :param timeout: the default time limit, in seconds, for each request. \
+        The default is None (no limit).
+    :type timeout: Optional[float]
+
+    :raises ValueError: if the number of jobs is not a positive integer.
+    :raises ValueError: if the supplied value for the std parameter \
+        is invalid.
+
+    """
+
+    def __init__(self, std=None, jobs=None, packrat=False, timeout=None):
+        # pylint: disable=import-outside-toplevel
+        from fparser.two.parser import ParserFactory
+
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if not isinstance(jobs, int) or jobs < 1:
+            raise ValueError(
+                f"The number of jobs must be a positive integer but got '{jobs}'"
+            )
+        if not std:
+            std = "f2003"
+        # Check the standard before starting any processes.
+        # pylint: disable=protected-access
+        ParserFactory()._hierarchy(std)
+        self.std = std
+        self.jobs = jobs
+        self.packrat = packrat
+        self.timeout = timeout
+        self._workers = None
+        self._idle = None
+        self._threads = None
+        # The number of requests waiting for an idle worker.
+        self._waiting = 0
+
+    async def start(self):
+        """
+        Starts the worker processes, if they are not already running.
+
+        """
+        if self._workers is not None:
+            return
+        self._threads = ThreadPoolExecutor(max_workers=self.jobs)
+        self._idle = asyncio.Queue()
+        self._workers = workers = []
+        loop = asyncio.get_running_loop()
+        # Starting a process blocks, so it is done outside the event loop.
+        new_workers = await asyncio.gather(
+            *[
+                loop.run_in_executor(None, _Worker, self.std, self.packrat)
+                for _ in range(self.jobs)
+            ]
+        )
+        for worker in new_workers:
+            await self._add_worker(worker, workers)
+
+    async def _add_worker(self, worker, workers):
+        """
+        Makes a new worker process available for requests, or stops it if
+        the parser has been closed since it was started.
+
+        :param worker: the new worker.
+        :type worker: :py:class:`fparser.two.async_parser._Worker`
+        :param workers: the workers of the parser when the new worker \
+            was started.
+        :type workers: List[:py:class:`fparser.two.async_parser._Worker`]
+
+        """
+        if workers is self._workers:
+            workers.append(worker)
+            self._idle.put_nowait(worker)
+        else:
+            worker.connection.send(None)
+            await asyncio.get_running_loop().run_in_executor(None, worker.stop)
+
+    async def _replace_worker(self, worker):
+        """
+        Terminates a worker process (which may be in the middle of a
+        request) and starts a new one in its place unless the parser has
+        been closed.
+
+        :param worker: the worker to replace.
+        :type worker: :py:class:`fparser.two.async_parser._Worker`
+
+        """
+        workers = self._workers
+        worker.process.terminate()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, worker.stop)
+        if workers is not None and worker in workers:
+            workers.remove(worker)
+            new_worker = await loop.run_in_executor(
+                None, _Worker, self.std, self.packrat
+            )
+            await self._add_worker(new_worker, workers)
+
+    async def close(self):
+        """
+        Stops the worker processes. Requests that are still being parsed
+        are allowed to finish for a short time, after which their worker
+        processes are terminated. Requests that are waiting for an idle
+        worker are not parsed and their results report that the parser
+        was closed. A parser may be started again after it has been
+        closed.
+
+        """
+        if self._workers is None:
+            return
+        workers, self._workers = self._workers, None
+        threads, self._threads = self._threads, None
+        idle, self._idle = self._idle, None
+        # Wake every waiting request.
+        for _ in range(self._waiting):
+            idle.put_nowait(None)
+        for worker in workers:
+            try:
+                worker.connection.send(None)
+            except (OSError, ValueError):
+                pass
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, lambda: [worker.stop(timeout=1.0) for worker in workers]
+        )
+        threads.shutdown(wait=False)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _request(self, request, timeout):
+        """
+        Sends a request to the next idle worker process and waits for the
+        outcome. If the request times out or is cancelled then the worker
+        is replaced. If the parser is closed while the request is waiting
+        for an idle worker then the result reports this.
+
+        :param request: the arguments to :py:func:`fparser.two.parallel._parse`.
+        :type request: Tuple[str, str, bool, Optional[str]]
+        :param timeout: the time limit for the request, in seconds.
+        :type timeout: Optional[float]
+
+        :returns: the outcome of parsing.
+        :rtype: :py:class:`fparser.two.parallel.ParseResult`
+
+        :raises asyncio.TimeoutError: if the request is not complete \
+            within the timeout.
+
+        """
+        filename, output = request[0], request[1]
+        if output not in OUTPUTS:
+            raise ValueError(f"The output must be one of {OUTPUTS} but got '{output}'")
+        await self.start()
+        idle = self._idle
+        if idle is None:
+            return ParseResult(filename, None, _CLOSED)
+        if timeout is None:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        # Waiting for an idle worker counts towards the time limit.
+        self._waiting += 1
+        try:
+            worker = await asyncio.wait_for(idle.get(), timeout)
+        finally:
+            self._waiting -= 1
+        if worker is None or idle is not self._idle:
+            # The parser has been closed.
+            return ParseResult(filename, None, _CLOSED)
+        threads = self._threads
+        try:
+            worker.connection.send(request)
+            remaining = None if deadline is None else max(0, deadline - loop.time())
+            result = await asyncio.wait_for(
+                loop.run_in_executor(threads, worker.connection.recv), remaining
+            )
+        except asyncio.TimeoutError:
+            # This must come first as it is an OSError in Python >= 3.11.
+            await self._replace_worker(worker)
+            raise
+        except (EOFError, OSError):
+            await self._replace_worker(worker)
+            return ParseResult(
+                filename, None, "Internal error in fparser: the worker process ended"
+            )
+        except BaseException:
+            # Cancelled. The worker is replaced even if the request is
+            # cancelled again.
+            await asyncio.shield(self._replace_worker(worker))
+            raise
+        if idle is self._idle:
+            idle.put_nowait(worker)
+        return result
+
+    async def parse_source(
+        self, source, output="tree", ignore_comments=False, timeout=None, name=None
+    ):
+        """
+        Parses Fortran source held in a string.
+
+        :param str source: the Fortran source.
+        :param str output: the output required: "tree" for the parse \
+            tree, "fortran" for the Fortran generated from the parse tree \
+            (`tofortran()`), "repr" for its representation or "none" if \
+            only the outcome of the parse is required. The default is \
+            "tree".
+        :param bool ignore_comments: whether or not to discard comments. \
+            The default is False.
+        :param timeout: the time limit for this request, in seconds. The \
+            default is the timeout of the parser.
+        :type timeout: Optional[float]
+        :param name: a name identifying the source, which is stored as \
+            the `filename` of the result.
+        :type name: Optional[str]
+
+        :returns: the outcome of parsing the source.
+        :rtype: :py:class:`fparser.two.parallel.ParseResult`
+
+        :raises ValueError: if the type of output is not supported.
+        :raises asyncio.TimeoutError: if the source is not parsed within \
+            the time limit.
+
+        """
+        return await self._request((name, output, ignore_comments, source), timeout)
+
+    async def parse_file(
+        self, filename, output="tree", ignore_comments=False, timeout=None
+    ):
+        """
+        Parses the named Fortran source file.
+
+        :param str filename: the file to parse.
+        :param str output: the output required (see `parse_source`).
+        :param bool ignore_comments: whether or not to discard comments. \
+            The default is False.
+        :param timeout: the time limit for this request, in seconds. The \
+            default is the timeout of the parser.
+        :type timeout: Optional[float]
+
+        :returns: the outcome of parsing the file.
+        :rtype: :py:class:`fparser.two.parallel.ParseResult`
+
+        :raises ValueError: if the type of output is not supported.
+        :raises asyncio.TimeoutError: if the file is not parsed within \
+            the time limit.
+
+        """
+        return await self._request((filename, output, ignore_comments, None), timeout)
+
+
+__all__ = ["AsyncParser"]
@@ -0,0 +1,235 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+The fparser2 parser-context module. A ParserContext holds everything that
+fparser2 needs in order to parse code for a particular Fortran standard,
+i.e. the class hierarchy for that standard, the symbol tables and the
+packrat cache. Unlike a parser obtained from `ParserFactory().create()`,
+which uses global state, any number of contexts (e.g. for different
+standards) may coexist and a context may be used to parse code in several
+threads at the same time.
+
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class _ThreadState(threading.local):
+    """Records the parser context (if any) that is active on the current
+    thread. If there is none then the global state set up by
+    `ParserFactory().create()` is used."""
+
+    context = None
+
+
+#: The state of the current thread.
+THREAD_STATE = _ThreadState()
+
+
+def get_active_context():
+    """
+    :returns: the parser context that is active on the current thread or \
+        None if there is none (in which case the global state set up by \
+        `ParserFactory().create()` is used).
+    :rtype: Optional[:py:class:`fparser.two.context.ParserContext`]
+
+    """
+    return THREAD_STATE.context
+
+
+class ParserContext:
+    """
+    Holds the state used when parsing code for a particular Fortran
+    standard. The class hierarchy is shared by all threads using the
+    context (and is not modified while parsing) but each thread has its
+    own symbol tables and packrat cache. Instances should be created with
+    `ParserFactory().create_context()`.
+
+    Calling the context parses the code in the supplied reader:
+
+    >>> from fparser.two.parser import ParserFactory
+    >>> f2008_context = ParserFactory().create_context(std="f2008")
+    >>> # Assuming that a reader has already been created ...
+    >>> ast = f2008_context(reader)
+
+    :param str std: the Fortran standard.
+    :param subclasses: the subclasses of each class in the class hierarchy.
+    :type subclasses: Dict[str, List[type]]
+    :param subclass_index: the keyword indices of the lists of subclasses \
+        that contain statements.
+    :type subclass_index: Dict[str, :py:class:`fparser.two.utils.KeywordIndex`]
+    :param bool packrat: whether or not to memoize the outcome of matches \
+        (see :py:class:`fparser.two.utils.PackratCache`).
+    :param bool compact: whether or not to release the memory used only \
+        while parsing from each parse tree that is returned (see \
+        :py:func:`fparser.two.utils.compact_tree`).
+
+    """
+
+    def __init__(self, std, subclasses, subclass_index, packrat=False, compact=False):
+        self.std = std
+        self.subclasses = subclasses
+        self.subclass_index = subclass_index
+        self.packrat = packrat
+        self.compact = compact
+        # The symbol tables and packrat cache of each thread.
+        self._local = threading.local()
+
+    def _thread_state(self):
+        """
+        :returns: the state of this context for the current thread, creating \
+            it if necessary.
+        :rtype: :py:class:`threading.local`
+
+        """
+        local = self._local
+        if not hasattr(local, "symbol_tables"):
+            # pylint: disable=import-outside-toplevel
+            from fparser.two.symbol_table import SymbolTables
+            from fparser.two.utils import PackratCache
+
+            local.symbol_tables = SymbolTables()
+            local.packrat_cache = PackratCache()
+            local.packrat_cache.enable(self.packrat)
+        return local
+
+    @property
+    def symbol_tables(self):
+        """
+        :returns: the symbol tables of the current thread. These hold the \
+            symbols from the most recent parse performed by this thread.
+        :rtype: :py:class:`fparser.two.symbol_table.SymbolTables`
+
+        """
+        return self._thread_state().symbol_tables
+
+    @property
+    def packrat_cache(self):
+        """
+        :returns: the packrat cache of the current thread.
+        :rtype: :py:class:`fparser.two.utils.PackratCache`
+
+        """
+        return self._thread_state().packrat_cache
+
+    @contextmanager
+    def activate(self):
+        """
+        Makes this the active context on the current thread for the
+        duration of a `with` block. This allows individual rules to be
+        matched using this context, e.g.:
+
+        >>> with f2008_context.activate():
+        ...     stmt = Fortran2003.Assignment_Stmt("a = b")
+
+        Contexts may be nested, with the previously-active context
+        (if any) being restored at the end of the block.
+
+        """
+        previous = THREAD_STATE.context
+        THREAD_STATE.context = self
+        try:
+            yield self
+        finally:
+            THREAD_STATE.context = previous
+
+    def __call__(self, reader):
+        """
+        Parses the code in the supplied reader. Any symbol tables created
+        by a previous parse in the current thread are discarded.
+
+        :param reader: the reader containing the code to parse.
+        :type reader: :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+        :returns: the parse tree.
+        :rtype: :py:class:`fparser.two.Fortran2003.Program`
+
+        :raises FortranSyntaxError: if the code is not valid Fortran.
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from fparser.two import Fortran2003
+        from fparser.two.utils import compact_tree
+
+        state = self._thread_state()
+        state.symbol_tables.clear()
+        state.packrat_cache.clear()
+        with self.activate():
+            tree = Fortran2003.Program(reader)
+        if self.compact and tree is not None:
+            compact_tree(tree)
+        return tree
+
+    def iter_units(self, reader):
+        """
+        Parses the code in the supplied reader one program unit at a time
+        (see :py:meth:`fparser.two.Fortran2003.Program.iter_units`). Any
+        symbol tables created by a previous parse in the current thread are
+        discarded. This context is only active on the current thread while
+        the next unit is being parsed.
+
+        :param reader: the reader containing the code to parse.
+        :type reader: :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+        :returns: a generator of the program units, comments, includes and \
+            directives in the code, in order.
+        :rtype: Iterator[:py:class:`fparser.two.utils.Base`]
+
+        :raises FortranSyntaxError: if the code is not valid Fortran.
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from fparser.two import Fortran2003
+        from fparser.two.utils import compact_tree
+
+        state = self._thread_state()
+        state.symbol_tables.clear()
+        state.packrat_cache.clear()
+        units = Fortran2003.Program.iter_units(reader)
+        while True:
+            with self.activate():
+                unit = next(units, None)
+            if unit is None:
+                return
+            if self.compact:
+                compact_tree(unit)
+            yield unit
+
+    def __repr__(self):
+        return f"ParserContext(std='{self.std}', packrat={self.packrat})"
+
+
+__all__ = ["ParserContext", "get_active_context"]
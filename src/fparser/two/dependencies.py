@@ -0,0 +1,457 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Scans Fortran source files for the modules that they provide and use
+(and the files that they include) without parsing them, so that build
+systems can determine the order in which the files must be compiled.
+
+Only the lines that may hold MODULE, SUBMODULE, USE, INCLUDE or CPP
+``#include`` statements (together with any continuation lines) are
+passed to a Fortran reader, which deals with continuations, comments
+and the source format. All other lines are discarded without being
+processed, which makes scanning much faster than parsing.
+
+For example:
+
+>>> from fparser.two.dependencies import DependencyGraph, scan_files
+>>> graph = DependencyGraph(scan_files(filenames, jobs=4))
+>>> for filename in graph.compile_order():
+...     print(filename, graph.dependencies(filename))
+
+"""
+
+import io
+import json
+import heapq
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from fparser.common.readfortran import FortranStringReader
+from fparser.common.sourceinfo import FortranFormat, get_source_info_lines
+
+#: The outcome of scanning a single file. `provides` holds the names of
+#: the modules (and, as "<ancestor>:<name>", the submodules) defined in
+#: the file, `uses` the names of the (non-intrinsic) modules and ancestors
+#: of submodules that it uses and `includes` the names of the files that
+#: it includes, all sorted. If the file could not be read, `error` holds a
+#: description of the error.
+ScanResult = namedtuple(
+    "ScanResult", ["filename", "provides", "uses", "includes", "error"]
+)
+
+# Matches the start of the lines that may begin a statement of interest
+# (in source that is preceded by a newline). Starting with a literal
+# newline makes the search much faster than using '^' with re.M.
+_CANDIDATE = re.compile(
+    r"\n[ \t]*(?:\d+[ \t]+)?(?:module|submodule|use|include|#[ \t]*include)\b",
+    re.I,
+)
+_MODULE = re.compile(r"module\s+(?P<name>[a-z]\w*)\s*\Z", re.I)
+_SUBMODULE = re.compile(
+    r"submodule\s*\(\s*(?P<ancestor>[a-z]\w*)\s*(?::\s*(?P<parent>[a-z]\w*)\s*)?"
+    r"\)\s*(?P<name>[a-z]\w*)\s*\Z",
+    re.I,
+)
+_USE = re.compile(
+    r"use\b\s*(?:,\s*(?P<nature>intrinsic|non_intrinsic)\s*)?(?:::)?\s*"
+    r"(?P<name>[a-z]\w*)",
+    re.I,
+)
+_INCLUDE = re.compile(r"include\s*(?P<quote>['\"])(?P<name>.+)(?P=quote)\s*\Z", re.I)
+_CPP_INCLUDE = re.compile(r"#\s*include\s*[\"<](?P<name>[^\">]+)[\">]")
+# Matches the characters that mean a statement is left to the reader.
+_SPECIAL = re.compile(r"[&;!'\"]")
+_LABEL = re.compile(r"\A\d+\s+")
+
+
+def _is_fixed_continuation(line):
+    """
+    :returns: whether or not the supplied line of fixed-format source is a \
+        continuation line.
+    :rtype: bool
+    """
+    return len(line) > 5 and line[0] not in "\t!*cC" and line[5] not in " 0"
+
+
+def _is_comment(line, fixed):
+    """
+    :returns: whether or not the supplied line is blank or a comment.
+    :rtype: bool
+    """
+    stripped = line.lstrip()
+    return not stripped or stripped[0] == "!" or (fixed and line[0] in "*cC")
+
+
+def _continues(line):
+    """
+    :returns: whether or not the supplied line of free-format source is \
+        continued on the next line.
+    :rtype: bool
+    """
+    return line.rstrip().endswith("&") or line.split("!", 1)[0].rstrip().endswith("&")
+
+
+def _candidate_statements(text, fixed):
+    """
+    Finds the lines of the supplied source that may begin a statement of
+    interest, together with their continuation lines.
+
+    :param str text: the Fortran source.
+    :param bool fixed: whether or not the source is in fixed format.
+
+    :returns: the lines of each candidate statement, in order.
+    :rtype: List[List[str]]
+
+    """
+    lines = None
+    statements = []
+    last = -1
+    line_number = -1
+    position = 0
+    text = "\n" + text
+    for match in _CANDIDATE.finditer(text):
+        if lines is None:
+            lines = text[1:].split("\n")
+        # The match starts with the newline that precedes the line.
+        line_number += text.count("\n", position, match.start() + 1)
+        position = match.start() + 1
+        if line_number <= last:
+            # Already selected as a continuation of a previous line.
+            continue
+        line = lines[line_number]
+        if fixed:
+            if _is_fixed_continuation(line):
+                continue
+        elif line.lstrip()[:1] != "#":
+            # Skip a line that continues a previous statement.
+            previous = line_number - 1
+            while previous >= 0 and _is_comment(lines[previous], False):
+                previous -= 1
+            if previous >= 0 and _continues(lines[previous]):
+                continue
+        statement = [line]
+        last = line_number
+        if fixed:
+            while last + 1 < len(lines) and (
+                _is_fixed_continuation(lines[last + 1])
+                or _is_comment(lines[last + 1], True)
+                and last + 2 < len(lines)
+                and _is_fixed_continuation(lines[last + 2])
+            ):
+                last += 1
+                statement.append(lines[last])
+        elif line.lstrip()[:1] != "#":
+            while _continues(lines[last]) and last + 1 < len(lines):
+                last += 1
+                statement.append(lines[last])
+        statements.append(statement)
+    return statements
+
+
+def _classify(line, provides, uses, includes):
+    """
+    Adds any module provided or used, or file included, by the supplied
+    statement to the appropriate set.
+
+    :param str line: the statement (without any label).
+    :param provides: the modules (and submodules) provided.
+    :type provides: Set[str]
+    :param uses: the modules (and ancestors of submodules) used.
+    :type uses: Set[str]
+    :param includes: the files included.
+    :type includes: Set[str]
+
+    """
+    keyword = line[:3].lower()
+    if keyword == "use":
+        match = _USE.match(line)
+        if match and (match.group("nature") or "").lower() != "intrinsic":
+            uses.add(match.group("name").lower())
+    elif keyword == "mod":
+        match = _MODULE.match(line)
+        if match:
+            provides.add(match.group("name").lower())
+    elif keyword == "sub":
+        match = _SUBMODULE.match(line)
+        if match:
+            ancestor = match.group("ancestor").lower()
+            provides.add(f"{ancestor}:{match.group('name').lower()}")
+            uses.add(ancestor)
+            if match.group("parent"):
+                uses.add(f"{ancestor}:{match.group('parent').lower()}")
+    elif keyword == "inc":
+        match = _INCLUDE.match(line)
+        if match:
+            includes.add(match.group("name"))
+    elif keyword[:1] == "#":
+        match = _CPP_INCLUDE.match(line)
+        if match:
+            includes.add(match.group("name"))
+
+
+def scan_source(text, filename=None, mode=None):
+    """
+    Scans Fortran source for the modules that it provides and uses and
+    the files that it includes.
+
+    :param str text: the Fortran source.
+    :param filename: the name of the file holding the source (if any).
+    :type filename: Optional[str]
+    :param mode: the format of the source. If this is not supplied it is \
+        determined from the source (and the extension of the filename).
+    :type mode: Optional[:py:class:`fparser.common.sourceinfo.FortranFormat`]
+
+    :returns: the outcome of scanning the source.
+    :rtype: :py:class:`fparser.two.dependencies.ScanResult`
+
+    """
+    if mode is None:
+        if filename and os.path.splitext(filename)[1] == ".pyf":
+            mode = FortranFormat(True, True)
+        else:
+            mode = get_source_info_lines(io.StringIO(text))
+    provides = set()
+    uses = set()
+    includes = set()
+    # The statements that must be processed by a Fortran reader.
+    lines = []
+    for statement in _candidate_statements(text, mode.is_fixed):
+        line = statement[0]
+        if mode.is_fixed or len(statement) > 1 or _SPECIAL.search(line):
+            lines.extend(statement)
+        else:
+            # A simple, free-format statement on a single line.
+            _classify(_LABEL.sub("", line.strip()), provides, uses, includes)
+    if lines:
+        reader = FortranStringReader("\n".join(lines), ignore_comments=True)
+        reader.set_format(mode)
+        while True:
+            try:
+                # The reader must not process the INCLUDE lines itself.
+                # pylint: disable=protected-access
+                item = reader._next()
+            except StopIteration:
+                break
+            _classify(item.line, provides, uses, includes)
+    # A module is not a dependency of the file that provides it.
+    uses -= provides
+    return ScanResult(filename, sorted(provides), sorted(uses), sorted(includes), None)
+
+
+def scan_file(filename):
+    """
+    Scans the named Fortran source file for the modules that it provides
+    and uses and the files that it includes.
+
+    :param str filename: the file to scan.
+
+    :returns: the outcome of scanning the file.
+    :rtype: :py:class:`fparser.two.dependencies.ScanResult`
+
+    """
+    try:
+        # The 'fparser-logging' error handler is set up in fparser/__init__.py.
+        with open(filename, "r", encoding="utf-8", errors="fparser-logging") as file:
+            text = file.read()
+    except IOError as error:
+        return ScanResult(filename, [], [], [], str(error))
+    return scan_source(text, filename)
+
+
+def scan_files(filenames, jobs=None):
+    """
+    Scans the named Fortran source files, spreading them over a pool of
+    `jobs` processes. An error when reading one file does not prevent the
+    other files from being scanned: it is recorded in the result for that
+    file instead.
+
+    :param filenames: the files to scan.
+    :type filenames: Iterable[str]
+    :param int jobs: the number of processes to use. If this is 1 then \
+        the files are scanned in the current process. The default is the \
+        number of CPUs.
+
+    :returns: the outcome of scanning each file, in the same order as the \
+        supplied filenames.
+    :rtype: List[:py:class:`fparser.two.dependencies.ScanResult`]
+
+    :raises ValueError: if the number of jobs is not a positive integer.
+
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if not isinstance(jobs, int) or jobs < 1:
+        raise ValueError(
+            f"The number of jobs must be a positive integer but got '{jobs}'"
+        )
+    filenames = list(filenames)
+    if jobs == 1 or len(filenames) <= 1:
+        return [scan_file(filename) for filename in filenames]
+    jobs = min(jobs, len(filenames))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Scanning a file is quick so hand the files out in batches.
+        chunksize = max(1, len(filenames) // (4 * jobs))
+        return list(executor.map(scan_file, filenames, chunksize=chunksize))
+
+
+class DependencyGraph:
+    """
+    The graph of the dependencies between Fortran source files that are
+    due to the modules (and submodules) that they provide and use.
+
+    :param results: the outcomes of scanning the files (see `scan_files`).
+    :type results: Iterable[:py:class:`fparser.two.dependencies.ScanResult`]
+
+    """
+
+    def __init__(self, results):
+        #: The outcomes of scanning the files, in order.
+        self.results = list(results)
+        #: The file that provides each module (the first one if more than \
+        #: one does).
+        self.providers = {}
+        #: The files that provide each module that is provided by more than \
+        #: one file.
+        self.duplicates = {}
+        #: The files that use each module that is not provided by any of \
+        #: the files (e.g. intrinsic modules or those from libraries).
+        self.external = {}
+        for result in self.results:
+            for name in result.provides:
+                if name in self.providers:
+                    files = self.duplicates.setdefault(name, [self.providers[name]])
+                    files.append(result.filename)
+                else:
+                    self.providers[name] = result.filename
+        self._dependencies = {}
+        for result in self.results:
+            dependencies = []
+            for name in result.uses:
+                provider = self.providers.get(name)
+                if provider is None:
+                    self.external.setdefault(name, []).append(result.filename)
+                elif provider != result.filename and provider not in dependencies:
+                    dependencies.append(provider)
+            self._dependencies[result.filename] = dependencies
+
+    def dependencies(self, filename):
+        """
+        :param str filename: the name of a scanned file.
+
+        :returns: the files providing the modules used by the named file.
+        :rtype: List[str]
+
+        :raises KeyError: if the named file has not been scanned.
+
+        """
+        return self._dependencies[filename][:]
+
+    def compile_order(self):
+        """
+        :returns: the files in an order in which they can be compiled, \
+            i.e. with every file after the files that it depends on. \
+            Otherwise, the files are kept in the order in which they were \
+            scanned.
+        :rtype: List[str]
+
+        :raises ValueError: if there is a circular dependency between files.
+
+        """
+        filenames = [result.filename for result in self.results]
+        index = {filename: position for position, filename in enumerate(filenames)}
+        dependents = {filename: [] for filename in filenames}
+        remaining = {}
+        for filename in filenames:
+            remaining[filename] = len(self._dependencies[filename])
+            for dependency in self._dependencies[filename]:
+                dependents[dependency].append(filename)
+        ready = [index[filename] for filename in filenames if not remaining[filename]]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            filename = filenames[heapq.heappop(ready)]
+            order.append(filename)
+            for dependent in dependents[filename]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    heapq.heappush(ready, index[dependent])
+        if len(order) < len(filenames):
+            cycle = [filename for filename in filenames if remaining[filename]]
+            raise ValueError(
+                f"There is a circular dependency between the files {cycle}"
+            )
+        return order
+
+    def as_dict(self):
+        """
+        :returns: the graph as a dictionary (suitable for serialising) \
+            holding, for each file, the modules that it provides and uses, \
+            the files that it includes, the files that it depends on and \
+            any error, as well as the compile order.
+        :rtype: Dict[str, Any]
+
+        """
+        files = {}
+        for result in self.results:
+            files[result.filename] = {
+                "provides": result.provides,
+                "uses": result.uses,
+                "includes": result.includes,
+                "depends_on": self._dependencies[result.filename],
+                "error": result.error,
+            }
+        return {
+            "files": files,
+            "external": self.external,
+            "duplicates": self.duplicates,
+            "compile_order": self.compile_order(),
+        }
+
+    def to_json(self, indent=None):
+        """
+        :param indent: the indentation of the JSON (see `json.dumps`).
+        :type indent: Optional[int]
+
+        :returns: the graph (see `as_dict`) as JSON.
+        :rtype: str
+
+        """
+        return json.dumps(self.as_dict(), indent=indent)
+
+
+__all__ = ["DependencyGraph", "ScanResult", "scan_file", "scan_files", "scan_source"]
@@ -0,0 +1,461 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+Incremental re-parsing of Fortran source that is being edited (e.g. in an
+editor or a language server). After an edit, only the program unit (or
+the module or internal subprogram) that contains the edited lines is
+parsed again and the result is spliced into the existing parse tree, so
+the time taken is proportional to the size of that unit rather than of
+the whole file.
+
+For example:
+
+>>> from fparser.two.incremental import IncrementalParser
+>>> parser = IncrementalParser(std="f2008")
+>>> tree = parser.parse(source)
+>>> # Replace lines 120 to 121 of the source with new code.
+>>> result = parser.edit(120, 121, "  a = b + c\n  call work(a)")
+>>> print(result.tree)
+
+"""
+
+from collections import namedtuple
+
+from fparser.common.readfortran import (
+    Comment,
+    FortranStringReader,
+    Line,
+    _IS_INCLUDE_LINE,
+)
+from fparser.two.symbol_table import SymbolTableError
+from fparser.two.utils import (
+    BlockBase,
+    FortranSyntaxError,
+    NoMatchError,
+    ScopingRegionMixin,
+)
+
+#: The outcome of an edit: the (updated) parse tree and the list of
+#: nodes that were created by parsing the edited region again.
+EditResult = namedtuple("EditResult", "tree nodes")
+
+# The blocks holding subprograms that may be parsed again on their own
+# (mapped to the name of the rule that matches one of their members).
+_SUBPROGRAM_PARTS = {
+    "Module_Subprogram_Part": "Module_Subprogram",
+    "Internal_Subprogram_Part": "Internal_Subprogram",
+}
+
+
+def _statements(node, reverse=False):
+    """
+    :param node: the node whose statements are required.
+    :type node: :py:class:`fparser.two.utils.Base`
+    :param bool reverse: whether or not to produce the statements in \
+        reverse order.
+
+    :returns: the node and those of its descendants that have a source \
+        line (with a span), in order.
+    :rtype: Iterator[:py:class:`fparser.two.utils.Base`]
+
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BlockBase):
+            stack.extend(node.content if reverse else reversed(node.content))
+        elif getattr(node, "item", None) is not None:
+            yield node
+
+
+def _span(node):
+    """
+    :param node: the node whose span is required.
+    :type node: :py:class:`fparser.two.utils.Base`
+
+    :returns: the first and last source lines of the node or None if it \
+        has none.
+    :rtype: Optional[Tuple[int, int]]
+
+    """
+    first = next(_statements(node), None)
+    if first is None:
+        return None
+    last = next(_statements(node, reverse=True))
+    return first.item.span[0], last.item.span[1]
+
+
+def _shift(nodes, offset):
+    """
+    Shifts the line numbers of the source lines of the supplied nodes
+    (and their descendants).
+
+    :param nodes: the nodes to update.
+    :type nodes: Iterable[:py:class:`fparser.two.utils.Base`]
+    :param int offset: the number of lines by which to shift.
+
+    """
+    if not offset:
+        return
+    for node in nodes:
+        for stmt in _statements(node):
+            item = stmt.item
+            if isinstance(item, (Line, Comment)):
+                start, end = item.span
+                item.span = (start + offset, end + offset)
+
+
+def _scope_name(node):
+    """
+    :param node: a program unit or subprogram.
+    :type node: :py:class:`fparser.two.utils.BlockBase`
+
+    :returns: the name of the scoping region (symbol table) of the node \
+        or None if it does not have one.
+    :rtype: Optional[str]
+
+    """
+    for child in getattr(node, "content", ()):
+        if isinstance(child, ScopingRegionMixin):
+            return child.get_scope_name()
+    return None
+
+
+def _contains(span, start_line, end_line):
+    """
+    :returns: whether or not the lines replaced by an edit (or, for an \
+        insertion, the line before which the new lines are inserted) are \
+        within the supplied span.
+    :rtype: bool
+
+    """
+    return (
+        span is not None
+        and span[0] <= start_line
+        and max(start_line, end_line) <= span[1]
+    )
+
+
+class IncrementalParser:
+    """
+    Parses Fortran source and then, after each edit of that source, parses
+    again only the part of it that contains the edit. This is the
+    innermost module or internal subprogram (of a program unit) or, failing
+    that, the program unit that contains all of the edited lines. The
+    whole of the source is parsed again if the edit is not within a
+    single program unit, if parsing just the part that contains it fails
+    or does not consume all of it (e.g. because a new unit has been
+    started) or if the source includes other files. The resulting tree
+    (and symbol tables) are therefore the same as those from parsing the
+    whole of the edited source, with two exceptions. If the source does
+    not otherwise parse, parsing the whole of it may fall back to a main
+    program without a PROGRAM statement, dropping the units before it,
+    whereas an edit keeps the units that it does not touch. If more than
+    one unit has the same name, the order of the symbol tables may differ.
+
+    The parser has its own parser context (see
+    :py:class:`fparser.two.context.ParserContext`), whose symbol tables
+    are updated by each edit in the thread that makes it.
+
+    :param str std: the Fortran standard. Choices are 'f2003' or \
+        'f2008'. 'f2003' is the default.
+    :param bool ignore_comments: whether or not to discard comments. The \
+        default is True.
+
+    :raises ValueError: if the supplied value for the std parameter \
+        is invalid.
+
+    """
+
+    def __init__(self, std=None, ignore_comments=True):
+        # pylint: disable=import-outside-toplevel
+        from fparser.two.parser import ParserFactory
+
+        self._context = ParserFactory().create_context(std=std)
+        self.std = self._context.std
+        self.ignore_comments = ignore_comments
+        #: The parse tree of the source when it was last parsed successfully.
+        self.tree = None
+        self._lines = []
+        self._format = None
+        # Whether the last parse failed, in which case the tree does not
+        # match the source and the next edit parses the whole of it again.
+        self._dirty = False
+
+    @property
+    def source(self):
+        """
+        :returns: the current (edited) source.
+        :rtype: str
+        """
+        return "\n".join(self._lines)
+
+    @property
+    def symbol_tables(self):
+        """
+        :returns: the symbol tables of the current parse tree.
+        :rtype: :py:class:`fparser.two.symbol_table.SymbolTables`
+        """
+        return self._context.symbol_tables
+
+    def parse(self, source):
+        """
+        Parses the whole of the supplied source. If this fails then `tree`
+        is left as the last successfully parsed tree (if any) and the next
+        edit parses the whole of the edited source.
+
+        :param str source: the Fortran source.
+
+        :returns: the parse tree.
+        :rtype: :py:class:`fparser.two.Fortran2003.Program`
+
+        :raises FortranSyntaxError: if the code is not valid Fortran.
+
+        """
+        self._lines = source.split("\n")
+        reader = FortranStringReader(source, ignore_comments=self.ignore_comments)
+        self._format = reader.format
+        self._dirty = True
+        self.tree = self._context(reader)
+        self._dirty = False
+        return self.tree
+
+    def edit(self, start_line, end_line, text):
+        """
+        Replaces lines `start_line` to `end_line` (inclusive, counting from
+        1) of the source with the supplied text and updates the parse tree.
+        Text is inserted before `start_line` if `end_line` is
+        `start_line - 1` and lines are deleted if the text is empty.
+
+        :param int start_line: the first line to replace.
+        :param int end_line: the last line to replace.
+        :param str text: the new text.
+
+        :returns: the updated parse tree and the nodes that were parsed \
+            again.
+        :rtype: :py:class:`fparser.two.incremental.EditResult`
+
+        :raises ValueError: if no source has been parsed or the lines are \
+            not within the source.
+        :raises FortranSyntaxError: if the edited code is not valid Fortran \
+            (in which case the edit is still applied to the source).
+
+        """
+        if self.tree is None and not self._dirty:
+            raise ValueError("No source has been parsed so it cannot be edited.")
+        if not 1 <= start_line <= end_line + 1 <= len(self._lines) + 1:
+            raise ValueError(
+                f"Cannot replace lines {start_line} to {end_line} of a source "
+                f"with {len(self._lines)} lines."
+            )
+        new_lines = text.split("\n") if text else []
+        self._lines[start_line - 1 : end_line] = new_lines
+        offset = len(new_lines) - (end_line - start_line + 1)
+        if (
+            not self._dirty
+            and not any(_IS_INCLUDE_LINE(line) for line in new_lines)
+            and not any(_IS_INCLUDE_LINE(line) for line in self._lines)
+        ):
+            nodes = self._reparse_unit(start_line, end_line, offset)
+            if nodes is not None:
+                return EditResult(self.tree, nodes)
+        self.parse(self.source)
+        return EditResult(self.tree, self.tree.content[:])
+
+    def _reparse_unit(self, start_line, end_line, offset):
+        """
+        Parses again the subprogram or program unit that contains the
+        edited lines.
+
+        :param int start_line: the first line that was replaced.
+        :param int end_line: the last line that was replaced.
+        :param int offset: the change in the number of lines.
+
+        :returns: the new nodes or None if the program unit could not be \
+            parsed on its own.
+        :rtype: Optional[List[:py:class:`fparser.two.utils.Base`]]
+
+        """
+        units = self.tree.content
+        for index, unit in enumerate(units):
+            span = _span(unit)
+            if _contains(span, start_line, end_line):
+                break
+        else:
+            return None
+        unit_scope = _scope_name(unit)
+        for part in getattr(unit, "content", ()):
+            rule = _SUBPROGRAM_PARTS.get(type(part).__name__)
+            if rule is None:
+                continue
+            for member_index, member in enumerate(part.content):
+                member_span = _span(member)
+                if not isinstance(member, BlockBase) or not _contains(
+                    member_span, start_line, end_line
+                ):
+                    continue
+                nodes = self._parse_region(
+                    rule, member_span, offset, unit_scope, _scope_name(member)
+                )
+                if nodes is None:
+                    break
+                self._splice(part, member_index, nodes)
+                # The unit and the units after it follow the edited lines.
+                _shift(part.content[member_index + len(nodes) :], offset)
+                _shift(unit.content[unit.content.index(part) + 1 :], offset)
+                _shift(units[index + 1 :], offset)
+                return nodes
+        nodes = self._parse_region("Program", span, offset, None, unit_scope)
+        if nodes is None:
+            return None
+        self._splice(self.tree, index, nodes)
+        _shift(units[index + len(nodes) :], offset)
+        return nodes
+
+    def _parse_region(self, rule, span, offset, scope, name):
+        """
+        Parses the (edited) lines of a region of the source on their own.
+
+        :param str rule: the name of the rule to match the region with.
+        :param span: the first and last lines of the region before the edit.
+        :type span: Tuple[int, int]
+        :param int offset: the change in the number of lines in the region.
+        :param scope: the name of the scoping region (symbol table) in \
+            which the region is nested (if any).
+        :type scope: Optional[str]
+        :param name: the name of the scoping region (symbol table) of the \
+            existing node for the region (if any).
+        :type name: Optional[str]
+
+        :returns: the new nodes or None if the region could not be parsed \
+            on its own.
+        :rtype: Optional[List[:py:class:`fparser.two.utils.Base`]]
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from fparser.two import Fortran2003
+
+        first, last = span[0], span[1] + offset
+        if last < first:
+            return None
+        reader = FortranStringReader(
+            "\n".join(self._lines[first - 1 : last]),
+            ignore_comments=self.ignore_comments,
+        )
+        reader.set_format(self._format)
+        tables = self.symbol_tables
+        if scope is not None:
+            tables.enter_scope(scope)
+        position = None
+        try:
+            if name is not None:
+                # Remove the symbol table of the existing node (noting where
+                # it was amongst its siblings).
+                position = self._table_names().index(name.lower())
+                tables.remove(name)
+            count = len(self._table_names())
+            with self._context.activate():
+                node = getattr(Fortran2003, rule)(reader)
+            if node is None or reader.get_item() is not None:
+                return None
+            if position is not None:
+                # Put the new symbol tables where the old one was.
+                self._move_tables(count, position)
+        except (FortranSyntaxError, NoMatchError, SymbolTableError, ValueError):
+            return None
+        finally:
+            if scope is not None:
+                tables.exit_scope()
+        nodes = node.content if rule == "Program" else [node]
+        _shift(nodes, first - 1)
+        return nodes
+
+    def _table_names(self):
+        """
+        :returns: the names of the symbol tables in the current scope or, \
+            if there is none, of the top-level symbol tables, in order.
+        :rtype: List[str]
+
+        """
+        tables = self.symbol_tables
+        if tables.current_scope is not None:
+            return [child.name for child in tables.current_scope.children]
+        # pylint: disable=protected-access
+        return list(tables._symbol_tables)
+
+    def _move_tables(self, start, position):
+        """
+        Moves the symbol tables (in the current scope or, if there is none,
+        at the top level) from the supplied index onwards to the supplied
+        position, so that they are in the same order as from parsing the
+        whole of the source.
+
+        :param int start: the index of the first table to move.
+        :param int position: the index to which to move the tables.
+
+        """
+        tables = self.symbol_tables
+        if tables.current_scope is not None:
+            children = tables.current_scope.children
+            children[:] = (
+                children[:position] + children[start:] + children[position:start]
+            )
+            return
+        # pylint: disable=protected-access
+        items = list(tables._symbol_tables.items())
+        items = items[:position] + items[start:] + items[position:start]
+        tables._symbol_tables.clear()
+        tables._symbol_tables.update(items)
+
+    @staticmethod
+    def _splice(parent, index, nodes):
+        """
+        Replaces the child of the supplied parent at the supplied index with
+        the supplied nodes.
+
+        :param parent: the node whose child is to be replaced.
+        :type parent: :py:class:`fparser.two.utils.BlockBase`
+        :param int index: the index of the child to replace.
+        :param nodes: the new nodes.
+        :type nodes: List[:py:class:`fparser.two.utils.Base`]
+
+        """
+        parent.content[index : index + 1] = nodes
+        for node in nodes:
+            node.parent = parent
+
+
+__all__ = ["EditResult", "IncrementalParser"]
@@ -0,0 +1,241 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+"""
+Parses several Fortran source files in parallel using a pool of
+processes. Each worker process keeps a parser context (see
+:py:class:`fparser.two.context.ParserContext`) for the whole of its
+lifetime so that the cost of setting up the parser is only incurred once
+per process.
+
+For example:
+
+>>> from fparser.two.parallel import parse_files
+>>> for result in parse_files(["a.f90", "b.f90"], std="f2008", jobs=2):
+...     if result.error:
+...         print(result.filename, result.error)
+
+"""
+
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+#: The outcome of parsing a single file. `result` holds the output (as
+#: specified when parsing) or None if there was an error, in which case
+#: `error` holds a description of the error.
+ParseResult = namedtuple("ParseResult", ["filename", "result", "error"])
+
+# The supported kinds of output for each file.
+OUTPUTS = ("tree", "fortran", "repr", "none")
+
+# The parser context of this (worker) process.
+_CONTEXT = None
+
+
+class _ErrorLog(logging.Handler):
+    """
+    Records the error messages logged (by a reader) while a file is
+    parsed.
+
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _init_worker(std, packrat):
+    """
+    Sets up the parser context of a process.
+
+    :param str std: the Fortran standard.
+    :param bool packrat: whether or not to memoize the outcome of matches.
+
+    """
+    # pylint: disable=import-outside-toplevel, global-statement
+    from fparser.two.parser import ParserFactory
+
+    global _CONTEXT
+    _CONTEXT = ParserFactory().create_context(std=std, packrat=packrat)
+
+
+def _parse(filename, output, ignore_comments, source=None):
+    """
+    Parses the named file using the parser context of this process.
+
+    :param str filename: the file to parse.
+    :param str output: the kind of output required (one of `OUTPUTS`).
+    :param bool ignore_comments: whether or not to discard comments.
+    :param source: Fortran source to parse instead of the content of \
+        the file, in which case `filename` only identifies the result.
+    :type source: Optional[str]
+
+    :returns: the outcome of parsing the file.
+    :rtype: :py:class:`fparser.two.parallel.ParseResult`
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from fparser.common.readfortran import FortranFileReader, FortranStringReader
+    from fparser.two.utils import FortranSyntaxError, InternalError
+
+    try:
+        if source is None:
+            reader = FortranFileReader(filename, ignore_comments=ignore_comments)
+        else:
+            reader = FortranStringReader(source, ignore_comments=ignore_comments)
+    except IOError as error:
+        return ParseResult(filename, None, str(error))
+    errors = _ErrorLog()
+    logger = logging.getLogger("fparser.common.readfortran")
+    logger.addHandler(errors)
+    try:
+        tree = _CONTEXT(reader)
+    except SystemExit:
+        # A reader stops (by calling sys.exit) after logging some errors,
+        # e.g. a name in an END statement that does not match the block.
+        message = errors.messages[-1] if errors.messages else "reading stopped"
+        return ParseResult(filename, None, f"Syntax error: {message}")
+    except FortranSyntaxError as msg:
+        return ParseResult(filename, None, f"Syntax error: {msg}")
+    except InternalError as msg:
+        return ParseResult(filename, None, f"Internal error in fparser: {msg}")
+    except Exception as err:  # pylint: disable=broad-except
+        # Any other failure is confined to this file.
+        return ParseResult(
+            filename,
+            None,
+            f"Internal error in fparser: {type(err).__name__}: {err}",
+        )
+    finally:
+        logger.removeHandler(errors)
+    if output == "none" or tree is None:
+        return ParseResult(filename, None, None)
+    if output == "fortran":
+        return ParseResult(filename, tree.tofortran(), None)
+    if output == "repr":
+        return ParseResult(filename, repr(tree), None)
+    return ParseResult(filename, tree, None)
+
+
+def _parse_in_worker(args):
+    """
+    Wrapper around `_parse` for use with `Executor.map`.
+
+    :param args: the arguments to `_parse`.
+    :type args: Tuple[str, str, bool]
+
+    :returns: the outcome of parsing the file.
+    :rtype: :py:class:`fparser.two.parallel.ParseResult`
+
+    """
+    return _parse(*args)
+
+
+def parse_files(
+    filenames,
+    std=None,
+    jobs=None,
+    output="tree",
+    ignore_comments=False,
+    packrat=False,
+):
+    """
+    Parses the named Fortran source files, spreading them over a pool of
+    `jobs` processes. An error when parsing one file does not prevent the
+    other files from being parsed: it is recorded in the result for that
+    file instead.
+
+    :param filenames: the files to parse.
+    :type filenames: Iterable[str]
+    :param str std: the Fortran standard. Choices are 'f2003' or \
+                    'f2008'. 'f2003' is the default.
+    :param int jobs: the number of processes to use. If this is 1 then \
+        the files are parsed in the current process. The default is the \
+        number of CPUs.
+    :param str output: the output required for each file: "tree" for \
+        the parse tree (which is pickled in order to return it from a \
+        worker process), "fortran" for the Fortran generated from the \
+        parse tree (`tofortran()`), "repr" for its representation or \
+        "none" if only the outcome of the parse is required. The default \
+        is "tree".
+    :param bool ignore_comments: whether or not to discard comments. The \
+        default is False.
+    :param bool packrat: whether or not to memoize the outcome of matches \
+        (see :py:class:`fparser.two.utils.PackratCache`). The default is \
+        False.
+
+    :returns: the outcome of parsing each file, in the same order as the \
+        supplied filenames.
+    :rtype: List[:py:class:`fparser.two.parallel.ParseResult`]
+
+    :raises ValueError: if the number of jobs is not a positive integer.
+    :raises ValueError: if the type of output is not supported.
+    :raises ValueError: if the supplied value for the std parameter \
+        is invalid.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from fparser.two.parser import ParserFactory
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if not isinstance(jobs, int) or jobs < 1:
+        raise ValueError(
+            f"The number of jobs must be a positive integer but got '{jobs}'"
+        )
+    if output not in OUTPUTS:
+        raise ValueError(f"The output must be one of {OUTPUTS} but got '{output}'")
+    if not std:
+        std = "f2003"
+    # Check the standard before starting any processes.
+    # pylint: disable=protected-access
+    ParserFactory()._hierarchy(std)
+    tasks = [(filename, output, ignore_comments) for filename in filenames]
+    if jobs == 1 or len(tasks) <= 1:
+        _init_worker(std, packrat)
+        return [_parse_in_worker(task) for task in tasks]
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(tasks)),
+        initializer=_init_worker,
+        initargs=(std, packrat),
+    ) as executor:
+        return list(executor.map(_parse_in_worker, tasks))
+
+
+__all__ = ["ParseResult", "parse_files"]
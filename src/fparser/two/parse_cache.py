@@ -0,0 +1,279 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+A persistent, on-disk cache of fparser2 parse trees. Entries are keyed on
+a hash of the Fortran source (including the content of any files that it
+includes), the Fortran standard, the options of the reader and the
+version of fparser so that a cached tree is only ever returned for
+exactly the same input. This avoids re-parsing unchanged files, e.g. on
+every run of a CI pipeline.
+
+For example:
+
+>>> from fparser.common.readfortran import FortranFileReader
+>>> from fparser.two.parse_cache import ParseCache
+>>> cache = ParseCache(".fparser_cache", std="f2008")
+>>> tree = cache.parse(FortranFileReader("a.f90", ignore_comments=False))
+
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from io import StringIO
+
+from fparser import __version__
+from fparser.common.readfortran import _IS_INCLUDE_LINE
+
+# Bumped whenever the layout of the cache (or of its keys) changes.
+_CACHE_FORMAT = 1
+
+# The exceptions that may result from loading a missing or damaged cache
+# entry.
+_LOAD_ERRORS = (
+    OSError,
+    EOFError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    TypeError,
+    ValueError,
+    pickle.UnpicklingError,
+)
+
+
+class ParseCache:
+    """
+    Parses Fortran source, storing the (pickled) parse tree in the
+    specified directory so that the same source does not have to be
+    parsed again, even by a later process.
+
+    Note that, when a tree is obtained from the cache, the symbol tables
+    are not populated and the readers referenced by the tree cannot read
+    any further source.
+
+    Loading an entry unpickles it, which can run arbitrary code, so the
+    cache directory must only be writable by users who are trusted (in
+    general, just the user running fparser). Do not use a cache directory
+    that is shared with, or was supplied by, anyone else.
+
+    :param str directory: the directory in which to store the cache. It \
+        is created if it does not exist.
+    :param str std: the Fortran standard. Choices are 'f2003' or \
+        'f2008'. 'f2003' is the default.
+    :param bool packrat: whether or not to memoize the outcome of matches \
+        when parsing (see :py:class:`fparser.two.utils.PackratCache`). \
+        The default is False.
+
+    :raises ValueError: if the supplied value for the std parameter \
+        is invalid.
+
+    """
+
+    def __init__(self, directory, std=None, packrat=False):
+        # pylint: disable=import-outside-toplevel
+        from fparser.two.parser import ParserFactory
+
+        self.directory = directory
+        self._context = ParserFactory().create_context(std=std, packrat=packrat)
+        self.std = self._context.std
+        #: The number of trees returned from the cache.
+        self.hits = 0
+        #: The number of trees that had to be parsed.
+        self.misses = 0
+
+    def __repr__(self):
+        return f"ParseCache({self.directory!r}, std={self.std!r})"
+
+    def key(self, reader):
+        """
+        Computes the key of the cache entry for the source of the supplied
+        reader.
+
+        :param reader: the Fortran reader. It must not have been read from.
+        :type reader: :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+        :returns: the key or None if the source of the reader cannot be \
+            determined (in which case its tree cannot be cached).
+        :rtype: Optional[str]
+
+        """
+        source = _reader_source(reader)
+        if source is None or reader.linecount:
+            return None
+        sha = hashlib.sha256()
+        options = (
+            _CACHE_FORMAT,
+            __version__,
+            self.std,
+            reader.format.mode,
+            reader._ignore_comments,  # pylint: disable=protected-access
+            reader.process_directives,
+            reader._include_omp_conditional_lines,  # pylint: disable=W0212
+        )
+        sha.update(repr(options).encode())
+        _hash_source(sha, source, reader.include_dirs, set())
+        return sha.hexdigest()
+
+    def _path(self, key):
+        """
+        :param str key: the key of a cache entry.
+
+        :returns: the name of the file holding the cache entry.
+        :rtype: str
+
+        """
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def parse(self, reader):
+        """
+        Returns the parse tree for the source of the supplied reader,
+        either from the cache or by parsing it (in which case the tree is
+        added to the cache). Syntax errors are not cached.
+
+        :param reader: the Fortran reader. It must not have been read from.
+        :type reader: :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+        :returns: the parse tree.
+        :rtype: :py:class:`fparser.two.Fortran2003.Program`
+
+        :raises FortranSyntaxError: if the source is not valid Fortran.
+
+        """
+        key = self.key(reader)
+        if key is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as cache_file:
+                    tree = pickle.load(cache_file)
+            except _LOAD_ERRORS:
+                # There is no entry (or it is damaged) so parse the source
+                # and (re)write the entry below.
+                pass
+            else:
+                self.hits += 1
+                return tree
+        self.misses += 1
+        tree = self._context(reader)
+        if key is not None:
+            self._store(path, tree)
+        return tree
+
+    def _store(self, path, tree):
+        """
+        Writes a parse tree to the cache. The file is written under a
+        temporary name and then renamed so that other processes using
+        the same cache never see a partially-written entry.
+
+        :param str path: the name of the file for the cache entry.
+        :param tree: the parse tree.
+        :type tree: :py:class:`fparser.two.Fortran2003.Program`
+
+        """
+        dirname = os.path.dirname(path)
+        os.makedirs(dirname, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as cache_file:
+                pickle.dump(tree, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        """Removes all of the entries from the cache."""
+        if not os.path.isdir(self.directory):
+            return
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith((".pickle", ".tmp")):
+                    os.unlink(os.path.join(dirpath, filename))
+
+
+def _reader_source(reader):
+    """
+    :param reader: a Fortran reader.
+    :type reader: :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+    :returns: the source read by the reader or None if it is not known.
+    :rtype: Optional[bytes]
+
+    """
+    if isinstance(reader.source, StringIO):
+        return reader.source.getvalue().encode("UTF-8")
+    filename = getattr(reader, "id", None)
+    if isinstance(filename, str) and os.path.isfile(filename):
+        with open(filename, "rb") as source_file:
+            return source_file.read()
+    return None
+
+
+def _hash_source(sha, source, include_dirs, visited):
+    """
+    Adds some source, and that of any files that it includes (found in
+    the same way as the reader finds them), to a hash.
+
+    :param sha: the hash.
+    :type sha: :py:class:`hashlib._Hash`
+    :param bytes source: the Fortran source.
+    :param include_dirs: the directories to search for included files.
+    :type include_dirs: List[str]
+    :param visited: the included files that have already been hashed.
+    :type visited: Set[str]
+
+    """
+    sha.update(len(source).to_bytes(8, "little"))
+    sha.update(source)
+    for line in source.decode("UTF-8", errors="replace").splitlines():
+        if not _IS_INCLUDE_LINE(line):
+            continue
+        filename = line.strip()[7:].lstrip()[1:-1]
+        path = filename
+        for incl_dir in include_dirs:
+            path = os.path.join(incl_dir, filename)
+            if os.path.exists(path):
+                break
+        sha.update(path.encode())
+        if not os.path.isfile(path) or path in visited:
+            continue
+        visited.add(path)
+        with open(path, "rb") as include_file:
+            _hash_source(sha, include_file.read(), include_dirs, visited)
+
+
+__all__ = ["ParseCache"]
@@ -66,10 +66,225 @@
 """This file provides utilities to create a Fortran parser suitable
 for a particular standard."""
 
-import inspect
+import importlib
+import json
 import logging
 import sys
+from fparser.two.context import ParserContext
 from fparser.two.symbol_table import SYMBOL_TABLES
+from fparser.two.utils import PACKRAT_CACHE, KeywordIndex
+
+# The prefixes with which the leading word of a statement must begin if it
+# is to be matched by the named class. This is used to avoid trying to match
+# a statement against classes that cannot possibly match it. Classes that are
+# not present here (e.g. Assignment_Stmt) are always tried.
+_TYPE_SPEC_KEYWORDS = (
+    "BYTE",
+    "CHARACTER",
+    "CLASS",
+    "COMPLEX",
+    "DOUBLE",
+    "INTEGER",
+    "LOGICAL",
+    "REAL",
+    "TYPE",
+)
+LEADING_KEYWORDS = {
+    "Access_Stmt": ("PRIVATE", "PUBLIC"),
+    "Action_Term_Do_Construct": ("DO",),
+    "Allocatable_Stmt": ("ALLOCATABLE",),
+    "Allocate_Stmt": ("ALLOCATE",),
+    "Arithmetic_If_Stmt": ("IF",),
+    "Associate_Construct": ("ASSOCIATE",),
+    "Asynchronous_Stmt": ("ASYNCHRONOUS",),
+    "Backspace_Stmt": ("BACKSPACE",),
+    "Bind_Stmt": ("BIND",),
+    "Block_Construct": ("BLOCK",),
+    "Block_Label_Do_Construct": ("DO",),
+    "Block_Nonlabel_Do_Construct": ("DO",),
+    "Call_Stmt": ("CALL",),
+    "Case_Construct": ("SELECT",),
+    "Close_Stmt": ("CLOSE",),
+    "Common_Stmt": ("COMMON",),
+    "Computed_Goto_Stmt": ("GO",),
+    "Continue_Stmt": ("CONTINUE",),
+    "Cray_Pointer_Stmt": ("POINTER",),
+    "Critical_Construct": ("CRITICAL",),
+    "Cycle_Stmt": ("CYCLE",),
+    "Data_Component_Def_Stmt": _TYPE_SPEC_KEYWORDS,
+    "Data_Stmt": ("DATA",),
+    "Deallocate_Stmt": ("DEALLOCATE",),
+    "Derived_Type_Def": ("TYPE",),
+    "Dimension_Stmt": ("DIMENSION",),
+    "End_Do_Stmt": ("END",),
+    "End_Function_Stmt": ("END",),
+    "End_Subroutine_Stmt": ("END",),
+    "Endfile_Stmt": ("END",),
+    "Entry_Stmt": ("ENTRY",),
+    "Enum_Def": ("ENUM",),
+    "Equivalence_Stmt": ("EQUIVALENCE",),
+    "Error_Stop_Stmt": ("ERROR",),
+    "Exit_Stmt": ("EXIT",),
+    "External_Stmt": ("EXTERNAL",),
+    "Flush_Stmt": ("FLUSH",),
+    "Forall_Construct": ("FORALL",),
+    "Forall_Stmt": ("FORALL",),
+    "Format_Stmt": ("FORMAT",),
+    "Goto_Stmt": ("GO",),
+    "If_Construct": ("IF",),
+    "If_Stmt": ("IF",),
+    "Implicit_Stmt": ("IMPLICIT",),
+    "Inner_Shared_Do_Construct": ("DO",),
+    "Inquire_Stmt": ("INQUIRE",),
+    "Intent_Stmt": ("INTENT",),
+    "Interface_Block": ("ABSTRACT", "INTERFACE"),
+    "Intrinsic_Stmt": ("INTRINSIC",),
+    "Label_Do_Stmt": ("DO",),
+    "Namelist_Stmt": ("NAMELIST",),
+    "Nonlabel_Do_Stmt": ("DO",),
+    "Nullify_Stmt": ("NULLIFY",),
+    "Open_Stmt": ("OPEN",),
+    "Optional_Stmt": ("OPTIONAL",),
+    "Outer_Shared_Do_Construct": ("DO",),
+    "Parameter_Stmt": ("PARAMETER",),
+    "Pointer_Stmt": ("POINTER",),
+    "Print_Stmt": ("PRINT",),
+    "Private_Components_Stmt": ("PRIVATE",),
+    "Proc_Component_Def_Stmt": ("PROCEDURE",),
+    "Procedure_Declaration_Stmt": ("PROCEDURE",),
+    "Procedure_Stmt": ("MODULE", "PROCEDURE"),
+    "Protected_Stmt": ("PROTECTED",),
+    "Read_Stmt": ("READ",),
+    "Return_Stmt": ("RETURN",),
+    "Rewind_Stmt": ("REWIND",),
+    "Save_Stmt": ("SAVE",),
+    "Select_Type_Construct": ("SELECT",),
+    "Sequence_Stmt": ("SEQUENCE",),
+    "Stop_Stmt": ("STOP",),
+    "Target_Stmt": ("TARGET",),
+    "Type_Declaration_Stmt": _TYPE_SPEC_KEYWORDS,
+    "Value_Stmt": ("VALUE",),
+    "Volatile_Stmt": ("VOLATILE",),
+    "Wait_Stmt": ("WAIT",),
+    "Where_Construct": ("WHERE",),
+    "Where_Stmt": ("WHERE",),
+    "Write_Stmt": ("WRITE",),
+}
+
+
+# The class hierarchy (the contents of Base.subclasses) for each Fortran
+# standard, indexed by standard. This is populated by the ParserFactory
+# (or load_hierarchy()) so that the hierarchy need only be computed once
+# per process.
+_HIERARCHIES = {}
+
+# The version of the format used by save_hierarchy().
+_HIERARCHY_FORMAT = 1
+
+
+def save_hierarchy(filename, std=None):
+    """
+    Writes the class hierarchy for the specified Fortran standard to a
+    (JSON) file. The file may be read by `load_hierarchy` in a later
+    Python process so that the hierarchy need not be computed again.
+
+    :param str filename: the name of the file to write.
+    :param str std: the Fortran standard. Choices are 'f2003' or \
+                    'f2008'. 'f2003' is the default.
+
+    :raises ValueError: if the supplied value for the std parameter \
+                        is invalid.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from fparser import __version__
+
+    if not std:
+        std = "f2003"
+    # pylint: disable=protected-access
+    hierarchy = ParserFactory()._hierarchy(std)
+    content = {
+        "format": _HIERARCHY_FORMAT,
+        "fparser": __version__,
+        "std": std,
+        "subclasses": {
+            clsname: [f"{cls.__module__}:{cls.__qualname__}" for cls in subclasses]
+            for clsname, subclasses in hierarchy.items()
+        },
+    }
+    with open(filename, "w", encoding="utf-8") as cfile:
+        json.dump(content, cfile)
+
+
+def load_hierarchy(filename):
+    """
+    Reads a class hierarchy written by `save_hierarchy`. Subsequent calls
+    of `ParserFactory.create()` for the associated Fortran standard will use
+    it rather than computing the hierarchy.
+
+    :param str filename: the name of the file to read.
+
+    :returns: the Fortran standard of the class hierarchy.
+    :rtype: str
+
+    :raises ValueError: if the file does not contain a class hierarchy \
+        written by this version of fparser.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from fparser import __version__
+
+    try:
+        with open(filename, "r", encoding="utf-8") as cfile:
+            content = json.load(cfile)
+        if content["format"] != _HIERARCHY_FORMAT or content["fparser"] != __version__:
+            raise ValueError(
+                f"The class hierarchy in '{filename}' was written by fparser "
+                f"version '{content['fparser']}' but this is version "
+                f"'{__version__}'."
+            )
+        std = content["std"]
+        if std not in ("f2003", "f2008"):
+            raise ValueError(f"'{std}' is an invalid standard")
+        hierarchy = {}
+        for clsname, names in content["subclasses"].items():
+            subclasses = hierarchy[clsname] = []
+            for name in names:
+                module_name, cls_name = name.split(":")
+                subclasses.append(
+                    getattr(importlib.import_module(module_name), cls_name)
+                )
+    except (KeyError, TypeError, AttributeError, ImportError) as err:
+        raise ValueError(
+            f"'{filename}' does not contain a valid class hierarchy: {err}"
+        ) from err
+    except json.JSONDecodeError as err:
+        raise ValueError(f"'{filename}' is not a valid JSON file: {err}") from err
+    _HIERARCHIES[std] = hierarchy
+    return std
+
+
+def _get_classes(module):
+    """
+    Equivalent to `inspect.getmembers(module, inspect.isclass)` but avoids
+    the cost of importing `inspect`.
+
+    :param module: the module to search.
+    :type module: :py:class:`types.ModuleType`
+
+    :returns: the names and classes of all of the classes in the module \
+        (including imported classes), sorted by name.
+    :rtype: List[Tuple[str, type]]
+
+    """
+    return sorted(
+        (
+            (name, member)
+            for name, member in vars(module).items()
+            if isinstance(member, type)
+        ),
+        key=lambda item: item[0],
+    )
 
 
 def get_module_classes(input_module):
@@ -85,7 +300,7 @@ def get_module_classes(input_module):
     module_cls_members = []
     module_name = input_module.__name__
     # First find all classes in the module. This includes imported classes.
-    all_cls_members = inspect.getmembers(sys.modules[module_name], inspect.isclass)
+    all_cls_members = _get_classes(sys.modules[module_name])
     # next only keep classes that are specified in the module.
     for name, cls in all_cls_members:
         if cls.__module__ == module_name:
@@ -96,14 +311,21 @@ def get_module_classes(input_module):
 class ParserFactory:
     """Creates a parser suitable for the specified Fortran standard."""
 
-    def create(self, std=None):
+    def create(self, std=None, packrat=False):
         """Creates a class hierarchy suitable for the specified Fortran
         standard. Also sets-up the list of classes that define scoping
         regions in the global SymbolTables object and clears any existing
-        symbol table information.
+        symbol table information. The class hierarchy for each standard is
+        only computed once per process (see also `load_hierarchy`).
 
         :param str std: the Fortran standard. Choices are 'f2003' or \
                         'f2008'. 'f2003' is the default.
+        :param bool packrat: whether or not to memoize the outcome of \
+            matching each (rule, text) pair while parsing a statement (see \
+            :py:class:`fparser.two.utils.PackratCache`). This avoids \
+            repeatedly matching the same sub-expressions and can make a \
+            significant difference for deeply-nested expressions. The \
+            default is False.
         :return: a Program class (not object) for use with the Fortran reader
         :rtype: :py:class:`fparser.two.Fortran2003.Program`
 
@@ -123,24 +345,102 @@ class ParserFactory:
         """
         # Clear any existing symbol tables.
         SYMBOL_TABLES.clear()
+        # Enable (or disable) memoization of matches. This also clears any
+        # existing memoized matches.
+        PACKRAT_CACHE.enable(packrat)
 
-        # find all relevant classes in our Fortran2003 file as we
-        # always need these.
         # pylint: disable=import-outside-toplevel
         from fparser.two import Fortran2003
 
-        f2003_cls_members = get_module_classes(Fortran2003)
+        # Copy the lists so that the memoized hierarchy is unaffected by any
+        # subsequent modification of Base.subclasses.
+        Fortran2003.Base.subclasses = {
+            clsname: subclasses[:]
+            for clsname, subclasses in self._hierarchy(std).items()
+        }
+        Fortran2003.Base.subclass_index = self._index(Fortran2003.Base.subclasses)
+        # The class hierarchy has been set up so return the top
+        # level class that we start from when parsing Fortran code.
+        # Fortran2008 does not extend the top level class so we always
+        # return the Fortran2003 one.
+        return Fortran2003.Program
+
+    def create_context(self, std=None, packrat=False, compact=False):
+        """Creates a parser context for the specified Fortran standard.
+        Unlike `create`, this does not modify any global state. The context
+        has its own class hierarchy and symbol tables, so contexts for
+        different standards can coexist, and it may be used to parse code
+        in several threads at the same time.
+
+        :param str std: the Fortran standard. Choices are 'f2003' or \
+                        'f2008'. 'f2003' is the default.
+        :param bool packrat: whether or not to memoize the outcome of \
+            matches (see `create`). The default is False.
+        :param bool compact: whether or not to release the memory that \
+            each parse tree retains only because it was needed while \
+            parsing (see :py:func:`fparser.two.utils.compact_tree`). The \
+            default is False.
+
+        :returns: a parser context which, when called with a Fortran \
+            reader, returns the parse tree.
+        :rtype: :py:class:`fparser.two.context.ParserContext`
+
+        :raises ValueError: if the supplied value for the std parameter \
+                            is invalid
+
+        For example:
+
+        >>> from fparser.two.parser import ParserFactory
+        >>> f2008_context = ParserFactory().create_context(std="f2008")
+        >>> # Assuming that a reader has already been created ...
+        >>> ast = f2008_context(reader)
+        >>> symbol_tables = f2008_context.symbol_tables
+
+        """
+        if not std:
+            std = "f2003"
+        # The context has its own copy of the (memoized) class hierarchy.
+        hierarchy = {
+            clsname: subclasses[:]
+            for clsname, subclasses in self._hierarchy(std).items()
+        }
+        return ParserContext(std, hierarchy, self._index(hierarchy), packrat, compact)
+
+    def _hierarchy(self, std):
+        """Returns the class hierarchy for the specified Fortran standard,
+        computing it if it has not already been memoized.
+
+        :param str std: the Fortran standard. Choices are 'f2003' or \
+                        'f2008'. 'f2003' is the default.
+
+        :returns: the subclasses of each class.
+        :rtype: Dict[str, List[type]]
+
+        :raises ValueError: if the supplied value for the std parameter \
+                            is invalid
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from fparser.two import Fortran2003
+
         if not std:
             # default to f2003.
             std = "f2003"
 
+        if std in _HIERARCHIES:
+            # The class hierarchy for this standard has already been
+            # computed so there is no need to do so again.
+            return _HIERARCHIES[std]
+
+        # find all relevant classes in our Fortran2003 file as we
+        # always need these.
+        f2003_cls_members = get_module_classes(Fortran2003)
+
         if std == "f2003":
             # we already have our required list of classes so call _setup
             # to setup our class hierarchy.
-            self._setup(f2003_cls_members)
-            # The class hierarchy has been set up so return the top
-            # level class that we start from when parsing Fortran code.
-            return Fortran2003.Program
+            _HIERARCHIES[std] = self._setup(f2003_cls_members)
+            return _HIERARCHIES[std]
         if std == "f2008":
             # we need to find all relevent classes in our Fortran2003
             # and Fortran2008 files and then ensure that where classes
@@ -150,9 +450,7 @@ class ParserFactory:
             # First find all Fortran2008 classes.
             from fparser.two import Fortran2008
 
-            f2008_cls_members = inspect.getmembers(
-                sys.modules[Fortran2008.__name__], inspect.isclass
-            )
+            f2008_cls_members = _get_classes(sys.modules[Fortran2008.__name__])
 
             # next add in Fortran2003 classes if they do not already
             # exist as a Fortran2008 class.
@@ -162,18 +460,36 @@ class ParserFactory:
                     f2008_cls_members.append(local_cls)
             # we now have our required list of classes so call _setup
             # to setup our class hierarchy.
-            self._setup(f2008_cls_members)
-            # The class hierarchy has been set up so return the top
-            # level class that we start from when parsing Fortran
-            # code. Fortran2008 does not extend the top level class so
-            # we return the Fortran2003 one.
-            return Fortran2003.Program
+            _HIERARCHIES[std] = self._setup(f2008_cls_members)
+            return _HIERARCHIES[std]
 
         raise ValueError(f"'{std}' is an invalid standard")
 
+    @staticmethod
+    def _index(hierarchy):
+        """Index those lists of subclasses in the class hierarchy that
+        contain statements by the leading keyword of the statements so that
+        only the subclasses that could possibly match a given statement need
+        be tried.
+
+        :param hierarchy: the subclasses of each class.
+        :type hierarchy: Dict[str, List[type]]
+
+        :returns: the keyword index of each indexed list of subclasses.
+        :rtype: Dict[str, :py:class:`fparser.two.utils.KeywordIndex`]
+
+        """
+        subclass_index = {}
+        for clsname, subclasses in hierarchy.items():
+            if len(subclasses) > 1 and any(
+                subcls.__name__ in LEADING_KEYWORDS for subcls in subclasses
+            ):
+                subclass_index[clsname] = KeywordIndex(subclasses, LEADING_KEYWORDS)
+        return subclass_index
+
     def _setup(self, input_classes):
         """Perform some Python magic to create the connections between classes
-        and populate the baseclass with this information. This has
+        and return this information. This has
         been lifted from the original implementation and no attempt
         has been made to tidy up the code, other than making it
         conformant to the coding rules.
@@ -181,16 +497,18 @@ class ParserFactory:
         :param list input_classes: a list of tuples each containing a \
         class name and a class.
 
+        :returns: the subclasses of each class (as used to populate \
+            Base.subclasses).
+        :rtype: Dict[str, List[type]]
+
         """
         # pylint: disable=import-outside-toplevel
         from fparser.two import Fortran2003
 
         class_type = type(Fortran2003.Base)
 
-        # Reset subclasses dictionary in case this function has been
-        # called before. If this is not done then multiple calls to
-        # the ParserFactory create method may not work correctly.
-        Fortran2003.Base.subclasses = {}
+        # The new subclasses dictionary.
+        hierarchy = {}
         base_classes = {}
 
         for _, cls in input_classes:
@@ -255,7 +573,7 @@ class ParserFactory:
             local_subclass_names[cls] = opt_subclass_names[:]
 
         # Now that we've optimised the list of subclass names for each class,
-        # use this information to initialise the Base.subclasses dictionary:
+        # use this information to initialise the subclasses dictionary:
         for clsname, cls in base_classes.items():
             if not hasattr(cls, "subclass_names"):
                 message = f"{clsname} class is missing subclass_names list"
@@ -263,9 +581,9 @@ class ParserFactory:
                 continue
             subclass_names = local_subclass_names.get(cls, [])
             try:
-                bits = Fortran2003.Base.subclasses[clsname]
+                bits = hierarchy[clsname]
             except KeyError:
-                Fortran2003.Base.subclasses[clsname] = bits = []
+                hierarchy[clsname] = bits = []
             for name in subclass_names:
                 if name in base_classes:
                     bits.append(base_classes[name])
@@ -281,3 +599,5 @@ class ParserFactory:
                 if name not in base_classes:
                     message = f"{name} not defined, used by {cls.__name__}"
                     logging.getLogger(__name__).debug(message)
+
+        return hierarchy
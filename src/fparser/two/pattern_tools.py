@@ -80,6 +80,108 @@ import re
 dollar_ok = True
 
 
+class PatternRegistry:
+    """
+    Interns the compiled regular expressions of patterns so that all
+    patterns with the same regular expression and flags share a single
+    compiled object, which is compiled the first time that it is used.
+    Optionally, the number of times that each regular expression is used
+    to match, search or split a string is counted.
+
+    """
+
+    def __init__(self):
+        self._compiled = {}
+        self._uses = {}
+        #: Whether the uses of the regular expressions are being counted.
+        self.counting = False
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def compile(self, pattern, flags=0):
+        """
+        :param str pattern: the regular expression.
+        :param int flags: the flags with which to compile it.
+
+        :returns: the (shared) compiled regular expression.
+        :rtype: :py:class:`re.Pattern`
+
+        """
+        key = (pattern, flags)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled.setdefault(key, re.compile(pattern, flags))
+        return compiled
+
+    def record(self, compiled):
+        """
+        Records a use of the supplied compiled regular expression.
+
+        :param compiled: the regular expression that has been used.
+        :type compiled: :py:class:`re.Pattern`
+
+        """
+        self._uses[compiled] = self._uses.get(compiled, 0) + 1
+
+    def count(self, enabled=True):
+        """
+        Switches the counting of the uses of the regular expressions on
+        or off. The counts are kept until `clear_counts` is called.
+
+        :param bool enabled: whether to count the uses.
+
+        """
+        self.counting = enabled
+
+    def clear_counts(self):
+        """
+        Discards the counts of the uses of the regular expressions.
+
+        """
+        self._uses = {}
+
+    def stats(self):
+        """
+        :returns: the number of distinct compiled regular expressions and \
+            the number of uses of each regular expression that has been \
+            counted, most used first.
+        :rtype: Tuple[int, List[Tuple[str, int, int]]]
+
+        """
+        uses = sorted(
+            (
+                (compiled.pattern, compiled.flags, count)
+                for compiled, count in self._uses.items()
+            ),
+            key=lambda item: (-item[2], item[0]),
+        )
+        return len(self._compiled), uses
+
+    def report(self, limit=None):
+        """
+        :param limit: the maximum number of regular expressions to list.
+        :type limit: Optional[int]
+
+        :returns: a report, as text, of the number of distinct regular \
+            expressions and of the most-used regular expressions.
+        :rtype: str
+
+        """
+        distinct, uses = self.stats()
+        lines = [
+            f"{distinct} distinct regular expressions, "
+            f"{sum(item[2] for item in uses)} uses counted"
+        ]
+        for pattern, _, count in uses[:limit]:
+            lines.append(f"{count:>10} {pattern}")
+        return "\n".join(lines)
+
+
+#: The registry of the compiled regular expressions of all patterns.
+REGISTRY = PatternRegistry()
+
+
 class Pattern:
     """
 
@@ -126,6 +228,10 @@ class Pattern:
         self.optional = optional
         self._flags = flags
         self.value = value
+        self._compiled_pattern = None
+        # The patterns derived from this one by abs() and named(), which are
+        # used repeatedly while parsing.
+        self._derived = {}
 
     def flags(self, *flags):
         f = self._flags
@@ -136,11 +242,13 @@ class Pattern:
         )
 
     def get_compiled(self):
-        try:
-            return self._compiled_pattern
-        except AttributeError:
-            self._compiled_pattern = compiled = re.compile(self.pattern, self._flags)
-            return compiled
+        compiled = self._compiled_pattern
+        if compiled is None:
+            compiled = REGISTRY.compile(self.pattern, self._flags)
+            self._compiled_pattern = compiled
+        if REGISTRY.counting:
+            REGISTRY.record(compiled)
+        return compiled
 
     def match(self, string):
         return self.get_compiled().match(string)
@@ -193,12 +301,16 @@ class Pattern:
         return lhs, pattern_match, rhs
 
     def __abs__(self):
-        return Pattern(
-            self.label,
-            r"\A" + self.pattern + r"\Z",
-            flags=self._flags,
-            value=self.value,
-        )
+        derived = self._derived.get("abs")
+        if derived is None:
+            derived = Pattern(
+                self.label,
+                r"\A" + self.pattern + r"\Z",
+                flags=self._flags,
+                value=self.value,
+            )
+            self._derived["abs"] = derived
+        return derived
 
     def __repr__(self):
         return "%s(%r, %r)" % (self.__class__.__name__, self.label, self.pattern)
@@ -273,13 +385,18 @@ class Pattern:
         return Pattern(label, pattern, flags=self._flags)
 
     def named(self, name=None):
+        derived = self._derived.get(("named", name))
+        if derived is not None:
+            return derived
         if name is None:
             label = self.label
             assert label[0] + label[-1] == "<>" and " " not in label, repr(label)
         else:
             label = "<%s>" % (name)
         pattern = "(?P%s%s)" % (label.replace("-", "_"), self.pattern)
-        return Pattern(label, pattern, flags=self._flags, value=self.value)
+        derived = Pattern(label, pattern, flags=self._flags, value=self.value)
+        self._derived[("named", name)] = derived
+        return derived
 
     def rename(self, label):
         if label[0] + label[-1] != "<>":
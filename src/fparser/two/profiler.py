@@ -0,0 +1,332 @@
+# -----------------------------------------------------------------------------
+# BSD 3-Clause License
+#
+# Copyright (c) 2026, Science and Technology Facilities Council.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# -----------------------------------------------------------------------------
+
+
+"""
+A profiler for the fparser2 parser. While it is enabled, a RuleProfiler
+records, for every grammar rule (i.e. every class in the class hierarchy
+of the Fortran standard), how often the parser tried to match it, how
+often it succeeded, how often it raised a NoMatchError and how much time
+was spent in it. This shows which rules dominate the cost of parsing a
+particular code base. For example::
+
+    with RuleProfiler() as profiler:
+        program = parser(reader)
+    print(profiler.table(limit=20))
+
+"""
+
+import json
+import threading
+import time
+
+from fparser.two.utils import Base, BlockBase, NoMatchError
+
+__all__ = ["RuleProfiler", "RuleStats"]
+
+#: The columns of the table produced by RuleProfiler.table().
+COLUMNS = (
+    "attempts",
+    "matches",
+    "no_match_errors",
+    "cumulative_time",
+    "self_time",
+)
+
+# The profiler that is currently enabled, if any.
+_ACTIVE = None
+_ACTIVE_LOCK = threading.Lock()
+
+
+class RuleStats:
+    """
+    The statistics gathered for a single grammar rule.
+
+    :param str name: the name of the rule.
+
+    """
+
+    __slots__ = ("name",) + COLUMNS
+
+    def __init__(self, name):
+        self.name = name
+        self.attempts = 0
+        self.matches = 0
+        self.no_match_errors = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+
+    def as_dict(self):
+        """
+        :returns: these statistics as a dictionary.
+        :rtype: dict[str, int | float | str]
+
+        """
+        result = {"rule": self.name}
+        for column in COLUMNS:
+            result[column] = getattr(self, column)
+        return result
+
+
+class RuleProfiler:
+    """
+    Records the number of attempts, matches and NoMatchErrors and the
+    time spent for each grammar rule while it is enabled. Enabling the
+    profiler wraps `Base.__new__` (which matches the rule given by a
+    class and its subclasses) and `BlockBase.match` (which matches the
+    statements of a block); disabling it restores the originals so that
+    there is no overhead when it is not in use. Block matches are
+    reported as "BlockBase.match(<name>)" where <name> is the name of
+    the class that starts the block.
+
+    The cumulative time of a rule includes the time spent matching any
+    other rules while trying it (recursive matches of the same rule are
+    only counted once). The self time of a rule excludes the time spent
+    in other profiled rules.
+
+    Only one RuleProfiler may be enabled at any one time. A RuleProfiler
+    may be used as a context manager.
+
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._local = threading.local()
+        self._saved = None
+
+    @property
+    def enabled(self):
+        """
+        :returns: whether this profiler is currently enabled.
+        :rtype: bool
+
+        """
+        return self._saved is not None
+
+    def enable(self):
+        """
+        Starts recording statistics.
+
+        :raises RuntimeError: if a RuleProfiler is already enabled.
+
+        """
+        global _ACTIVE
+        with _ACTIVE_LOCK:
+            if _ACTIVE is not None:
+                raise RuntimeError("A RuleProfiler is already enabled.")
+            _ACTIVE = self
+        # Keep the attributes exactly as found in the class dictionaries
+        # (i.e. the staticmethod objects) so that they can be restored.
+        self._saved = (Base.__dict__["__new__"], BlockBase.__dict__["match"])
+        base_new = Base.__new__
+        block_match = BlockBase.match
+        profile = self._profile
+
+        def new(cls, *args, **kwargs):
+            return profile(cls.__name__, base_new, (cls,) + args, kwargs)
+
+        def match(startcls, subclasses, *args, **kwargs):
+            rule = startcls if startcls is not None else subclasses[0]
+            return profile(
+                f"BlockBase.match({rule.__name__})",
+                block_match,
+                (startcls, subclasses) + args,
+                kwargs,
+            )
+
+        Base.__new__ = staticmethod(new)
+        BlockBase.match = staticmethod(match)
+
+    def disable(self):
+        """
+        Stops recording statistics. Those recorded so far are kept.
+
+        """
+        global _ACTIVE
+        if self._saved is None:
+            return
+        Base.__new__, BlockBase.match = self._saved
+        self._saved = None
+        with _ACTIVE_LOCK:
+            _ACTIVE = None
+
+    def reset(self):
+        """
+        Discards all of the statistics recorded so far.
+
+        """
+        self._stats = {}
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def _profile(self, name, function, args, kwargs):
+        """
+        Calls `function` and records its outcome and timing against the
+        rule with the supplied name.
+
+        :param str name: the name of the rule being matched.
+        :param function: the (original) function that matches the rule.
+        :type function: Callable
+        :param tuple args: the positional arguments for `function`.
+        :param dict kwargs: the keyword arguments for `function`.
+
+        :returns: the result of calling `function`.
+
+        """
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, RuleStats(name))
+        # Each thread has its own stack holding the time spent in the
+        # profiled children of every rule that is being matched and its
+        # own count of the (recursive) matches of each rule in progress.
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._local.depths = {}
+        depths = self._local.depths
+        stats.attempts += 1
+        depth = depths.get(name, 0)
+        depths[name] = depth + 1
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except NoMatchError:
+            stats.no_match_errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            stats.self_time += elapsed - children
+            depths[name] = depth
+            if not depth:
+                stats.cumulative_time += elapsed
+            if stack:
+                stack[-1] += elapsed
+        if result is not None:
+            stats.matches += 1
+        return result
+
+    def stats(self, sort="self_time"):
+        """
+        :param str sort: the column to sort the statistics by (in \
+            descending order) or "rule" to sort them by name.
+
+        :returns: the statistics for every rule that was tried.
+        :rtype: list[:py:class:`fparser.two.profiler.RuleStats`]
+
+        :raises ValueError: if `sort` is not a valid column.
+
+        """
+        if sort == "rule":
+            return sorted(self._stats.values(), key=lambda item: item.name)
+        if sort not in COLUMNS:
+            raise ValueError(
+                f"Cannot sort the profile by '{sort}'. It must be one of "
+                f"{('rule',) + COLUMNS}."
+            )
+        return sorted(
+            self._stats.values(),
+            key=lambda item: (-getattr(item, sort), item.name),
+        )
+
+    def as_dict(self, sort="self_time", limit=None):
+        """
+        :param str sort: the column to sort the rules by.
+        :param limit: the maximum number of rules to include.
+        :type limit: Optional[int]
+
+        :returns: the recorded statistics in a form that can be \
+            serialised (e.g. as JSON).
+        :rtype: dict[str, list[dict[str, int | float | str]]]
+
+        """
+        rows = self.stats(sort)[:limit]
+        return {
+            "total_time": self.total_time,
+            "rules": [row.as_dict() for row in rows],
+        }
+
+    def to_json(self, sort="self_time", limit=None, **kwargs):
+        """
+        :param str sort: the column to sort the rules by.
+        :param limit: the maximum number of rules to include.
+        :type limit: Optional[int]
+        :param kwargs: any additional arguments for `json.dumps`.
+
+        :returns: the recorded statistics as a JSON string.
+        :rtype: str
+
+        """
+        return json.dumps(self.as_dict(sort, limit), **kwargs)
+
+    @property
+    def total_time(self):
+        """
+        :returns: the total time in seconds spent in profiled rules, \
+            i.e. the sum of the self times of all rules.
+        :rtype: float
+
+        """
+        return sum(stats.self_time for stats in self._stats.values())
+
+    def table(self, sort="self_time", limit=None):
+        """
+        :param str sort: the column to sort the rules by.
+        :param limit: the maximum number of rules to include.
+        :type limit: Optional[int]
+
+        :returns: the recorded statistics as a table of text, one line \
+            per rule.
+        :rtype: str
+
+        """
+        rows = self.stats(sort)[:limit]
+        width = max([len("rule")] + [len(row.name) for row in rows])
+        lines = [
+            f"{'rule':<{width}} {'attempts':>10} {'matches':>10} "
+            f"{'nomatch':>10} {'cumtime':>10} {'selftime':>10}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row.name:<{width}} {row.attempts:>10} {row.matches:>10} "
+                f"{row.no_match_errors:>10} {row.cumulative_time:>10.4f} "
+                f"{row.self_time:>10.4f}"
+            )
+        return "\n".join(lines)
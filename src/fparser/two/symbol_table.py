@@ -34,12 +34,14 @@
 
 """
 The fparser2 symbol-table module. Defines various classes as well as
-the single, global SYMBOL_TABLES instance. The latter is a container
-for all of the top-level scoping units encountered during parsing.
+the SYMBOL_TABLES instance. The latter is a container for all of the
+top-level scoping units encountered during parsing (in the active parser
+context, if any).
 
 """
 
 from collections import namedtuple
+from fparser.two.context import THREAD_STATE
 
 
 class SymbolTableError(Exception):
@@ -502,6 +504,14 @@ class SymbolTable:
 
     def __init__(self, name, parent=None, checking_enabled=False, node=None):
         self._name = name.lower()
+        # Incremented whenever this table is modified in a way that could
+        # change the result of a lookup in it or in a table nested in it.
+        self._version = 0
+        # The results (the symbol or None if there is none) of previous
+        # lookups, valid while the versions of this table and its
+        # ancestors are those in _cache_versions.
+        self._lookup_cache = {}
+        self._cache_versions = None
         # Symbols defined in this scope that represent data.
         self._data_symbols = {}
         # dict of ModuleUse objects (indexed by module name) representing
@@ -584,6 +594,7 @@ class SymbolTable:
                     )
 
         self._data_symbols[lname] = SymbolTable.Symbol(lname, primitive_type.lower())
+        self._version += 1
 
     def add_use_symbols(self, name, only_list=None, rename_list=None):
         """
@@ -617,6 +628,7 @@ class SymbolTable:
             self._modules[use.name].update(use)
         else:
             self._modules[use.name] = use
+        self._version += 1
 
     def lookup(self, name):
         """
@@ -632,20 +644,63 @@ class SymbolTable:
         """
         # Fortran is not case sensitive so convert input to lowercase.
         lname = name.lower()
-        if lname in self._data_symbols:
-            # Found a match in this table.
-            return self._data_symbols[lname]
-        for module in self._modules.values():
-            try:
-                # Look to see whether the symbol is imported into this table.
-                return module.lookup(lname)
-            except KeyError:
-                pass
-        # No match in this scope - search in parent scope (if any). This will
-        # recurse upwards through parent tables as necessary.
-        if self.parent:
-            return self.parent.lookup(lname)
-        raise KeyError(f"Failed to find symbol named '{lname}'")
+        symbol = self._find(lname)
+        if symbol is None:
+            raise KeyError(f"Failed to find symbol named '{lname}'")
+        return symbol
+
+    def has_symbol(self, name):
+        """
+        :param str name: the name of the symbol (not case sensitive).
+
+        :returns: whether a symbol with the supplied name is in this or \
+            any parent scope. Unlike `lookup`, no exception is raised if \
+            there is no such symbol.
+        :rtype: bool
+
+        """
+        return self._find(name.lower()) is not None
+
+    def _find(self, lname):
+        """
+        Finds the symbol with the supplied (lower-case) name in this or any
+        parent scope. The result (including the absence of a symbol) is
+        cached until this table or one of its ancestors is next modified.
+
+        :param str lname: the name of the symbol in lower case.
+
+        :returns: the named symbol or None if there is no such symbol.
+        :rtype: Optional[:py:class:`fparser.two.symbol_table.SymbolTable.Symbol`]
+
+        """
+        cache = self._lookup_cache
+        versions = []
+        table = self
+        while table is not None:
+            versions.append(table._version)
+            table = table._parent
+        versions = tuple(versions)
+        if self._cache_versions != versions:
+            cache.clear()
+            self._cache_versions = versions
+        elif lname in cache:
+            return cache[lname]
+        # Look for the symbol in this table and then in the modules whose
+        # symbols are imported into it.
+        symbol = self._data_symbols.get(lname)
+        if symbol is None:
+            for module in self._modules.values():
+                symbol = module._symbols.get(lname)
+                if symbol is not None:
+                    break
+            else:
+                # No match in this scope - search in the parent scope (if
+                # any). This will recurse upwards through parent tables as
+                # necessary.
+                if self.parent:
+                    symbol = self.parent._find(lname)
+        cache[lname] = symbol
+        return symbol
 
     @property
     def name(self):
@@ -681,6 +736,7 @@ class SymbolTable:
                 f"a SymbolTable but got '{type(value).__name__}'"
             )
         self._parent = value
+        self._version += 1
 
     @property
     def node(self):
@@ -791,9 +847,49 @@ class SymbolTable:
         return True
 
 
-#: The single, global container for all symbol tables constructed while
-#: parsing.
-SYMBOL_TABLES = SymbolTables()
+class _ActiveSymbolTables:
+    """
+    Forwards all attribute access to the symbol tables of the parser context
+    that is active on the current thread (see
+    :py:class:`fparser.two.context.ParserContext`) or, if there is none, to
+    the single, global container of symbol tables. This allows code to
+    refer to `SYMBOL_TABLES` irrespective of the context in use.
+
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def active():
+        """
+        :returns: the symbol tables that are currently in use.
+        :rtype: :py:class:`fparser.two.symbol_table.SymbolTables`
+        """
+        context = THREAD_STATE.context
+        if context is None:
+            return _GLOBAL_SYMBOL_TABLES
+        return context.symbol_tables
+
+    def __getattr__(self, name):
+        return getattr(self.active(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.active(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.active(), name)
+
+    def __str__(self):
+        return str(self.active())
+
+
+# The single, global container for all symbol tables constructed while
+# parsing without a parser context.
+_GLOBAL_SYMBOL_TABLES = SymbolTables()
+
+#: The container for all symbol tables constructed while parsing. This is
+#: the global container unless a parser context is active.
+SYMBOL_TABLES = _ActiveSymbolTables()
 
 
 __all__ = ["SymbolTableError", "SymbolTables", "SymbolTable", "SYMBOL_TABLES"]
@@ -115,6 +115,31 @@ def test_intrinsic_name_case_insensitive():
     assert str(result) == "CCOS"
 
 
+def test_intrinsic_name_set():
+    """Test that the set of intrinsic names used for matching holds
+    exactly the names of the generic and specific intrinsics, for both
+    Fortran2003 and Fortran2008."""
+    from fparser.two import Fortran2008
+
+    for cls in [Intrinsic_Name, Fortran2008.Intrinsic_Name]:
+        assert set(cls.function_name_set) == set(cls.function_names)
+        assert set(cls.function_names) == set(cls.generic_function_names) | set(
+            cls.specific_function_names
+        )
+    assert "GAMMA" in Fortran2008.Intrinsic_Name.function_name_set
+    assert "GAMMA" not in Intrinsic_Name.function_name_set
+
+    # A subclass that overrides the function names matches against them.
+    class MyIntrinsic(Intrinsic_Name):
+        """An intrinsic name with a single function."""
+
+        function_names = ["MYFUNC"]
+
+    assert MyIntrinsic.function_name_set.match("MYFUNC")
+    assert not MyIntrinsic.function_name_set.match("SIN")
+    assert Intrinsic_Name.function_name_set.match("SIN")
+
+
 # class intrinsic_function_reference
 
 
@@ -40,6 +40,7 @@ or more program-units.
 import pytest
 from fparser.two.utils import FortranSyntaxError
 from fparser.api import get_reader
+from fparser.common.readfortran import FortranStringReader
 from fparser.two.Fortran2003 import Program
 
 
@@ -72,6 +73,18 @@ def test_only_comments(f2003_create, ignore_comments):
         assert code in str(ast)
 
 
+def test_max_source_lines(f2003_create):
+    """Test that code can be parsed, and syntax errors reported, when the
+    reader only keeps the most recently read source lines."""
+    code = "! comment1\n! comment2\n! comment3\n"
+    ast = Program(FortranStringReader(code, ignore_comments=False, max_source_lines=1))
+    assert str(ast) == code.rstrip()
+    code = "! comment\nsubroutine a()\n  x = 1\nend\nsubroutine b()\n  y =\nend\n"
+    with pytest.raises(FortranSyntaxError) as excinfo:
+        Program(FortranStringReader(code, max_source_lines=1))
+    assert "at line 6\n>>>  y =\n" in str(excinfo.value)
+
+
 # Test single program units
 
 
@@ -470,3 +483,65 @@ def test_mix(f2003_create):
         "INCLUDE '5'\n"
         "! comment5"
     ) in str(ast)
+
+
+# Test iterating over the program units
+
+
+@pytest.mark.usefixtures("f2003_create")
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "! comment1\n! comment2",
+        "subroutine test()\nend subroutine\n",
+        "! head\nmodule a\nend module a\n! between\n"
+        "include 'x.h'\n"
+        "subroutine b()\nend subroutine b\n! tail\n",
+        "a = 1\nend\n",
+    ],
+)
+def test_iter_units(code):
+    """Test that Program.iter_units yields the same nodes as are found in
+    the content of a Program."""
+    ast = Program(get_reader(code, ignore_comments=False))
+    expected = [] if ast is None else ast.content
+    units = list(Program.iter_units(get_reader(code, ignore_comments=False)))
+    assert [repr(unit) for unit in units] == [repr(node) for node in expected]
+
+
+@pytest.mark.usefixtures("f2003_create")
+def test_iter_units_incremental():
+    """Test that Program.iter_units yields each unit as soon as it has been
+    parsed, i.e. before the rest of the code is read."""
+    code = "".join(
+        f"subroutine sub{idx}()\n  a = {idx}\nend subroutine\n" for idx in range(5)
+    )
+    reader = get_reader(code)
+    units = Program.iter_units(reader)
+    unit = next(units)
+    assert str(unit) == "SUBROUTINE sub0\n  a = 0\nEND SUBROUTINE"
+    assert reader.linecount <= 4
+    assert [str(unit.content[0]) for unit in units] == [
+        f"SUBROUTINE sub{idx}" for idx in range(1, 5)
+    ]
+
+
+@pytest.mark.usefixtures("f2003_create")
+def test_iter_units_syntax_error():
+    """Test that Program.iter_units raises a FortranSyntaxError for invalid
+    code once it reaches the error and that, unlike Program, units before
+    a main program without a program statement are kept."""
+    units = Program.iter_units(get_reader("subroutine a\nend\nsubroutine b\nx=\nend\n"))
+    assert str(next(units)) == "SUBROUTINE a\nEND"
+    with pytest.raises(FortranSyntaxError) as excinfo:
+        next(units)
+    assert "at line 4\n>>>x=\n" in str(excinfo.value)
+    units = Program.iter_units(
+        get_reader("! comment\nsubroutine a\nend\nx = 1\nend\n", ignore_comments=False)
+    )
+    assert [type(unit).__name__ for unit in units] == [
+        "Comment",
+        "Subroutine_Subprogram",
+        "Main_Program0",
+    ]
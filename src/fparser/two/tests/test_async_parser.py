@@ -0,0 +1,223 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Module containing pytest tests for the parsing of Fortran from asyncio
+code in async_parser.py."""
+
+import asyncio
+import pytest
+from fparser.two import Fortran2003
+from fparser.two.async_parser import AsyncParser
+from fparser.two.parallel import ParseResult
+
+SOURCE = "program prog\n  ! comment\n  a = 1\nend program\n"
+
+# Source that takes (much) longer than the timeouts below to parse.
+SLOW_SOURCE = (
+    "program slow\n" + "  a = b * (c + d(1, 2)) - e\n" * 5000 + "end program\n"
+)
+
+
+def run(coroutine):
+    """
+    :param coroutine: the coroutine to run.
+
+    :returns: the outcome of running the coroutine in a new event loop.
+
+    """
+    return asyncio.run(coroutine)
+
+
+def test_parse_source_and_file(tmpdir):
+    """Test that source and files are parsed by the worker processes and
+    that several requests may be in flight at once."""
+    my_file = tmpdir.join("prog.f90")
+    my_file.write(SOURCE)
+
+    async def parse():
+        async with AsyncParser(std="f2008", jobs=2) as parser:
+            return await asyncio.gather(
+                parser.parse_source(SOURCE, name="my_source"),
+                parser.parse_source(SOURCE, output="fortran", ignore_comments=True),
+                parser.parse_file(my_file.strpath, output="repr"),
+                parser.parse_file(my_file.strpath, output="none"),
+                parser.parse_source("prog hello\nen\n"),
+                parser.parse_file(tmpdir.join("missing.f90").strpath),
+            )
+
+    results = run(parse())
+    assert results[0].filename == "my_source"
+    assert isinstance(results[0].result, Fortran2003.Program)
+    assert results[0].error is None
+    assert results[1] == ParseResult(None, "PROGRAM prog\n  a = 1\nEND PROGRAM", None)
+    assert results[2].result.startswith("Program(Main_Program(Program_Stmt(")
+    assert results[3] == ParseResult(my_file.strpath, None, None)
+    assert "Syntax error: at line 1\n>>>prog hello" in results[4].error
+    assert "No such file or directory" in results[5].error
+
+
+def test_timeout():
+    """Test that a request that times out raises an exception and that its
+    worker process is replaced."""
+
+    async def parse():
+        parser = AsyncParser(jobs=1, timeout=0.2)
+        await parser.start()
+        worker = parser._workers[0]
+        with pytest.raises(asyncio.TimeoutError):
+            await parser.parse_source(SLOW_SOURCE)
+        assert not worker.process.is_alive()
+        assert parser._workers[0] is not worker
+        # The timeout may be set for each request.
+        result = await parser.parse_source(SOURCE, output="fortran", timeout=30)
+        await parser.close()
+        return result
+
+    assert run(parse()).result.startswith("PROGRAM prog")
+
+
+def test_cancel():
+    """Test that a request may be cancelled and that its worker process is
+    replaced."""
+
+    async def parse():
+        async with AsyncParser(jobs=1) as parser:
+            worker = parser._workers[0]
+            task = asyncio.ensure_future(parser.parse_source(SLOW_SOURCE))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert not worker.process.is_alive()
+            return await parser.parse_source(SOURCE, output="fortran")
+
+    assert run(parse()).result.startswith("PROGRAM prog")
+
+
+def test_worker_ends():
+    """Test that a worker process ending unexpectedly is reported in the
+    result and that the worker is replaced."""
+
+    async def parse():
+        async with AsyncParser(jobs=1) as parser:
+            worker = parser._workers[0]
+            task = asyncio.ensure_future(parser.parse_source(SLOW_SOURCE))
+            await asyncio.sleep(0.2)
+            worker.process.terminate()
+            result = await task
+            assert parser._workers[0] is not worker
+            return result, await parser.parse_source(SOURCE, output="none")
+
+    result, next_result = run(parse())
+    assert result == ParseResult(
+        None, None, "Internal error in fparser: the worker process ended"
+    )
+    assert next_result == ParseResult(None, None, None)
+
+
+def test_syntax_error_ends_parsing():
+    """Test that a syntax error that stops the reader (a mismatched END
+    name) is reported in the result and does not end the worker
+    process."""
+
+    async def parse():
+        async with AsyncParser(jobs=1) as parser:
+            worker = parser._workers[0]
+            result = await parser.parse_source("subroutine a()\nend subroutine b\n")
+            assert parser._workers[0] is worker
+            return result, await parser.parse_source(SOURCE, output="none")
+
+    result, next_result = run(parse())
+    assert result.result is None
+    assert result.error.startswith("Syntax error: ")
+    assert "expected <subroutine-name> is a but got b" in result.error
+    assert next_result == ParseResult(None, None, None)
+
+
+def test_close_with_waiting_request():
+    """Test that a request waiting for an idle worker when the parser is
+    closed completes and reports that the parser was closed."""
+
+    async def parse():
+        parser = AsyncParser(jobs=1)
+        await parser.start()
+        busy = asyncio.ensure_future(parser.parse_source(SLOW_SOURCE, output="none"))
+        waiting = asyncio.ensure_future(parser.parse_source(SOURCE, name="waiting"))
+        await asyncio.sleep(0.2)
+        assert parser._waiting == 1
+        await parser.close()
+        return await asyncio.wait_for(asyncio.gather(busy, waiting), 30)
+
+    _, result = run(parse())
+    assert result == ParseResult(
+        "waiting", None, "The parser was closed before the request was parsed"
+    )
+
+
+def test_close_and_restart():
+    """Test that a parser is started by its first request and may be
+    started again after it is closed."""
+
+    async def parse():
+        parser = AsyncParser(jobs=1)
+        await parser.close()
+        first = await parser.parse_source(SOURCE, output="none")
+        workers = parser._workers
+        await parser.close()
+        assert parser._workers is None
+        assert not workers[0].process.is_alive()
+        second = await parser.parse_source(SOURCE, output="none")
+        await parser.close()
+        return first, second
+
+    assert run(parse()) == (ParseResult(None, None, None),) * 2
+
+
+def test_invalid():
+    """Test that the expected exceptions are raised when invalid arguments
+    are supplied."""
+    for jobs in [0, -1, 1.5]:
+        with pytest.raises(ValueError) as err:
+            AsyncParser(jobs=jobs)
+        assert f"The number of jobs must be a positive integer but got '{jobs}'" in str(
+            err.value
+        )
+    with pytest.raises(ValueError) as err:
+        AsyncParser(std="invalid")
+    assert "is an invalid standard" in str(err.value)
+    parser = AsyncParser(jobs=1)
+    with pytest.raises(ValueError) as err:
+        run(parser.parse_source(SOURCE, output="xml"))
+    assert "The output must be one of " in str(err.value)
+    assert parser._workers is None
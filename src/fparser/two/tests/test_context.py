@@ -0,0 +1,218 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Module containing pytest tests for the ParserContext class and its
+creation by the ParserFactory."""
+
+import threading
+import pytest
+from fparser.common.readfortran import FortranStringReader
+from fparser.two import Fortran2003, Fortran2008
+from fparser.two.context import ParserContext, get_active_context
+from fparser.two.parser import ParserFactory
+from fparser.two.symbol_table import SYMBOL_TABLES
+from fparser.two.utils import Base, FortranSyntaxError, StmtBase, walk
+
+SUBMODULE = "submodule (x) y\nend\n"
+
+MODULE = """\
+module my_mod
+  use other_mod, only: b
+  integer :: a
+contains
+  subroutine sub(c)
+    real :: c
+    c = a * b
+  end subroutine sub
+end module my_mod
+"""
+
+
+def test_create_context():
+    """Test that create_context returns a ParserContext for the requested
+    standard without modifying the global state."""
+    parser = ParserFactory().create(std="f2003")
+    subclasses = Base.subclasses
+    context = ParserFactory().create_context(std="f2008")
+    assert isinstance(context, ParserContext)
+    assert context.std == "f2008"
+    assert not context.packrat
+    assert repr(context) == "ParserContext(std='f2008', packrat=False)"
+    assert Base.subclasses is subclasses
+    assert "Submodule" in context.subclasses["Program_Unit"][-1].__name__
+    assert "Execution_Part_Construct" in context.subclass_index
+    # The default standard is f2003.
+    assert ParserFactory().create_context().std == "f2003"
+    with pytest.raises(ValueError) as err:
+        ParserFactory().create_context(std="invalid")
+    assert "'invalid' is an invalid standard" in str(err.value)
+    # The global parser still only supports Fortran2003.
+    with pytest.raises(FortranSyntaxError):
+        parser(FortranStringReader(SUBMODULE))
+
+
+def test_contexts_coexist():
+    """Test that contexts for different standards can be used alongside
+    each other and alongside the global parser."""
+    f2003_context = ParserFactory().create_context(std="f2003")
+    f2008_context = ParserFactory().create_context(std="f2008")
+    parser = ParserFactory().create(std="f2008")
+    for _ in range(2):
+        with pytest.raises(FortranSyntaxError):
+            f2003_context(FortranStringReader(SUBMODULE))
+        assert "SUBMODULE (x) y" in str(f2008_context(FortranStringReader(SUBMODULE)))
+        assert "SUBMODULE (x) y" in str(parser(FortranStringReader(SUBMODULE)))
+    assert get_active_context() is None
+
+
+def test_context_symbol_tables():
+    """Test that a context has its own symbol tables and that these are
+    cleared at the start of each parse."""
+    ParserFactory().create(std="f2003")
+    context = ParserFactory().create_context(std="f2003")
+    tree = context(FortranStringReader(MODULE))
+    assert "MODULE my_mod" in str(tree)
+    tables = context.symbol_tables
+    assert "my_mod" in tables._symbol_tables
+    assert tables.lookup("my_mod").children[0].lookup("c")
+    # The global symbol tables are unaffected.
+    assert "my_mod" not in SYMBOL_TABLES._symbol_tables
+    # Parsing the same code again does not fail due to the symbols from
+    # the previous parse.
+    context(FortranStringReader(MODULE))
+    assert context.symbol_tables is tables
+    assert list(tables._symbol_tables) == ["my_mod"]
+    # The result is the same as that from the global parser.
+    parser = ParserFactory().create(std="f2003")
+    assert repr(parser(FortranStringReader(MODULE))) == repr(tree)
+    assert str(SYMBOL_TABLES) == str(tables)
+
+
+def test_context_activate():
+    """Test that activating a context makes SYMBOL_TABLES refer to its
+    symbol tables and that the previous context is restored afterwards."""
+    ParserFactory().create(std="f2003")
+    context1 = ParserFactory().create_context(std="f2003")
+    context2 = ParserFactory().create_context(std="f2008")
+    SYMBOL_TABLES.enter_scope("global_scope")
+    with context1.activate() as active:
+        assert active is context1
+        assert get_active_context() is context1
+        assert SYMBOL_TABLES.current_scope is None
+        SYMBOL_TABLES.enter_scope("context_scope")
+        with context2.activate():
+            assert get_active_context() is context2
+            assert SYMBOL_TABLES.current_scope is None
+        assert SYMBOL_TABLES.current_scope.name == "context_scope"
+        stmt = Fortran2003.Type_Declaration_Stmt("integer :: i")
+        assert "i" in context1.symbol_tables.current_scope._data_symbols
+    assert get_active_context() is None
+    assert SYMBOL_TABLES.current_scope.name == "global_scope"
+    assert "i" not in SYMBOL_TABLES.current_scope._data_symbols
+    assert str(stmt) == "INTEGER :: i"
+    SYMBOL_TABLES.exit_scope()
+
+
+def test_context_packrat():
+    """Test that a context has its own packrat cache."""
+    context = ParserFactory().create_context(packrat=True)
+    assert context.packrat
+    assert context.packrat_cache.enabled
+    tree = context(FortranStringReader(MODULE))
+    assert context.packrat_cache.misses > 0
+    assert repr(ParserFactory().create_context()(FortranStringReader(MODULE))) == (
+        repr(tree)
+    )
+
+
+def test_context_threads():
+    """Test that a context can be used to parse code in several threads at
+    the same time and that each thread has its own symbol tables."""
+    context = ParserFactory().create_context(std="f2008")
+    expected = repr(context(FortranStringReader(MODULE)))
+    results = {}
+    barrier = threading.Barrier(4)
+
+    def parse(idx):
+        """Parse a module with a name specific to this thread."""
+        barrier.wait()
+        code = MODULE.replace("my_mod", f"mod{idx}")
+        for _ in range(3):
+            tree = context(FortranStringReader(code))
+        results[idx] = (
+            repr(tree).replace(f"mod{idx}", "my_mod"),
+            list(context.symbol_tables._symbol_tables),
+        )
+
+    threads = [threading.Thread(target=parse, args=(idx,)) for idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4
+    for idx, (tree, tables) in results.items():
+        assert tree == expected
+        assert tables == [f"mod{idx}"]
+    # The symbol tables of this thread are unaffected.
+    assert list(context.symbol_tables._symbol_tables) == ["my_mod"]
+
+
+def test_context_iter_units():
+    """Test that a context parses the code one program unit at a time, only
+    being active while each unit is parsed."""
+    context = ParserFactory().create_context(std="f2008")
+    units = context.iter_units(FortranStringReader(SUBMODULE + MODULE))
+    unit = next(units)
+    assert isinstance(unit, Fortran2008.Submodule)
+    assert get_active_context() is None
+    unit = next(units)
+    assert isinstance(unit, Fortran2003.Module)
+    assert next(units, None) is None
+    assert "my_mod" in context.symbol_tables._symbol_tables
+
+
+def test_context_compact():
+    """Test that a context created with compact=True releases the parse
+    caches of the trees that it returns."""
+    context = ParserFactory().create_context(compact=True)
+    assert context.compact
+    assert not ParserFactory().create_context().compact
+    tree = context(FortranStringReader(MODULE))
+    assert "c = a * b" in str(tree)
+    for stmt in walk(tree, StmtBase):
+        assert not stmt.item.parse_cache
+    for unit in context.iter_units(FortranStringReader(MODULE)):
+        for stmt in walk(unit, StmtBase):
+            assert not stmt.item.parse_cache
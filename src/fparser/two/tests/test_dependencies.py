@@ -0,0 +1,216 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Module containing pytest tests for the scanning of the dependencies
+between Fortran source files in dependencies.py."""
+
+import json
+import pytest
+from fparser.common.sourceinfo import FortranFormat
+from fparser.two.dependencies import (
+    DependencyGraph,
+    ScanResult,
+    scan_file,
+    scan_files,
+    scan_source,
+)
+
+FREE_SOURCE = """\
+module my_mod
+  use other_mod, only: a, &
+      b
+  use, intrinsic :: iso_c_binding
+  use, non_intrinsic :: my_iso
+  use :: third_mod ! A comment
+  10 use labelled_mod
+  integer :: use
+  character(len=*), parameter :: text = "&
+&use not_a_module"
+  interface
+    module subroutine sub()
+    end subroutine sub
+  end interface
+contains
+  subroutine work()
+    call another(1, &
+       use)
+  end subroutine work
+end module my_mod
+#include "header.h"
+submodule (my_mod:parent_sub) my_sub
+  include 'my_inc.h'
+  use my_mod
+end submodule my_sub
+MODULE Second; USE Fourth_Mod
+end module second
+"""
+
+FIXED_SOURCE = """\
+      module fixed_mod
+      use
+     &  split_mod
+c     use commented_mod
+      include 'fixed.h'
+      end module
+"""
+
+
+def test_scan_source_free():
+    """Test that scan_source finds the modules provided and used and the
+    files included by free-format source."""
+    result = scan_source(FREE_SOURCE, "my_file.f90")
+    assert isinstance(result, ScanResult)
+    assert result.filename == "my_file.f90"
+    assert result.provides == ["my_mod", "my_mod:my_sub", "second"]
+    assert result.uses == [
+        "fourth_mod",
+        "labelled_mod",
+        "my_iso",
+        "my_mod:parent_sub",
+        "other_mod",
+        "third_mod",
+    ]
+    assert result.includes == ["header.h", "my_inc.h"]
+    assert result.error is None
+
+
+def test_scan_source_fixed():
+    """Test that scan_source deals with fixed-format source."""
+    result = scan_source(FIXED_SOURCE)
+    assert result.provides == ["fixed_mod"]
+    assert result.uses == ["split_mod"]
+    assert result.includes == ["fixed.h"]
+    # The format may be supplied.
+    result = scan_source(FIXED_SOURCE, mode=FortranFormat(False, False))
+    assert result.uses == ["split_mod"]
+
+
+def test_scan_source_empty():
+    """Test that scan_source returns empty lists for source without any
+    statements of interest."""
+    assert scan_source("program test\nend program\n") == ScanResult(
+        None, [], [], [], None
+    )
+    assert scan_source("") == ScanResult(None, [], [], [], None)
+
+
+def test_scan_file(tmpdir):
+    """Test that scan_file scans a file and records an error if the file
+    cannot be read."""
+    my_file = tmpdir.join("my_file.f90")
+    my_file.write(FREE_SOURCE)
+    result = scan_file(my_file.strpath)
+    assert result.provides == ["my_mod", "my_mod:my_sub", "second"]
+    missing = tmpdir.join("missing.f90").strpath
+    result = scan_file(missing)
+    assert result.filename == missing
+    assert result.provides == []
+    assert "No such file or directory" in result.error
+
+
+@pytest.fixture(name="source_files")
+def source_files_fixture(tmpdir):
+    """Create some Fortran source files that depend on each other.
+
+    :returns: the names of the files.
+    :rtype: List[str]
+
+    """
+    sources = {
+        "prog.f90": "program prog\n  use mod_b\n  use mod_a\nend program\n",
+        "b.f90": "module mod_b\n  use mod_a\n  use netcdf\nend module\n",
+        "a.f90": "module mod_a\nend module\n",
+        "c.f90": "module mod_c\nend module\n",
+        "sub.f90": "submodule (mod_c) sub\nend submodule\n",
+    }
+    filenames = []
+    for name, source in sources.items():
+        my_file = tmpdir.join(name)
+        my_file.write(source)
+        filenames.append(my_file.strpath)
+    return filenames
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_scan_files(source_files, jobs):
+    """Test that scan_files returns the outcome of scanning each file, in
+    order."""
+    results = scan_files(source_files, jobs=jobs)
+    assert [result.filename for result in results] == source_files
+    assert results[0].uses == ["mod_a", "mod_b"]
+    assert results[4].provides == ["mod_c:sub"]
+
+
+def test_scan_files_jobs_error():
+    """Test that scan_files rejects an invalid number of jobs."""
+    with pytest.raises(ValueError) as err:
+        scan_files([], jobs=0)
+    assert "number of jobs must be a positive integer but got '0'" in str(err.value)
+
+
+def test_dependency_graph(source_files):
+    """Test the dependencies and compile order in a DependencyGraph."""
+    prog, b_file, a_file, c_file, sub = source_files
+    graph = DependencyGraph(scan_files(source_files, jobs=1))
+    assert graph.providers["mod_a"] == a_file
+    assert graph.dependencies(prog) == [a_file, b_file]
+    assert graph.dependencies(a_file) == []
+    assert graph.dependencies(sub) == [c_file]
+    assert graph.external == {"netcdf": [b_file]}
+    assert not graph.duplicates
+    assert graph.compile_order() == [a_file, b_file, prog, c_file, sub]
+    data = json.loads(graph.to_json())
+    assert data == graph.as_dict()
+    assert data["files"][prog]["depends_on"] == [a_file, b_file]
+    assert data["compile_order"] == [a_file, b_file, prog, c_file, sub]
+    with pytest.raises(KeyError):
+        graph.dependencies("unknown.f90")
+
+
+def test_dependency_graph_errors():
+    """Test that a DependencyGraph records modules provided by more than
+    one file and reports circular dependencies."""
+    results = [
+        ScanResult("a.f90", ["mod_a"], ["mod_b"], [], None),
+        ScanResult("b.f90", ["mod_b"], ["mod_a"], [], None),
+        ScanResult("c.f90", ["mod_a"], [], [], None),
+        ScanResult("d.f90", [], [], [], None),
+    ]
+    graph = DependencyGraph(results)
+    assert graph.duplicates == {"mod_a": ["a.f90", "c.f90"]}
+    with pytest.raises(ValueError) as err:
+        graph.compile_order()
+    assert "There is a circular dependency between the files ['a.f90', 'b.f90']" in str(
+        err.value
+    )
@@ -0,0 +1,235 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the incremental re-parsing of Fortran source in
+fparser.two.incremental."""
+
+import pytest
+from fparser.common.readfortran import FortranStringReader
+from fparser.two.incremental import EditResult, IncrementalParser
+from fparser.two.parser import ParserFactory
+from fparser.two.utils import FortranSyntaxError, StmtBase, walk
+
+SOURCE = """\
+module my_mod
+  implicit none
+  integer :: g
+contains
+  ! The first routine.
+  subroutine a(x)
+    integer :: x
+    x = 1
+  end subroutine a
+  ! The second routine.
+  function b(y) result(z)
+    integer :: y, z
+    z = y
+  end function b
+end module my_mod
+program my_prog
+  use my_mod
+  integer :: i
+  i = 2
+contains
+  subroutine c()
+    print *, i
+  end subroutine c
+end program my_prog"""
+
+
+def _tables(symbol_tables):
+    """
+    :returns: the names of the tables and of the symbols in them.
+    :rtype: Dict[str, List[str]]
+    """
+    result = {}
+    stack = list(symbol_tables._symbol_tables.values())
+    while stack:
+        table = stack.pop()
+        result[table.name] = sorted(table._data_symbols)
+        stack.extend(table.children)
+    return result
+
+
+def _table_order(symbol_tables):
+    """
+    :returns: the names of the tables, in order, with those of the tables \
+        nested in each table following its name.
+    :rtype: List[str]
+    """
+    result = []
+    stack = list(reversed(symbol_tables._symbol_tables.values()))
+    while stack:
+        table = stack.pop()
+        result.append(table.name)
+        stack.extend(reversed(table.children))
+    return result
+
+
+def _check_same_as_full_parse(parser, ignore_comments):
+    """Checks that the tree and symbol tables of the supplied incremental
+    parser are the same as those from parsing the whole of its source."""
+    context = ParserFactory().create_context(std="f2008")
+    reader = FortranStringReader(parser.source, ignore_comments=ignore_comments)
+    tree = context(reader)
+    assert repr(parser.tree) == repr(tree)
+    assert [stmt.item.span for stmt in walk(parser.tree, StmtBase)] == [
+        stmt.item.span for stmt in walk(tree, StmtBase)
+    ]
+    assert _tables(parser.symbol_tables) == _tables(context.symbol_tables)
+    assert _table_order(parser.symbol_tables) == _table_order(context.symbol_tables)
+    for node in parser.tree.content:
+        assert node.parent is parser.tree
+
+
+@pytest.mark.parametrize("ignore_comments", [True, False])
+@pytest.mark.parametrize(
+    "start_line, end_line, text, parsed",
+    [
+        # Edits within a module subprogram.
+        (8, 8, "    x = 2\n    x = x + 1", "Subroutine_Subprogram"),
+        (7, 7, "    integer :: x, w", "Subroutine_Subprogram"),
+        (13, 13, "    z = y * 2", "Function_Subprogram"),
+        (8, 7, "    x = 5", "Subroutine_Subprogram"),
+        # An edit within an internal subprogram.
+        (22, 22, "    print *, i, i", "Subroutine_Subprogram"),
+        # Edits within a program unit but not within a subprogram.
+        (19, 19, "  i = 3", "Main_Program"),
+        (3, 3, "  integer :: g, h", "Module"),
+        # An edit that adds a subprogram.
+        (9, 9, "  end subroutine a\n  subroutine d()\n  end subroutine d", "Module"),
+        # An edit that adds a program unit.
+        (15, 15, "end module my_mod\nsubroutine e()\nend subroutine e", "Module"),
+    ],
+)
+def test_edit(start_line, end_line, text, parsed, ignore_comments):
+    """Test that an edit only parses again the smallest region that
+    contains it and gives the same result as parsing the whole of the
+    edited source."""
+    parser = IncrementalParser(std="f2008", ignore_comments=ignore_comments)
+    tree = parser.parse(SOURCE)
+    result = parser.edit(start_line, end_line, text)
+    assert isinstance(result, EditResult)
+    assert result.tree is tree
+    assert type(result.nodes[0]).__name__ == parsed
+    _check_same_as_full_parse(parser, ignore_comments)
+
+
+def test_edit_sequence():
+    """Test that a sequence of edits that change the numbers of lines
+    keeps the tree consistent with the source."""
+    parser = IncrementalParser(std="f2008")
+    parser.parse(SOURCE)
+    parser.edit(8, 8, "    x = 2\n    x = x + 1\n    x = x * 2")
+    parser.edit(15, 15, "    z = y + 1")
+    parser.edit(6, 6, "  subroutine a(x)\n    implicit none")
+    parser.edit(25, 24, "    print *, 'end'")
+    parser.edit(27, 27, "  end subroutine c ! done")
+    assert "PRINT *, 'end'" in str(parser.tree)
+    _check_same_as_full_parse(parser, True)
+
+
+def test_edit_errors():
+    """Test the errors raised by IncrementalParser.edit."""
+    parser = IncrementalParser()
+    with pytest.raises(ValueError) as err:
+        parser.edit(1, 1, "")
+    assert "No source has been parsed" in str(err.value)
+    parser.parse(SOURCE)
+    with pytest.raises(ValueError) as err:
+        parser.edit(30, 30, "")
+    assert "Cannot replace lines 30 to 30 of a source with 24 lines" in str(err.value)
+    with pytest.raises(ValueError):
+        parser.edit(3, 1, "")
+    # Invalid code results in a syntax error from parsing the whole of the
+    # source (so that the line number is correct).
+    with pytest.raises(FortranSyntaxError) as err:
+        parser.edit(9, 9, "  end function a")
+    assert "at line 9" in str(err.value)
+
+
+def test_edit_table_order():
+    """Test that the symbol table of a unit that is parsed again keeps its
+    position amongst the other tables."""
+    parser = IncrementalParser(std="f2008")
+    parser.parse(
+        "module m\nend module m\nmodule n\nend module n\n"
+        "subroutine s()\nend subroutine s"
+    )
+    assert _table_order(parser.symbol_tables) == ["m", "n", "s"]
+    result = parser.edit(2, 1, "  integer :: k")
+    assert type(result.nodes[0]).__name__ == "Module"
+    assert _table_order(parser.symbol_tables) == ["m", "n", "s"]
+    _check_same_as_full_parse(parser, True)
+
+
+def test_edit_after_error():
+    """Test that an edit that leaves the source invalid keeps the last
+    good tree and that a later edit that fixes the source parses it
+    again."""
+    parser = IncrementalParser(std="f2008")
+    tree = parser.parse(SOURCE)
+    with pytest.raises(FortranSyntaxError):
+        parser.edit(8, 8, "    x = = 1")
+    assert parser.tree is tree
+    assert "x = = 1" in parser.source
+    with pytest.raises(FortranSyntaxError):
+        parser.edit(13, 13, "    z = y * 2")
+    result = parser.edit(8, 8, "    x = 3")
+    assert "x = 3" in str(result.tree)
+    assert "z = y * 2" in str(result.tree)
+    _check_same_as_full_parse(parser, True)
+    # The next edit only parses the subprogram again.
+    result = parser.edit(8, 8, "    x = 4")
+    assert type(result.nodes[0]).__name__ == "Subroutine_Subprogram"
+    _check_same_as_full_parse(parser, True)
+    # An edit is allowed after the first parse fails.
+    parser = IncrementalParser()
+    with pytest.raises(FortranSyntaxError):
+        parser.parse("program p\nx = = 1\nend program p")
+    assert parser.tree is None
+    result = parser.edit(2, 2, "x = 1")
+    assert "x = 1" in str(result.tree)
+
+
+def test_edit_include(tmpdir, monkeypatch):
+    """Test that the whole of the source is parsed again if it includes
+    other files."""
+    tmpdir.join("inc.h").write("integer :: k\n")
+    monkeypatch.chdir(tmpdir)
+    parser = IncrementalParser()
+    parser.parse(SOURCE.replace("  integer :: i\n", "  include 'inc.h'\n"))
+    result = parser.edit(19, 19, "  i = 3")
+    assert len(result.nodes) == 2
+    assert "INTEGER :: k" in str(result.tree)
@@ -0,0 +1,152 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Module containing pytest tests for the parallel parsing of files in
+parallel.py."""
+
+import pickle
+import pytest
+from fparser.two import Fortran2003
+from fparser.two.parallel import ParseResult, parse_files
+from fparser.two.utils import walk
+
+
+@pytest.fixture(name="source_files")
+def source_files_fixture(tmpdir):
+    """Create some Fortran source files.
+
+    :returns: the names of the files.
+    :rtype: List[str]
+
+    """
+    filenames = []
+    for idx in range(4):
+        my_file = tmpdir.join(f"prog{idx}.f90")
+        my_file.write(f"program prog{idx}\n  ! comment\n  a = {idx}\nend program\n")
+        filenames.append(my_file.strpath)
+    return filenames
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_files(source_files, jobs):
+    """Test that the files are parsed and that the results are returned in
+    the order of the supplied filenames."""
+    results = parse_files(source_files, jobs=jobs)
+    assert [result.filename for result in results] == source_files
+    for idx, result in enumerate(results):
+        assert isinstance(result, ParseResult)
+        assert result.error is None
+        assert isinstance(result.result, Fortran2003.Program)
+        assert f"PROGRAM prog{idx}" in str(result.result)
+        assert walk(result.result, Fortran2003.Comment)
+        # The parent information must survive the return from a worker.
+        for node in walk(result.result, Fortran2003.Base):
+            for child in node.children:
+                if isinstance(child, Fortran2003.Base):
+                    assert child.parent is node
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_files_errors(source_files, tmpdir, jobs):
+    """Test that an error in one file is recorded in its result and does
+    not stop the other files from being parsed."""
+    broken = tmpdir.join("broken.f90")
+    broken.write("prog hello\nen\n")
+    missing = tmpdir.join("missing.f90").strpath
+    filenames = [source_files[0], broken.strpath, missing, source_files[1]]
+    results = parse_files(filenames, jobs=jobs, output="fortran")
+    assert [result.filename for result in results] == filenames
+    assert results[0].error is None
+    assert results[1].result is None
+    assert "Syntax error: at line 1\n>>>prog hello" in results[1].error
+    assert results[2].result is None
+    assert "No such file or directory" in results[2].error
+    assert results[3].result == "PROGRAM prog1\n  ! comment\n  a = 1\nEND PROGRAM"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_files_reader_error(source_files, tmpdir, jobs):
+    """Test that an error that makes the reader stop (such as a name in an
+    END statement that does not match) is recorded in the result for that
+    file rather than ending the whole batch."""
+    bad = tmpdir.join("bad.f90")
+    bad.write("subroutine a()\nend subroutine b\n")
+    filenames = [bad.strpath, source_files[0]]
+    results = parse_files(filenames, jobs=jobs, output="fortran")
+    assert results[0].result is None
+    assert results[0].error.startswith("Syntax error: ")
+    assert "expected <subroutine-name> is a but got b" in results[0].error
+    assert results[1].error is None
+    assert results[1].result.startswith("PROGRAM prog0")
+
+
+def test_parse_files_output(source_files):
+    """Test the different kinds of output."""
+    result = parse_files(source_files[:1], output="fortran")[0]
+    assert result.result == "PROGRAM prog0\n  ! comment\n  a = 0\nEND PROGRAM"
+    result = parse_files(source_files[:1], output="repr")[0]
+    assert result.result.startswith("Program(Main_Program(Program_Stmt(")
+    result = parse_files(source_files[:1], output="none")[0]
+    assert result == ParseResult(source_files[0], None, None)
+    result = parse_files(source_files[:1], output="fortran", ignore_comments=True)[0]
+    assert result.result == "PROGRAM prog0\n  a = 0\nEND PROGRAM"
+    result = parse_files(source_files[:1], std="f2008", packrat=True)[0]
+    assert isinstance(result.result, Fortran2003.Program)
+
+
+def test_parse_files_pickle(source_files):
+    """Test that a tree parsed from a file can be pickled (as is required
+    to return it from a worker process)."""
+    tree = parse_files(source_files[:1], jobs=1)[0].result
+    new_tree = pickle.loads(pickle.dumps(tree))
+    assert repr(new_tree) == repr(tree)
+
+
+def test_parse_files_invalid(source_files):
+    """Test that parse_files raises the expected exceptions when supplied
+    with invalid arguments."""
+    for jobs in [0, -1, 1.5]:
+        with pytest.raises(ValueError) as err:
+            parse_files(source_files, jobs=jobs)
+        assert f"The number of jobs must be a positive integer but got '{jobs}'" in str(
+            err.value
+        )
+    with pytest.raises(ValueError) as err:
+        parse_files(source_files, output="xml")
+    assert "The output must be one of " in str(err.value)
+    assert "but got 'xml'" in str(err.value)
+    with pytest.raises(ValueError) as err:
+        parse_files(source_files, std="invalid")
+    assert "is an invalid standard" in str(err.value)
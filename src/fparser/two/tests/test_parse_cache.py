@@ -0,0 +1,172 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Module containing pytest tests for the on-disk cache of parse trees in
+parse_cache.py."""
+
+import os
+import pytest
+from fparser.common.readfortran import FortranFileReader, FortranStringReader
+from fparser.two import Fortran2003, parse_cache
+from fparser.two.parse_cache import ParseCache
+from fparser.two.utils import FortranSyntaxError
+
+CODE = "program test\n  ! comment\n  integer :: a\n  a = 1\nend program test\n"
+
+
+def _entries(directory):
+    """
+    :param str directory: the directory holding a cache.
+
+    :returns: the names of the files holding the cache entries.
+    :rtype: List[str]
+
+    """
+    return [
+        filename
+        for _, _, filenames in os.walk(directory)
+        for filename in filenames
+        if filename.endswith(".pickle")
+    ]
+
+
+def test_parse_cache_string(tmpdir):
+    """Test that the tree for a string is parsed once and then obtained
+    from the cache, including by another ParseCache object."""
+    directory = tmpdir.join("cache").strpath
+    cache = ParseCache(directory)
+    assert repr(cache) == f"ParseCache({directory!r}, std='f2003')"
+    tree = cache.parse(FortranStringReader(CODE, ignore_comments=False))
+    assert isinstance(tree, Fortran2003.Program)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert len(_entries(directory)) == 1
+    new_tree = cache.parse(FortranStringReader(CODE, ignore_comments=False))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert new_tree is not tree
+    assert repr(new_tree) == repr(tree)
+    assert str(new_tree) == str(tree)
+    other_cache = ParseCache(directory)
+    assert str(other_cache.parse(FortranStringReader(CODE, ignore_comments=False)))
+    assert other_cache.hits == 1
+
+
+def test_parse_cache_key(tmpdir):
+    """Test that the key of an entry depends upon the source, the standard
+    and the options of the reader."""
+    cache = ParseCache(tmpdir.strpath)
+    key = cache.key(FortranStringReader(CODE))
+    assert key == cache.key(FortranStringReader(CODE))
+    assert key != cache.key(FortranStringReader(CODE + "\n"))
+    assert key != cache.key(FortranStringReader(CODE, ignore_comments=False))
+    assert key != cache.key(FortranStringReader(CODE, process_directives=True))
+    assert key != ParseCache(tmpdir.strpath, std="f2008").key(FortranStringReader(CODE))
+    reader = FortranStringReader(CODE)
+    reader.get_item()
+    # A reader that has been read from cannot be used with the cache.
+    assert cache.key(reader) is None
+
+
+def test_parse_cache_file(tmpdir):
+    """Test that the tree for a file is cached and that the entry is not
+    used once the file (or a file that it includes) changes."""
+    include_file = tmpdir.join("test.inc")
+    include_file.write("integer :: b\n")
+    my_file = tmpdir.join("test.f90")
+    my_file.write("program test\ninclude 'test.inc'\nend program test\n")
+    cache = ParseCache(tmpdir.join("cache").strpath)
+    tree = cache.parse(FortranFileReader(my_file.strpath))
+    assert "INTEGER :: b" in str(tree)
+    tree = cache.parse(FortranFileReader(my_file.strpath))
+    assert "INTEGER :: b" in str(tree)
+    assert (cache.hits, cache.misses) == (1, 1)
+    include_file.write("integer :: c\n")
+    tree = cache.parse(FortranFileReader(my_file.strpath))
+    assert "INTEGER :: c" in str(tree)
+    assert (cache.hits, cache.misses) == (1, 2)
+    my_file.write("program test\ninclude 'test.inc'\nend program\n")
+    tree = cache.parse(FortranFileReader(my_file.strpath))
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_parse_cache_uncacheable(tmpdir, monkeypatch):
+    """Test that a reader whose source is not known is parsed but the tree
+    is not cached."""
+    directory = tmpdir.join("cache").strpath
+    cache = ParseCache(directory)
+    monkeypatch.setattr(parse_cache, "_reader_source", lambda reader: None)
+    assert cache.parse(FortranStringReader(CODE))
+    assert cache.parse(FortranStringReader(CODE))
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert not os.path.exists(directory)
+
+
+def test_parse_cache_damaged(tmpdir):
+    """Test that a damaged entry is replaced and that syntax errors are not
+    cached."""
+    directory = tmpdir.join("cache").strpath
+    cache = ParseCache(directory)
+    tree = cache.parse(FortranStringReader(CODE))
+    # pylint: disable=protected-access
+    path = cache._path(cache.key(FortranStringReader(CODE)))
+    with open(path, "wb") as cache_file:
+        cache_file.write(b"not a pickle")
+    assert repr(cache.parse(FortranStringReader(CODE))) == repr(tree)
+    assert cache.misses == 2
+    assert repr(cache.parse(FortranStringReader(CODE))) == repr(tree)
+    assert cache.hits == 1
+    with pytest.raises(FortranSyntaxError):
+        cache.parse(FortranStringReader("prog test\nen\n"))
+    assert len(_entries(directory)) == 1
+
+
+def test_parse_cache_clear(tmpdir):
+    """Test the clear method of ParseCache."""
+    directory = tmpdir.join("cache").strpath
+    cache = ParseCache(directory)
+    # Clearing a cache that does not yet exist does nothing.
+    cache.clear()
+    cache.parse(FortranStringReader(CODE))
+    assert len(_entries(directory)) == 1
+    cache.clear()
+    assert not _entries(directory)
+    cache.parse(FortranStringReader(CODE))
+    assert cache.misses == 2
+
+
+def test_parse_cache_invalid_std(tmpdir):
+    """Test that an invalid standard is rejected."""
+    with pytest.raises(ValueError) as err:
+        ParseCache(tmpdir.strpath, std="invalid")
+    assert "'invalid' is an invalid standard" in str(err.value)
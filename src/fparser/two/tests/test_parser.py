@@ -33,10 +33,12 @@
 
 """Module containing tests for the parser file"""
 
+import json
 import pytest
-from fparser.two.parser import ParserFactory
-from fparser.common.readfortran import FortranStringReader
-from fparser.two.utils import FortranSyntaxError, StmtBase
+from fparser.two import parser as parser_module
+from fparser.two.parser import ParserFactory, load_hierarchy, save_hierarchy
+from fparser.common.readfortran import FortranFileReader, FortranStringReader
+from fparser.two.utils import Base, FortranSyntaxError, StmtBase, walk
 from fparser.two.symbol_table import SYMBOL_TABLES
 from fparser.two import Fortran2003, Fortran2008
 
@@ -193,3 +195,98 @@ def test_pickle():
     new_ast = pickle.loads(s)
 
     _cmp_tree_types_rec(new_ast, ast)
+
+
+def test_pickle_comments_and_file(tmpdir):
+    """
+    Test that we can pickle and unpickle a tree that contains comments and
+    directives and that was parsed from a file.
+    """
+    my_file = tmpdir.join("prog.f90")
+    my_file.write("program a\n! a comment\n!$omp barrier\nx = 1 ! inline\nend\n")
+    parser = ParserFactory().create(std="f2008")
+    reader = FortranFileReader(my_file.strpath, ignore_comments=False)
+    reader.process_directives = True
+    ast = parser(reader)
+
+    import pickle
+
+    new_ast = pickle.loads(pickle.dumps(ast))
+
+    _cmp_tree_types_rec(new_ast, ast)
+    assert str(new_ast) == str(ast)
+    assert walk(new_ast, Fortran2003.Comment)
+    assert walk(new_ast, Fortran2003.Directive)
+
+
+@pytest.mark.parametrize("std", ["f2003", "f2008"])
+def test_hierarchy_memoized(std, monkeypatch):
+    """Test that the class hierarchy for a standard is only computed once
+    and that modifying Base.subclasses does not affect the memoized
+    hierarchy."""
+    ParserFactory().create(std=std)
+    subclasses = Base.subclasses
+
+    def fake_get_module_classes(_):
+        """Fails if the class hierarchy is computed again."""
+        raise AssertionError("The class hierarchy should not be recomputed")
+
+    monkeypatch.setattr(parser_module, "get_module_classes", fake_get_module_classes)
+    ParserFactory().create(std=std)
+    assert Base.subclasses == subclasses
+    assert Base.subclasses is not subclasses
+    assert "Execution_Part_Construct" in Base.subclass_index
+    Base.subclasses["Name"].append(Fortran2003.Program)
+    ParserFactory().create(std=std)
+    assert Fortran2003.Program not in Base.subclasses["Name"]
+
+
+def test_save_load_hierarchy(tmp_path, monkeypatch):
+    """Test that a class hierarchy written by save_hierarchy can be read by
+    load_hierarchy and is then used by the ParserFactory."""
+    filename = str(tmp_path / "f2008.json")
+    save_hierarchy(filename, std="f2008")
+    expected = ParserFactory()._hierarchy("f2008")
+    monkeypatch.setattr(parser_module, "_HIERARCHIES", {})
+    assert load_hierarchy(filename) == "f2008"
+    assert list(parser_module._HIERARCHIES) == ["f2008"]
+    ParserFactory().create(std="f2008")
+    assert Base.subclasses == expected
+    reader = FortranStringReader("submodule (x) y\nend\n")
+    assert "SUBMODULE (x) y" in str(ParserFactory().create(std="f2008")(reader))
+    # The default standard is f2003.
+    save_hierarchy(filename)
+    assert load_hierarchy(filename) == "f2003"
+
+
+def test_load_hierarchy_errors(tmp_path):
+    """Test that load_hierarchy rejects invalid files."""
+    filename = str(tmp_path / "hierarchy.json")
+    save_hierarchy(filename)
+    with open(filename, "r", encoding="utf-8") as cfile:
+        content = json.load(cfile)
+
+    def check(new_content, message):
+        """Write the content to the file and check that loading it fails
+        with the supplied message."""
+        with open(filename, "w", encoding="utf-8") as cfile:
+            if isinstance(new_content, str):
+                cfile.write(new_content)
+            else:
+                json.dump(new_content, cfile)
+        with pytest.raises(ValueError) as err:
+            load_hierarchy(filename)
+        assert message in str(err.value)
+
+    check("{", "is not a valid JSON file")
+    check(dict(content, fparser="0.0.1"), "written by fparser version '0.0.1'")
+    check(dict(content, std="f77"), "'f77' is an invalid standard")
+    check({"format": 1}, "does not contain a valid class hierarchy")
+    check(
+        dict(content, subclasses={"Name": ["fparser.two.Fortran2003:Missing"]}),
+        "does not contain a valid class hierarchy",
+    )
+    check(
+        dict(content, subclasses={"Name": ["fparser.missing:Name"]}),
+        "does not contain a valid class hierarchy",
+    )
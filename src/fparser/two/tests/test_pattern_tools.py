@@ -39,6 +39,7 @@
 Test battery associated with fparser.two.pattern_tools package.
 """
 
+import re
 import pytest
 import fparser.two.pattern_tools
 
@@ -161,3 +162,60 @@ def test_attr_spec_pattern(pattern):
     assert abs_attr_spec.match(pattern.lower())
     assert not abs_attr_spec.match("X" + pattern)
     assert not abs_attr_spec.match(pattern + "X")
+
+
+def test_pattern_registry():
+    """Tests that the registry interns the compiled regular expressions and
+    counts their uses when requested."""
+    registry = fparser.two.pattern_tools.PatternRegistry()
+    assert len(registry) == 0
+    compiled = registry.compile("[a-z]+", re.I)
+    assert registry.compile("[a-z]+", re.I) is compiled
+    assert registry.compile("[a-z]+") is not compiled
+    assert len(registry) == 2
+    assert not registry.counting
+    assert registry.stats() == (2, [])
+    registry.count()
+    assert registry.counting
+    registry.record(compiled)
+    registry.record(compiled)
+    registry.record(registry.compile("[a-z]+"))
+    assert registry.stats() == (
+        2,
+        [("[a-z]+", compiled.flags, 2), ("[a-z]+", re.compile("[a-z]+").flags, 1)],
+    )
+    assert registry.report(limit=1).split("\n") == [
+        "2 distinct regular expressions, 3 uses counted",
+        "         2 [a-z]+",
+    ]
+    registry.count(False)
+    registry.clear_counts()
+    assert registry.stats() == (2, [])
+
+
+def test_pattern_interning(monkeypatch):
+    """Tests that patterns with the same regular expression share a compiled
+    object, that the patterns derived by abs() and named() are only created
+    once and that the uses of the patterns are counted."""
+    registry = fparser.two.pattern_tools.PatternRegistry()
+    monkeypatch.setattr(fparser.two.pattern_tools, "REGISTRY", registry)
+    Pattern = fparser.two.pattern_tools.Pattern
+    first = Pattern("<first>", r"\d+")
+    second = Pattern("<second>", r"\d+")
+    assert first.get_compiled() is second.get_compiled()
+    assert abs(first) is abs(first)
+    assert first.named() is first.named()
+    assert first.named("value") is first.named("value")
+    assert first.named("value") is not first.named()
+    assert first.named("value").match("12").group("value") == "12"
+
+    registry.count()
+    assert first.match("12")
+    assert second.search("a12")
+    operator = Pattern("<op>", "[+]").named()
+    assert operator.rsplit("a + b") == ("a", "+", "b")
+    distinct, uses = registry.stats()
+    assert distinct == len(registry)
+    uses = {pattern: count for pattern, _, count in uses}
+    # rsplit also checks the match against the abs() of the pattern.
+    assert uses == {r"\d+": 2, "(?P<op>[+])": 1, r"\A(?P<op>[+])\Z": 1}
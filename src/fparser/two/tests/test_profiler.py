@@ -0,0 +1,191 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Module containing pytest tests for the grammar-rule profiler in
+profiler.py."""
+
+import json
+import threading
+import time
+import pytest
+from fparser.common.readfortran import FortranStringReader
+from fparser.two import Fortran2003
+from fparser.two.profiler import COLUMNS, RuleProfiler, RuleStats
+from fparser.two.utils import Base, BlockBase, NoMatchError
+
+SOURCE = """\
+program prog
+  integer :: i
+  do i = 1, 10
+    if (i > 2) then
+      print *, i + 1
+    end if
+  end do
+end program prog
+"""
+
+
+def test_profiler_records(f2003_create):
+    """Test that the profiler records the attempts, matches and
+    NoMatchErrors of the rules and that it does not change the result of
+    parsing."""
+    expected = str(Fortran2003.Program(FortranStringReader(SOURCE)))
+    with RuleProfiler() as profiler:
+        assert profiler.enabled
+        program = Fortran2003.Program(FortranStringReader(SOURCE))
+    assert not profiler.enabled
+    assert str(program) == expected
+    stats = {row.name: row for row in profiler.stats()}
+    assert stats["Print_Stmt"].matches >= 1
+    assert stats["Print_Stmt"].attempts >= 1
+    assert stats["If_Then_Stmt"].matches >= 1
+    assert stats["Real_Literal_Constant"].matches == 0
+    assert stats["Real_Literal_Constant"].no_match_errors > 0
+    block = stats["BlockBase.match(If_Then_Stmt)"]
+    assert block.attempts >= 1
+    assert block.matches >= 1
+    for row in stats.values():
+        assert row.matches + row.no_match_errors <= row.attempts
+        assert 0.0 <= row.self_time
+        # Allow for rounding errors.
+        assert row.self_time <= row.cumulative_time + 1e-6
+    # The cumulative time of the outermost rule includes everything else.
+    assert stats["Program"].cumulative_time == pytest.approx(
+        profiler.total_time, rel=1e-6
+    )
+
+
+def test_profiler_restores():
+    """Test that enabling and disabling the profiler leaves the original
+    Base.__new__ and BlockBase.match in place, that only one profiler can
+    be enabled at a time and that statistics are kept until reset."""
+    original = (Base.__dict__["__new__"], BlockBase.__dict__["match"])
+    profiler = RuleProfiler()
+    # Disabling a profiler that is not enabled does nothing.
+    profiler.disable()
+    profiler.enable()
+    assert Base.__dict__["__new__"] is not original[0]
+    with pytest.raises(RuntimeError) as err:
+        RuleProfiler().enable()
+    assert "A RuleProfiler is already enabled." in str(err.value)
+    with pytest.raises(NoMatchError):
+        Fortran2003.Name("1a")
+    profiler.disable()
+    assert (Base.__dict__["__new__"], BlockBase.__dict__["match"]) == original
+    assert profiler.stats()[0].name == "Name"
+    assert profiler.stats()[0].no_match_errors == 1
+    # Statistics are not recorded while the profiler is disabled.
+    Fortran2003.Name("a")
+    assert profiler.stats()[0].attempts == 1
+    # Another profiler may now be enabled.
+    with RuleProfiler():
+        pass
+    profiler.reset()
+    assert profiler.stats() == []
+    assert profiler.total_time == 0.0
+
+
+def test_profiler_output():
+    """Test the sorting and export of the statistics."""
+    profiler = RuleProfiler()
+    with profiler:
+        Fortran2003.Name("a")
+        Fortran2003.Name("b")
+        Fortran2003.Int_Literal_Constant("1")
+    assert [row.name for row in profiler.stats("attempts")] == [
+        "Name",
+        "Int_Literal_Constant",
+    ]
+    assert [row.name for row in profiler.stats("rule")] == [
+        "Int_Literal_Constant",
+        "Name",
+    ]
+    with pytest.raises(ValueError) as err:
+        profiler.stats("speed")
+    assert "Cannot sort the profile by 'speed'" in str(err.value)
+
+    result = json.loads(profiler.to_json(sort="attempts", limit=1))
+    assert list(result) == ["total_time", "rules"]
+    assert len(result["rules"]) == 1
+    assert result["rules"][0]["rule"] == "Name"
+    assert result["rules"][0]["attempts"] == 2
+    assert result["rules"][0]["matches"] == 2
+    assert set(result["rules"][0]) == {"rule"} | set(COLUMNS)
+
+    lines = profiler.table(sort="attempts").split("\n")
+    assert len(lines) == 3
+    assert lines[0].split() == [
+        "rule",
+        "attempts",
+        "matches",
+        "nomatch",
+        "cumtime",
+        "selftime",
+    ]
+    assert lines[1].split()[:4] == ["Name", "2", "2", "0"]
+
+
+def test_rule_stats():
+    """Test the RuleStats class."""
+    stats = RuleStats("Name")
+    assert stats.as_dict() == {
+        "rule": "Name",
+        "attempts": 0,
+        "matches": 0,
+        "no_match_errors": 0,
+        "cumulative_time": 0.0,
+        "self_time": 0.0,
+    }
+
+
+def test_profiler_threads():
+    """Test that matches of the same rule in different threads at the same
+    time are each included in its cumulative time."""
+    profiler = RuleProfiler()
+    barrier = threading.Barrier(2)
+
+    def match():
+        barrier.wait()
+        time.sleep(0.05)
+
+    threads = [
+        threading.Thread(target=profiler._profile, args=("Rule", match, (), {}))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    (stats,) = profiler.stats()
+    assert stats.attempts == 2
+    assert stats.cumulative_time >= 0.1
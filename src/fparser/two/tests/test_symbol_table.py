@@ -208,6 +208,51 @@ def test_parent_child():
     )
 
 
+def test_lookup_cache():
+    """Test that the results of lookups (including failed lookups) are cached
+    and that the cache of a table is invalidated when a symbol is added to
+    or a module is used by it or one of its ancestors or when the parent of
+    any of them changes."""
+    table = SymbolTable("outer")
+    inner_table = SymbolTable("inner", parent=table)
+    table.add_child(inner_table)
+    inner_table.add_data_symbol("a", "real")
+    assert not inner_table.has_symbol("b")
+    with pytest.raises(KeyError) as err:
+        inner_table.lookup("B")
+    assert "Failed to find symbol named 'b'" in str(err.value)
+    assert inner_table._lookup_cache == {"b": None}
+    assert inner_table.has_symbol("A")
+    assert inner_table._lookup_cache["a"].primitive_type == "real"
+    # Adding a symbol to the parent table must invalidate the cache of the
+    # child table.
+    table.add_data_symbol("b", "integer")
+    assert inner_table.has_symbol("b")
+    assert inner_table.lookup("b").primitive_type == "integer"
+    assert not inner_table.has_symbol("c")
+    table.add_use_symbols("my_mod", only_list=[("c", None)])
+    assert inner_table.lookup("c").primitive_type == "unknown"
+    # Symbols from a module used more than once.
+    assert not inner_table.has_symbol("d")
+    table.add_use_symbols("my_mod", only_list=[("d", None)])
+    assert inner_table.has_symbol("D")
+    # Changing the parent of a table.
+    inner_table.parent = None
+    assert not inner_table.has_symbol("b")
+    assert inner_table.has_symbol("a")
+    # Modifying an unrelated table leaves the cache alone.
+    assert not inner_table.has_symbol("e")
+    table.add_data_symbol("e", "real")
+    assert inner_table._lookup_cache["e"] is None
+    # Changing the parent of an ancestor.
+    inner_table.parent = table
+    outer_table = SymbolTable("outermost")
+    outer_table.add_data_symbol("f", "logical")
+    assert not inner_table.has_symbol("f")
+    table.parent = outer_table
+    assert inner_table.lookup("f").primitive_type == "logical"
+
+
 def test_root_property():
     """Test the `root` property of the SymbolTable."""
     table = SymbolTable("BASIC")
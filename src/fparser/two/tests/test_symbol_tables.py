@@ -38,7 +38,13 @@ of fparser2."""
 
 import pytest
 from fparser.two import Fortran2003
-from fparser.two.symbol_table import SymbolTables, SymbolTable, SymbolTableError
+from fparser.two.parser import ParserFactory
+from fparser.two.symbol_table import (
+    SYMBOL_TABLES,
+    SymbolTables,
+    SymbolTable,
+    SymbolTableError,
+)
 
 
 def test_construction_addition_removal():
@@ -164,3 +170,26 @@ def test_nested_removal():
     tables.remove("some_mod")
     assert "some_mod" not in tables._symbol_tables
     assert "another_mod" in tables._symbol_tables
+
+
+def test_active_symbol_tables():
+    """Test that SYMBOL_TABLES forwards attribute access to the symbol tables
+    of the active parser context or, if there is none, to the global symbol
+    tables."""
+    context = ParserFactory().create_context()
+    global_tables = SYMBOL_TABLES.active()
+    assert isinstance(global_tables, SymbolTables)
+    with context.activate():
+        assert SYMBOL_TABLES.active() is context.symbol_tables
+        SYMBOL_TABLES.enable_checks(True)
+        # Attributes may be set and deleted.
+        SYMBOL_TABLES.new_attribute = 1
+        assert context.symbol_tables.new_attribute == 1
+        del SYMBOL_TABLES.new_attribute
+        assert not hasattr(context.symbol_tables, "new_attribute")
+        SYMBOL_TABLES.enter_scope("some_mod")
+        assert "SymbolTables: 1 tables" in str(SYMBOL_TABLES)
+    assert context.symbol_tables._enable_checks
+    assert not global_tables._enable_checks
+    assert SYMBOL_TABLES.active() is global_tables
+    assert "some_mod" not in SYMBOL_TABLES._symbol_tables
@@ -38,7 +38,7 @@ import pytest
 
 from fparser.api import get_reader
 from fparser.two.symbol_table import SYMBOL_TABLES
-from fparser.two.utils import BlockBase
+from fparser.two.utils import BlockBase, StmtBase, walk
 import fparser.two.Fortran2003 as F2003
 
 # TODO #179: full testing of this class. We currently only test the
@@ -287,3 +287,24 @@ end module my_mod
     # symbol-table entries.
     assert result is None
     assert SYMBOL_TABLES._symbol_tables == {}
+
+
+def test_release_parse_cache(f2003_create):
+    """Test that the outcomes of the matches cached in the lines of the
+    statements in a block are released once the block has matched."""
+    reader = get_reader(
+        "program test\n"
+        "integer :: i\n"
+        "do i = 1, 10\n"
+        "  print *, i\n"
+        "end do\n"
+        "end program test\n"
+    )
+    program = F2003.Program(reader)
+    statements = walk(program, StmtBase)
+    assert len(statements) == 6
+    for stmt in statements:
+        assert not stmt.item.parse_cache
+    stats = reader.parse_cache_stats
+    assert stats.misses > 0
+    assert stats.released == stats.misses
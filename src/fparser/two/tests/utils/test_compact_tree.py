@@ -0,0 +1,100 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Test the compact_tree() routine provided by utils.py."""
+
+import copy
+import pickle
+import pytest
+from fparser.common.readfortran import FortranStringReader, Line
+from fparser.two import Fortran2003
+from fparser.two.utils import Base, CompactItem, StmtBase, compact_tree, walk
+
+CODE = """\
+program test
+  ! A comment
+  integer :: i, total
+  total = 0
+  outer: do i = 1, 10
+    total = total + i * (i - 1)
+  end do outer
+10 continue
+end program test
+"""
+
+
+@pytest.mark.usefixtures("f2003_create")
+def test_compact_tree():
+    """Test that compact_tree releases the parse caches of the source lines
+    without changing the tree."""
+    tree = Fortran2003.Program(FortranStringReader(CODE))
+    expected = tree.tofortran()
+    lines = [node.item for node in walk(tree, StmtBase)]
+    # The caches are released as statements are accepted into blocks so
+    # store an outcome to be released.
+    lines[0].parse_cache[Fortran2003.Name] = None
+    assert compact_tree(tree) == len(walk(tree, Base))
+    assert not any(line.parse_cache for line in lines)
+    assert tree.string is not None
+    assert tree.tofortran() == expected
+    # A list of nodes may also be supplied.
+    assert compact_tree(tree.children) == len(walk(tree, Base)) - 1
+
+
+@pytest.mark.usefixtures("f2003_create")
+def test_compact_tree_drop():
+    """Test that compact_tree optionally discards the strings and source
+    lines held by the tree while still generating the same Fortran."""
+    tree = Fortran2003.Program(FortranStringReader(CODE, ignore_comments=False))
+    expected = tree.tofortran()
+    compact_tree(tree, drop_strings=True, drop_items=True)
+    assert tree.tofortran() == expected
+    assert tree.string is None
+    names = walk(tree, Fortran2003.Name)
+    assert [str(name) for name in names[:3]] == ["test", "i", "total"]
+    for node in walk(tree, StmtBase):
+        assert isinstance(node.item, CompactItem)
+    do_stmt = walk(tree, Fortran2003.Nonlabel_Do_Stmt)[0]
+    assert do_stmt.item.name == "outer"
+    assert do_stmt.item.span == (5, 5)
+    assert do_stmt.get_start_name() == "outer"
+    continue_stmt = walk(tree, Fortran2003.Continue_Stmt)[0]
+    assert continue_stmt.item.label == 10
+    assert repr(continue_stmt.item) == "CompactItem(10, None, (8, 8))"
+    # Comments keep the item produced by the reader.
+    comment = walk(tree, Fortran2003.Comment)[0]
+    assert not isinstance(comment.item, (CompactItem, Line))
+    # Compacted trees can still be copied and pickled.
+    assert copy.deepcopy(tree).tofortran() == expected
+    assert pickle.loads(pickle.dumps(tree)).tofortran() == expected
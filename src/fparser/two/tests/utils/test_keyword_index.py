@@ -0,0 +1,151 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Module containing pytest tests for the KeywordIndex class in utils.py
+and its set-up by the ParserFactory."""
+
+import pytest
+from fparser.api import get_reader
+from fparser.common.readfortran import FortranStringReader
+from fparser.common.sourceinfo import FortranFormat
+from fparser.two import Fortran2003, Fortran2008
+from fparser.two.parser import LEADING_KEYWORDS, ParserFactory
+from fparser.two.utils import Base, KeywordIndex
+
+SUBCLASSES = [
+    Fortran2003.Allocate_Stmt,
+    Fortran2003.Assignment_Stmt,
+    Fortran2003.Endfile_Stmt,
+    Fortran2003.Call_Stmt,
+    Fortran2003.End_Do_Stmt,
+]
+
+
+def test_keyword_index_string():
+    """Test that the candidates for a string are those classes whose
+    keywords match its leading word (plus any without keywords), in their
+    original order."""
+    index = KeywordIndex(SUBCLASSES, LEADING_KEYWORDS)
+    assert index.subclasses is SUBCLASSES
+    assert index.candidates("call foo(a)") == [
+        Fortran2003.Assignment_Stmt,
+        Fortran2003.Call_Stmt,
+    ]
+    # Keywords are prefixes of the leading word.
+    assert index.candidates("  ENDDO") == [
+        Fortran2003.Assignment_Stmt,
+        Fortran2003.Endfile_Stmt,
+        Fortran2003.End_Do_Stmt,
+    ]
+    assert index.candidates("end do") == index.candidates("ENDDO")
+    assert index.candidates("a(1:2) = b") == [Fortran2003.Assignment_Stmt]
+    # The result for each leading word is only computed once.
+    assert index.candidates("CALL x") is index.candidates("call y")
+
+
+@pytest.mark.parametrize("string", ["", "10 continue", "name: do", "= 1", None])
+def test_keyword_index_fallback(string):
+    """Test that all of the subclasses are candidates if the leading
+    keyword cannot be determined."""
+    index = KeywordIndex(SUBCLASSES, LEADING_KEYWORDS)
+    assert index.candidates(string) is SUBCLASSES
+
+
+def test_keyword_index_reader():
+    """Test that the candidates for a reader are determined from its next
+    item and that the item is returned to the reader."""
+    index = KeywordIndex(SUBCLASSES, LEADING_KEYWORDS)
+    reader = FortranStringReader("! a comment\n10 call foo(a)\n", ignore_comments=False)
+    reader.set_format(FortranFormat(True, False))
+    assert index.candidates(reader) is SUBCLASSES
+    assert reader.get_item().comment == "! a comment"
+    assert index.candidates(reader) == [
+        Fortran2003.Assignment_Stmt,
+        Fortran2003.Call_Stmt,
+    ]
+    item = reader.get_item()
+    assert item.line == "call foo(a)"
+    assert item.label == 10
+    assert index.candidates(reader) is SUBCLASSES
+
+
+@pytest.mark.parametrize("std", ["f2003", "f2008"])
+def test_subclass_index_setup(std):
+    """Test that the ParserFactory indexes the lists of statements and that
+    every class with keywords exists."""
+    ParserFactory().create(std=std)
+    assert "Execution_Part_Construct" in Base.subclass_index
+    assert "Declaration_Construct" in Base.subclass_index
+    # Lists of expressions are not indexed.
+    assert "Expr" not in Base.subclass_index
+    for clsname, index in Base.subclass_index.items():
+        assert index.subclasses is Base.subclasses[clsname]
+    for clsname in LEADING_KEYWORDS:
+        assert hasattr(Fortran2003, clsname) or hasattr(Fortran2008, clsname)
+    candidates = Base.subclass_index["Executable_Construct"].candidates("block")
+    names = [subcls.__name__ for subcls in candidates]
+    if std == "f2008":
+        assert names == [
+            "Assignment_Stmt",
+            "Pointer_Assignment_Stmt",
+            "Block_Construct",
+        ]
+    else:
+        assert names == ["Assignment_Stmt", "Pointer_Assignment_Stmt"]
+
+
+def test_subclass_index_parse():
+    """Test that using the index does not change the parse tree."""
+    code = """\
+program test
+  integer :: i, go, if
+  real :: a(10)
+  go = 1
+  if = 2
+  lab: do i = 1, 10
+    if (a(i) > 0.0) a(i) = 0.0
+    call work(a(i))
+  end do lab
+  do 10 i = 1, 10
+    a(i) = 1.0
+10 continue
+  goto 20
+20 write(*, *) a
+end program test
+"""
+    parser = ParserFactory().create(std="f2008")
+    tree = parser(get_reader(code))
+    Base.subclass_index = {}
+    assert repr(tree) == repr(parser(get_reader(code)))
@@ -0,0 +1,178 @@
+# Copyright (c) 2026 Science and Technology Facilities Council.
+
+# All rights reserved.
+
+# Modifications made as part of the fparser project are distributed
+# under the following license:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+
+# 1. Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+
+# 2. Redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution.
+
+# 3. Neither the name of the copyright holder nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Module containing pytest tests for the PackratCache class and the
+clone_node function in utils.py."""
+
+import pytest
+from fparser.api import get_reader
+from fparser.two import Fortran2003
+from fparser.two.parser import ParserFactory
+from fparser.two.utils import (
+    PACKRAT_CACHE,
+    NoMatchError,
+    PackratCache,
+    clone_node,
+    walk,
+)
+
+CODE = """\
+subroutine test(a, b)
+  real :: a(10), b(10), x
+  integer :: i
+  x = (sin(a(i)) * b(i) + (sin(a(i)) * b(i) + a(i) / 2.0e0)) - sqrt(x)
+  call work(x, (sin(a(i)) * b(i) + a(i)), 'text')
+end subroutine test
+"""
+
+
+@pytest.fixture(name="packrat_parser")
+def packrat_parser_fixture():
+    """Create a Fortran 2003 parser that uses the packrat cache and disable
+    the cache again once the test is complete.
+
+    :returns: a Program class (not object) for use with the Fortran reader.
+    :rtype: :py:class:`fparser.two.Fortran2003.Program`
+
+    """
+    yield ParserFactory().create(std="f2003", packrat=True)
+    PACKRAT_CACHE.enable(False)
+
+
+def test_clone_node(f2003_create):
+    """Test that clone_node duplicates a node and its descendants and sets
+    their parents correctly."""
+    expr = Fortran2003.Expr("a + b(i) * 2")
+    expr.parent = "some parent"
+    new_expr = clone_node(expr)
+    assert new_expr is not expr
+    assert isinstance(new_expr, Fortran2003.Level_2_Expr)
+    assert str(new_expr) == str(expr)
+    assert new_expr.parent is None
+    old_nodes = walk(expr)
+    new_nodes = walk(new_expr)
+    assert len(old_nodes) == len(new_nodes)
+    for old, new in zip(old_nodes, new_nodes):
+        assert type(old) is type(new)
+        if isinstance(new, Fortran2003.Base):
+            assert old is not new
+            for child in new.children:
+                if isinstance(child, Fortran2003.Base):
+                    assert child.parent is new
+
+
+def test_packrat_enable():
+    """Test the enable method of PackratCache."""
+    cache = PackratCache(maxsize=5)
+    assert not cache.enabled
+    assert cache.maxsize == 5
+    cache.enable(maxsize=10)
+    assert cache.enabled
+    assert cache.maxsize == 10
+    cache.enable(False)
+    assert not cache.enabled
+    assert cache.maxsize == 10
+    with pytest.raises(ValueError) as err:
+        cache.enable(maxsize=0)
+    assert (
+        "The maximum size of the packrat cache must be a positive integer "
+        "but got '0'" in str(err.value)
+    )
+
+
+def test_packrat_parse(packrat_parser):
+    """Test that parsing with the packrat cache enabled gives the same
+    parse tree as parsing without it and that the cache is used."""
+    PACKRAT_CACHE.hits = 0
+    tree = packrat_parser(get_reader(CODE))
+    assert PACKRAT_CACHE.hits > 0
+    PACKRAT_CACHE.enable(False)
+    assert repr(tree) == repr(packrat_parser(get_reader(CODE)))
+    # No node must appear more than once in the tree and the parent
+    # information must be correct.
+    nodes = [node for node in walk(tree) if isinstance(node, Fortran2003.Base)]
+    assert len(nodes) == len(set(id(node) for node in nodes))
+    for node in nodes:
+        for child in node.children:
+            if isinstance(child, Fortran2003.Base):
+                assert child.parent is node
+
+
+def test_packrat_string_match(packrat_parser):
+    """Test the memoization of matches performed directly on a string."""
+    expr = Fortran2003.Expr("a(i) + a(i) + a(i)")
+    parts = walk(expr, Fortran2003.Part_Ref)
+    assert len(parts) == 3
+    assert len(set(id(part) for part in parts)) == 3
+    # The entries are kept until the next top-level match.
+    assert len(PACKRAT_CACHE) > 0
+    with pytest.raises(NoMatchError) as err:
+        Fortran2003.Name("a + b")
+    assert "Name: 'a + b'" in str(err.value)
+    # Only the failed match of Name should now be cached.
+    assert len(PACKRAT_CACHE) == 1
+    PACKRAT_CACHE.hits = 0
+    # Force a lookup of the stored NoMatchError outcome.
+    # pylint: disable=protected-access
+    PACKRAT_CACHE._depth = 1
+    with pytest.raises(NoMatchError) as err:
+        Fortran2003.Name("a + b")
+    PACKRAT_CACHE._depth = 0
+    assert "Name: 'a + b'" in str(err.value)
+    assert PACKRAT_CACHE.hits == 1
+
+
+def test_packrat_bounded(packrat_parser):
+    """Test that the number of entries in the cache is bounded."""
+    PACKRAT_CACHE.enable(maxsize=4)
+    tree = packrat_parser(get_reader(CODE))
+    assert len(PACKRAT_CACHE) <= 4
+    PACKRAT_CACHE.enable(False)
+    assert repr(tree) == repr(packrat_parser(get_reader(CODE)))
+
+
+def test_packrat_modified_match(packrat_parser):
+    """Test that a rule that modifies the result of a match does not change
+    the memoized node."""
+    # Keep the cache entries between the matches below, as happens when
+    # the matches are part of the same statement.
+    # pylint: disable=protected-access
+    PACKRAT_CACHE._depth = 1
+    try:
+        spec_list = Fortran2003.Io_Control_Spec_List("10, *")
+        assert spec_list.items[0].items[0] is None
+        spec = Fortran2003.Io_Control_Spec("unit=10")
+    finally:
+        PACKRAT_CACHE._depth = 0
+    assert spec.items[0] == "UNIT"
@@ -36,7 +36,7 @@
 utils.py"""
 
 import pytest
-from fparser.two.utils import STRINGBase, InternalError
+from fparser.two.utils import STRINGBase, StringSet, InternalError
 
 
 def test_string():
@@ -139,3 +139,45 @@ def test_not_string():
     with pytest.raises(InternalError) as excinfo:
         _ = STRINGBase.match("hello", 123)
     assert "Supplied string should be of type str" in str(excinfo.value)
+
+
+def test_string_set():
+    """Test the STRINGbase match method with a StringSet, on its own and
+    within a list."""
+    pattern = StringSet(["HELLO", "WORLD"])
+    for my_input in ["hello", "HeLlO", "WORLD"]:
+        result = STRINGBase.match(pattern, my_input)
+        assert result == (my_input.upper(),)
+    assert STRINGBase.match(pattern, "hello world") is None
+    assert STRINGBase.match(["BYE", pattern], "world") == ("WORLD",)
+    assert STRINGBase.match(("BYE", [pattern]), "bye") == ("BYE",)
+    assert STRINGBase.match(["BYE", pattern], "other") is None
+
+
+def test_string_set_class():
+    """Test the StringSet class."""
+    string_set = StringSet(("B", "A", "B"))
+    assert len(string_set) == 2
+    assert list(string_set) == ["A", "B"]
+    assert "A" in string_set
+    assert "C" not in string_set
+    assert string_set.match("A")
+    assert not string_set.match("a")
+    assert repr(string_set) == "StringSet(['A', 'B'])"
+    with pytest.raises(InternalError) as excinfo:
+        _ = StringSet(["A", 1])
+    assert "A StringSet can only contain strings but found <class 'int'>" in str(
+        excinfo.value
+    )
+
+
+def test_upper_changes_length():
+    """Test that a string that changes length when cast to upper case does
+    not match a literal string (as before the string was only cast to upper
+    case once) but may still match a regular expression."""
+    import re
+
+    assert "ß".upper() == "SS"
+    assert STRINGBase.match("SS", "ß") is None
+    assert STRINGBase.match(StringSet(["SS"]), "ß") is None
+    assert STRINGBase.match(["SS", re.compile("S+")], "ß") == ("SS",)
@@ -36,7 +36,7 @@
 
 import pytest
 from fparser.api import get_reader
-from fparser.two.utils import walk
+from fparser.two.utils import NodeIndex, iter_walk, walk
 from fparser.two import Fortran2003
 from fparser.common.readfortran import FortranStringReader
 from fparser.two.parser import ParserFactory
@@ -124,3 +124,76 @@ end program test
     assert len(allNames) == 8
     identifierSet = set(map(lambda x: x.tostr(), allNames))
     assert identifierSet == expected
+
+
+@pytest.mark.usefixtures("f2003_create")
+def test_iter_walk():
+    """Test that iter_walk() lazily produces the same nodes as walk() and
+    supports pruning and limiting the depth of the walk."""
+    reader = get_reader(
+        "program hello\n"
+        "if (.true.) then\n"
+        "  write(*,*) 'hello'\n"
+        "end if\n"
+        "write(*,*) 'goodbye'\n"
+        "end program hello\n"
+    )
+    main = Fortran2003.Program(reader)
+    assert list(iter_walk(main)) == walk(main)
+    writes = iter_walk(main, Fortran2003.Write_Stmt)
+    assert "hello" in str(next(writes))
+    assert "goodbye" in str(next(writes))
+    assert next(writes, None) is None
+    # Prune the walk at the If construct.
+    writes = list(
+        iter_walk(
+            main,
+            (Fortran2003.If_Construct, Fortran2003.Write_Stmt),
+            prune=lambda node: isinstance(node, Fortran2003.If_Construct),
+        )
+    )
+    assert isinstance(writes[0], Fortran2003.If_Construct)
+    assert len(writes) == 2
+    assert "goodbye" in str(writes[1])
+    # Limit the depth of the walk.
+    assert list(iter_walk(main, max_depth=0)) == [main]
+    nodes = list(iter_walk(main, max_depth=2))
+    assert isinstance(nodes[1], Fortran2003.Main_Program)
+    assert isinstance(nodes[2], Fortran2003.Program_Stmt)
+    assert not list(iter_walk(main, Fortran2003.Write_Stmt, max_depth=2))
+    assert len(list(iter_walk(main, Fortran2003.Write_Stmt, max_depth=3))) == 1
+    assert len(list(iter_walk(main, Fortran2003.Write_Stmt, max_depth=4))) == 2
+
+
+def test_node_index():
+    """Test that a NodeIndex returns the same nodes as walk() for
+    repeated queries."""
+    reader = FortranStringReader(
+        "program test\n"
+        "  integer :: i, a(10)\n"
+        "  do i = 1, 10\n"
+        "    a(i) = i\n"
+        "    call work(a(i))\n"
+        "  end do\n"
+        "  call work(a(1))\n"
+        "end program test\n"
+    )
+    parse_tree = ParserFactory().create(std="f2008")(reader)
+    index = NodeIndex(parse_tree)
+    assert len(index) == len(walk(parse_tree))
+    assert index.walk() == walk(parse_tree)
+    for types in [
+        Name,
+        Fortran2003.Call_Stmt,
+        Fortran2003.StmtBase,
+        (Name, Fortran2003.Call_Stmt),
+        Fortran2003.Execution_Part,
+        Fortran2003.Write_Stmt,
+    ]:
+        expected = walk(parse_tree, types)
+        assert index.walk(types) == expected
+        # The result of a repeated query is a new list.
+        result = index.walk(types)
+        assert result == expected
+        result.append(None)
+        assert index.walk(types) == expected
@@ -68,10 +68,12 @@
 # Original author: Pearu Peterson <pearu@cens.ioc.ee>
 # First version created: Oct 2006
 
+import itertools
 import re
 from fparser.common import readfortran
 from fparser.common.splitline import string_replace_map
 from fparser.common.readfortran import FortranReaderBase
+from fparser.two.context import THREAD_STATE
 from fparser.two.symbol_table import SYMBOL_TABLES
 
 # A list of supported extensions to the standard(s)
@@ -341,9 +343,6 @@ class DynamicImport:
             End_Do_Stmt,
             Label_Do_Stmt,
         )
-        from fparser.two.Fortran2008.label_do_stmt_r816 import (
-            Label_Do_Stmt as Label_Do_Stmt_2008,
-        )
 
         from fparser.two import C99Preprocessor
 
@@ -368,7 +367,6 @@ class DynamicImport:
         DynamicImport.End_Do = End_Do
         DynamicImport.End_Do_Stmt = End_Do_Stmt
         DynamicImport.Label_Do_Stmt = Label_Do_Stmt
-        DynamicImport.Label_Do_Stmt_2008 = Label_Do_Stmt_2008
 
 
 di = DynamicImport()
@@ -395,6 +393,284 @@ def _set_parent(parent_node, items):
                 _set_parent(parent_node, item)
 
 
+def _clone_children(items):
+    """Recursively duplicate the supplied list or tuple of children, cloning
+    any elements that are a sub-class of Base.
+
+    :param items: the children to duplicate.
+    :type items: list or tuple of :py:class:`fparser.two.utils.Base` \
+                 or `str` or `list` or `tuple` or NoneType.
+
+    :returns: a new list or tuple containing the duplicated children.
+    :rtype: list or tuple
+
+    """
+    new_items = []
+    for item in items:
+        if isinstance(item, Base):
+            item = clone_node(item)
+        elif isinstance(item, (list, tuple)):
+            item = _clone_children(item)
+        new_items.append(item)
+    if isinstance(items, tuple):
+        return tuple(new_items)
+    return new_items
+
+
+def clone_node(node):
+    """Create a copy of the supplied parse-tree node in which all descendant
+    nodes are also duplicated. Unlike `copy.deepcopy`, the ancestors of the
+    node are not copied: the parent of the new node is None and the parent of
+    each of its descendants is the corresponding new node. Any other
+    attributes (e.g. `string` or `item`) are shared with the original.
+
+    :param node: the node to copy.
+    :type node: :py:class:`fparser.two.utils.Base`
+
+    :returns: the new node.
+    :rtype: :py:class:`fparser.two.utils.Base`
+
+    """
+    new_node = object.__new__(type(node))
+    new_node.__dict__.update(node.__dict__)
+    new_node.parent = None
+    for name in ("items", "content"):
+        children = node.__dict__.get(name)
+        if isinstance(children, (list, tuple)):
+            children = _clone_children(children)
+            setattr(new_node, name, children)
+            _set_parent(new_node, children)
+    return new_node
+
+
+class PackratCache:
+    """Memoizes the outcome of matching a string against a rule class so
+    that the same (class, text) pair is only ever matched once. Both
+    successful matches and NoMatchError outcomes are stored.
+
+    Only matches that are started afresh (i.e. are not part of the loop
+    over the subclasses of another rule) are memoized, as only these are
+    independent of the rules that are currently being matched. A node
+    returned from the cache is a copy of the stored one so that no node can
+    appear more than once in a parse tree.
+
+    Since the outcome of a match may depend on the symbol table of the
+    current scoping region, the lifetime of the stored entries is limited
+    to the matching of a single statement from a reader or to a single,
+    top-level match of a string. The cache is also bounded in size: once
+    `maxsize` entries are stored, the oldest ones are discarded.
+
+    :param int maxsize: the maximum number of entries to store.
+
+    """
+
+    # Marks a stored NoMatchError outcome.
+    _NO_MATCH = object()
+
+    def __init__(self, maxsize=10000):
+        self.enabled = False
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        # The reader item (statement) for which the cache was populated.
+        self._item = None
+        # The number of matches currently in progress via this cache.
+        self._depth = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def enable(self, value=True, maxsize=None):
+        """
+        Sets whether or not the cache is used while parsing. The cache is
+        cleared whenever this method is called.
+
+        :param bool value: whether or not the cache is enabled.
+        :param maxsize: the new maximum number of entries to store (the \
+                        current value is kept if this is None).
+        :type maxsize: Optional[int]
+
+        :raises ValueError: if maxsize is not a positive integer.
+
+        """
+        if maxsize is not None:
+            if not isinstance(maxsize, int) or maxsize < 1:
+                raise ValueError(
+                    f"The maximum size of the packrat cache must be a "
+                    f"positive integer but got '{maxsize}'"
+                )
+            self.maxsize = maxsize
+        self.enabled = value
+        self.clear()
+
+    def clear(self):
+        """Discards all stored entries."""
+        self._entries = {}
+        self._item = None
+        self._depth = 0
+
+    def parse_line(self, item, cls, parent_cls):
+        """
+        Matches the supplied reader item against the supplied class. Any
+        existing entries are discarded if they were stored while matching a
+        different item.
+
+        :param item: the item to match.
+        :type item: :py:class:`fparser.common.readfortran.Line`
+        :param type cls: the class to match against.
+        :param parent_cls: the classes that are currently being matched.
+        :type parent_cls: List[type]
+
+        :returns: the matched node or None.
+        :rtype: Optional[:py:class:`fparser.two.utils.Base`]
+
+        """
+        if item is not self._item:
+            self._entries = {}
+            self._item = item
+        self._depth += 1
+        try:
+            return item.parse_line(cls, parent_cls)
+        finally:
+            self._depth -= 1
+
+    def match(self, cls, string):
+        """
+        Returns the result of matching the supplied string against the
+        supplied class, either from the cache or by performing the match.
+
+        :param type cls: the class to match against.
+        :param str string: the text to match.
+
+        :returns: the matched node or None.
+        :rtype: Optional[:py:class:`fparser.two.utils.Base`]
+
+        :raises NoMatchError: if the string does not match the class.
+
+        """
+        if not self._depth:
+            # This is a new, top-level match of a string rather than part of
+            # the matching of a statement.
+            self._entries = {}
+            self._item = None
+        key = (cls, string)
+        try:
+            result = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            if isinstance(result, tuple) and result[0] is self._NO_MATCH:
+                raise NoMatchError(result[1])
+            if isinstance(result, Base):
+                return clone_node(result)
+            return result
+        self.misses += 1
+        self._depth += 1
+        try:
+            result = Base.__new__(cls, string, parent_cls=[cls])
+        except NoMatchError as err:
+            self._store(key, (self._NO_MATCH, str(err)))
+            raise
+        finally:
+            self._depth -= 1
+        self._store(key, result)
+        return result
+
+    def _store(self, key, value):
+        """
+        Adds an entry to the cache, discarding the oldest entry if the cache
+        is full.
+
+        :param key: the key for the new entry.
+        :type key: Tuple[type, str]
+        :param value: the value to store.
+        :type value: Any
+
+        """
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = value
+
+
+#: The packrat cache used by the parser. It is disabled by default and is
+#: enabled by passing `packrat=True` to `ParserFactory.create()`.
+PACKRAT_CACHE = PackratCache()
+
+
+class KeywordIndex:
+    """Maps the leading keyword of a statement to those subclasses of a rule
+    that could possibly match it. A subclass either has a tuple of keyword
+    prefixes, one of which the leading word of any statement that it matches
+    must begin with (e.g. 'END' for 'ENDDO' or 'END DO'), or it has None,
+    in which case it must always be tried (e.g. assignments). The subclasses
+    that are returned are always in their original order so the outcome of
+    matching them in turn is unchanged.
+
+    :param subclasses: the subclasses of the rule, in the order in which \
+        they are to be matched.
+    :type subclasses: List[type]
+    :param keywords: the keyword prefixes of each subclass, indexed by \
+        class name. A subclass that is not present is always tried.
+    :type keywords: Dict[str, Tuple[str, ...]]
+
+    """
+
+    # The leading word of a statement. A word followed by a single colon is
+    # a construct name rather than a keyword.
+    _word_pattern = re.compile(r"\s*([A-Z][A-Z0-9_]*)\s*(:(?!:))?", re.I)
+
+    def __init__(self, subclasses, keywords):
+        self.subclasses = subclasses
+        self._keywords = [
+            (subcls, keywords.get(subcls.__name__)) for subcls in subclasses
+        ]
+        # The subclasses to try, indexed by the (upper-case) leading word.
+        self._candidates = {}
+
+    def candidates(self, string):
+        """
+        Returns the subclasses that could match the supplied string or, for
+        a reader, the next item in it. This is all of the subclasses if the
+        leading keyword cannot be determined.
+
+        :param string: the text or reader to be matched.
+        :type string: str | :py:class:`fparser.common.readfortran.FortranReaderBase`
+
+        :returns: the subclasses to try, in order.
+        :rtype: List[type]
+
+        """
+        if isinstance(string, FortranReaderBase):
+            # Peek at the next item. Any label or construct name has
+            # already been removed from its line by the reader.
+            item = string.get_item()
+            if item is None:
+                return self.subclasses
+            string.put_item(item)
+            if not isinstance(item, readfortran.Line):
+                return self.subclasses
+            string = item.line
+        elif not isinstance(string, str):
+            return self.subclasses
+        match = self._word_pattern.match(string)
+        if not match or match.group(2):
+            return self.subclasses
+        word = match.group(1).upper()
+        try:
+            return self._candidates[word]
+        except KeyError:
+            pass
+        result = [
+            subcls
+            for subcls, prefixes in self._keywords
+            if prefixes is None or word.startswith(prefixes)
+        ]
+        self._candidates[word] = result
+        return result
+
+
 class Base(ComparableMixin):
     """Base class for Fortran 2003 syntax rules.
 
@@ -416,7 +692,12 @@ class Base(ComparableMixin):
     # of the fparser.two.parser module. That code uses the entries in the
     # 'subclass_names' list belonging to each class defined in this module.
     # See Issue #191 for a discussion of a way of getting rid of this state.
+    # It is not used when a parser context (which has its own dict) is
+    # active (see fparser.two.context).
     subclasses = {}
+    # Indexes the entries in 'subclasses' that are lists of statements by
+    # their leading keyword. Also populated in the fparser.two.parser module.
+    subclass_index = {}
 
     def __init__(self, string, parent_cls=None):
         # pylint:disable=unused-argument
@@ -424,7 +705,19 @@ class Base(ComparableMixin):
 
     @show_result
     def __new__(cls, string, parent_cls=None, _deepcopy=False):
+        if _deepcopy:
+            # If this is part of a deep-copy operation (and string is None), simply call
+            # the super method without string
+            return super().__new__(cls)
+
+        # The parser context (if any) that is active on this thread.
+        context = THREAD_STATE.context
+
         if parent_cls is None:
+            if isinstance(string, str):
+                packrat = PACKRAT_CACHE if context is None else context.packrat_cache
+                if packrat.enabled:
+                    return packrat.match(cls, string)
             parent_cls = [cls]
         elif cls not in parent_cls:
             parent_cls.append(cls)
@@ -432,11 +725,6 @@ class Base(ComparableMixin):
         # Get the class' match method if it has one
         match = getattr(cls, "match", None)
 
-        if _deepcopy:
-            # If this is part of a deep-copy operation (and string is None), simply call
-            # the super method without string
-            return super().__new__(cls)
-
         if (
             isinstance(string, FortranReaderBase)
             and match
@@ -451,8 +739,12 @@ class Base(ComparableMixin):
                 # those in Comment.__new__)
                 obj = None
             else:
+                packrat = PACKRAT_CACHE if context is None else context.packrat_cache
                 try:
-                    obj = item.parse_line(cls, parent_cls)
+                    if packrat.enabled:
+                        obj = packrat.parse_line(item, cls, parent_cls)
+                    else:
+                        obj = item.parse_line(cls, parent_cls)
                 except NoMatchError:
                     obj = None
             if obj is None:
@@ -487,8 +779,20 @@ class Base(ComparableMixin):
         if result is None:
             # Loop over the possible sub-classes of this class and
             # check for matches. This uses the list of subclasses calculated
-            # at runtime in fparser.two.parser.
-            for subcls in Base.subclasses.get(cls.__name__, []):
+            # at runtime in fparser.two.parser. Where possible, the list is
+            # restricted to those subclasses that could match the leading
+            # keyword of the statement.
+            if context is None:
+                index = Base.subclass_index.get(cls.__name__)
+            else:
+                index = context.subclass_index.get(cls.__name__)
+            if index is not None:
+                subclasses = index.candidates(string)
+            elif context is None:
+                subclasses = Base.subclasses.get(cls.__name__, [])
+            else:
+                subclasses = context.subclasses.get(cls.__name__, [])
+            for subcls in subclasses:
                 if subcls in parent_cls:  # avoid recursion 2.
                     continue
                 try:
@@ -502,10 +806,7 @@ class Base(ComparableMixin):
         # If we get to here then we've failed to match the current line
         if isinstance(string, FortranReaderBase):
             freader: FortranReaderBase = string
-            if not freader.source_lines or all(
-                (line.strip() == "" or freader.is_comment_line(line))
-                for line in freader.source_lines
-            ):
+            if freader.only_comments:
                 # There are no lines in the input or all lines up to this one
                 # are empty, comments or contain only white space. This
                 # is typically accepted by fortran compilers so we
@@ -727,7 +1028,9 @@ class BlockBase(Base):
         classes = subclasses + comments
         if endcls is not None:
             classes += [endcls]
-            endcls_all = tuple([endcls] + endcls.subclasses[endcls.__name__])
+            context = THREAD_STATE.context
+            subclasses_of = Base.subclasses if context is None else context.subclasses
+            endcls_all = tuple([endcls] + subclasses_of[endcls.__name__])
         # Preprocessor directives are always valid sub-classes. While
         # `match_cpp_directive` is a function, it behaves correctly here
         # returning either None or an instance, so we can just add it to
@@ -780,7 +1083,9 @@ class BlockBase(Base):
                 # in case of non-blocked loops (since the parser won't look
                 # ahead till the end of the file).
                 if (
-                    startcls in (di.Label_Do_Stmt, di.Label_Do_Stmt_2008)
+                    # (This includes the Fortran2008 Label_Do_Stmt.)
+                    startcls is not None
+                    and issubclass(startcls, di.Label_Do_Stmt)
                     and endcls is di.End_Do
                     and hasattr(obj, "get_end_label")
                     and (content[start_idx].get_start_label() == obj.get_end_label())
@@ -919,6 +1224,12 @@ class BlockBase(Base):
                                 end_stmt.get_name(),
                             )
                         )
+        # The statements in this block have now been accepted so the
+        # outcomes of the matches cached in their lines are not needed.
+        for obj in content:
+            item = getattr(obj, "item", None)
+            if isinstance(item, readfortran.Line):
+                item.release_parse_cache()
         return (content,)
 
     def init(self, content):
@@ -1584,6 +1895,55 @@ class StringBase(Base):
         return self.string
 
 
+class StringSet:
+    """
+    Matches a string against a set of literal (upper-case) strings by
+    looking it up in a hash set rather than comparing it with each string
+    in turn. An instance can be supplied as the pattern to
+    `STRINGBase.match` in place of a list or tuple of strings, e.g. for
+    the names of the intrinsic functions. It should be created once (e.g.
+    as a class attribute) rather than every time that it is used.
+
+    :param strings: the strings to match.
+    :type strings: Iterable[str]
+
+    :raises InternalError: if any of the strings is not a str.
+
+    """
+
+    __slots__ = ("_strings",)
+
+    def __init__(self, strings):
+        self._strings = frozenset(strings)
+        for string in self._strings:
+            if not isinstance(string, str):
+                raise InternalError(
+                    f"A StringSet can only contain strings but found {type(string)}"
+                )
+
+    def match(self, string):
+        """
+        :param str string: the string to match.
+
+        :returns: whether the string is one of the strings in this set.
+        :rtype: bool
+
+        """
+        return string in self._strings
+
+    def __contains__(self, string):
+        return string in self._strings
+
+    def __iter__(self):
+        return iter(sorted(self._strings))
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __repr__(self):
+        return f"StringSet({sorted(self._strings)!r})"
+
+
 class STRINGBase(StringBase):
     """STRINGBase matches an upper case version of the input string with
     another a pattern (typically taken from pattern_tools.py) and
@@ -1597,16 +1957,18 @@ class STRINGBase(StringBase):
         to upper case before performing a match and, if there is a
         match, returns the string in upper case.
 
-        The pattern can be a regular expression, a string, a list or a
-        tuple. If the input pattern is a regular expression or a
-        string, a direct equivalence is performed. If the input pattern is a
-        list or a tuple, then all of the contents of the list
+        The pattern can be a regular expression, a string, a `StringSet`,
+        a list or a tuple. If the input pattern is a regular expression or
+        a string, a direct equivalence is performed. If the input pattern
+        is a `StringSet`, the string is looked up in the set. If the input
+        pattern is a list or a tuple, then all of the contents of the list
         or tuple are searched for a match (by recursing). The list or tuple may
         contain regular expressions, strings, lists or tuples. This
         functionality can be used to recurse down a tree of lists and
         or tuples until regular expressions or strings are found (at
-        the leaves of the tree) on which to match. The patterns used
-        to match in fparser can be found in patterns_tools.py. These
+        the leaves of the tree) on which to match. The string is only cast
+        to upper case once, however many patterns are tried. The patterns
+        used to match in fparser can be found in patterns_tools.py. These
         make use of the pattern class, whose match method behaves like
         a regular expression. For example:
 
@@ -1614,8 +1976,13 @@ class STRINGBase(StringBase):
         pattern = pattern_tools.intrinsic_type_name
         result = STRINGBase.match(pattern, "logical")
 
+        A list or tuple of many literal strings is better supplied as a
+        `StringSet`, which matches in a time that does not depend upon
+        the number of strings.
+
         :param pattern: the pattern to match
-        :type pattern: `list`, `tuple`, `str` or an `re` expression
+        :type pattern: `list`, `tuple`, `str`, \
+            :py:class:`fparser.two.utils.StringSet` or an `re` expression
         :param str string: the string to match with the pattern
         :return: None if there is no match, or a tuple containing the \
         matched string in upper case.
@@ -1628,26 +1995,47 @@ class STRINGBase(StringBase):
             raise InternalError(
                 f"Supplied string should be of type str, but found {type(string)}"
             )
-        if isinstance(my_pattern, (list, tuple)):
-            for child in my_pattern:
-                result = STRINGBase.match(child, string)
-                if result:
-                    return result
-            return None
         string_upper = string.upper()
+        # A literal string can only match if casting to upper case does not
+        # change the length of the string (which it can, e.g. for 'ß').
+        literal = len(string_upper) == len(string)
+        if STRINGBase._match_upper(my_pattern, string_upper, literal):
+            return (string_upper,)
+        return None
+
+    @staticmethod
+    def _match_upper(my_pattern, string_upper, literal):
+        """Matches an input string that has already been cast to upper case
+        with a specified pattern (see `match`).
+
+        :param pattern: the pattern to match
+        :type pattern: `list`, `tuple`, `str`, \
+            :py:class:`fparser.two.utils.StringSet` or an `re` expression
+        :param str string_upper: the string to match, in upper case.
+        :param bool literal: whether the string may match literal strings.
+
+        :returns: whether there is a match.
+        :rtype: bool
+
+        :raises InternalError: if the pattern is not of a supported type.
+
+        """
         if isinstance(my_pattern, str):
-            if len(my_pattern) == len(string) and my_pattern == string_upper:
-                return (string_upper,)
-            return None
+            return literal and my_pattern == string_upper
+        if isinstance(my_pattern, StringSet):
+            return literal and string_upper in my_pattern
+        if isinstance(my_pattern, (list, tuple)):
+            for child in my_pattern:
+                if STRINGBase._match_upper(child, string_upper, literal):
+                    return True
+            return False
         try:
-            if my_pattern.match(string_upper):
-                return (string_upper,)
+            return bool(my_pattern.match(string_upper))
         except AttributeError:
             raise InternalError(
                 f"Supplied pattern should be a list, tuple, str or regular "
                 f"expression but found {type(my_pattern)}"
             )
-        return None
 
 
 class StmtBase(Base):
@@ -1987,10 +2375,95 @@ class Type_Declaration_StmtBase(StmtBase):
         return f"{self.items[0]}, {self.items[1]} :: {self.items[2]}"
 
 
+def _walk_with_depth(node_list, prune=None, max_depth=None):
+    """
+    Generator that walks down the parse tree produced by fparser2 in the
+    same order as `walk`, yielding each node together with its depth.
+
+    :param node_list: node or list of nodes from which to walk.
+    :type node_list: (list of) :py:class:fparser.two.utils.Base
+    :param prune: optional function that is called with each node and \
+        returns whether or not to skip the descendants of that node.
+    :type prune: Optional[Callable[[Any], bool]]
+    :param max_depth: optional maximum depth (with the supplied nodes at \
+        depth 0) below which the tree is not walked.
+    :type max_depth: Optional[int]
+
+    :returns: the nodes and their depths.
+    :rtype: Iterator[Tuple[Any, int]]
+
+    """
+    if not isinstance(node_list, (list, tuple)):
+        node_list = [node_list]
+    # A stack of iterators over the siblings at each depth, which avoids
+    # both recursion and the copying of lists of nodes.
+    stack = [iter(node_list)]
+    while stack:
+        depth = len(stack) - 1
+        for child in stack[-1]:
+            yield child, depth
+            if max_depth is not None and depth >= max_depth:
+                continue
+            if isinstance(child, Base):
+                if prune is None or not prune(child):
+                    stack.append(iter(child.children))
+                    break
+            elif isinstance(child, tuple):
+                if prune is None or not prune(child):
+                    # Any lists or tuples within the tuple are walked as if
+                    # their contents were part of the tuple.
+                    stack.append(
+                        itertools.chain.from_iterable(
+                            (
+                                component
+                                if isinstance(component, (list, tuple))
+                                else (component,)
+                            )
+                            for component in child
+                        )
+                    )
+                    break
+        else:
+            stack.pop()
+
+
+def iter_walk(node_list, types=None, prune=None, max_depth=None):
+    """
+    Generator that walks down the parse tree produced by fparser2, lazily
+    yielding the nodes with the specified type(s) in the same order as
+    `walk`. Since nothing is done until the next node is requested, the
+    walk stops as soon as the caller stops iterating, e.g.
+
+    >>> first_call = next(iter_walk(tree, Call_Stmt), None)
+
+    :param node_list: node or list of nodes from which to walk.
+    :type node_list: (list of) :py:class:fparser.two.utils.Base
+    :param types: type or tuple of types of Node to return. (Default is to \
+                  return all nodes.)
+    :type types: type or tuple of types
+    :param prune: optional function that is called with each node and \
+        returns whether or not to skip the descendants of that node (the \
+        node itself is still yielded if it has one of the types).
+    :type prune: Optional[Callable[[Any], bool]]
+    :param max_depth: optional maximum depth (with the supplied nodes at \
+        depth 0) below which the tree is not walked.
+    :type max_depth: Optional[int]
+
+    :returns: the nodes with the specified type(s).
+    :rtype: Iterator[:py:class:`fparser.two.utils.Base`]
+
+    """
+    for child, _ in _walk_with_depth(node_list, prune, max_depth):
+        if types is None or isinstance(child, types):
+            yield child
+
+
 def walk(node_list, types=None, indent=0, debug=False):
     """
     Walk down the parse tree produced by fparser2.  Returns a list of all
-    nodes with the specified type(s).
+    nodes with the specified type(s). See `iter_walk` for a version that
+    produces the nodes lazily and `NodeIndex` for repeatedly finding the
+    nodes of a particular type in the same tree.
 
     :param node_list: node or list of nodes from which to walk.
     :type node_list: (list of) :py:class:fparser.two.utils.Base
@@ -2003,29 +2476,83 @@ def walk(node_list, types=None, indent=0, debug=False):
     :returns: a list of nodes
     :rtype: `list` of :py:class:`fparser.two.utils.Base`
     """
+    if not debug:
+        return list(iter_walk(node_list, types))
     local_list = []
-
-    if not isinstance(node_list, (list, tuple)):
-        node_list = [node_list]
-
-    for child in node_list:
-        if debug:
-            if isinstance(child, str):
-                print(indent * "  " + "child type = ", type(child), repr(child))
-            else:
-                print(indent * "  " + "child type = ", type(child))
+    for child, depth in _walk_with_depth(node_list):
+        if isinstance(child, str):
+            print((indent + depth) * "  " + "child type = ", type(child), repr(child))
+        else:
+            print((indent + depth) * "  " + "child type = ", type(child))
         if types is None or isinstance(child, types):
             local_list.append(child)
-        # Recurse down
-        if isinstance(child, Base):
-            local_list += walk(child.children, types, indent + 1, debug)
-        elif isinstance(child, tuple):
-            for component in child:
-                local_list += walk(component, types, indent + 1, debug)
-
     return local_list
 
 
+class NodeIndex:
+    """
+    Indexes the nodes of a parse tree by their class in a single walk of
+    the tree so that the nodes of particular type(s) can then be found
+    repeatedly without walking the tree again, e.g.
+
+    >>> index = NodeIndex(tree)
+    >>> calls = index.walk(Call_Stmt)
+    >>> assignments = index.walk(Assignment_Stmt)
+
+    The index is not updated if the tree is subsequently modified, in
+    which case a new index must be created.
+
+    :param node_list: node or list of nodes from which to walk.
+    :type node_list: (list of) :py:class:fparser.two.utils.Base
+
+    """
+
+    def __init__(self, node_list):
+        # All of the nodes in the order that `walk` returns them.
+        self._nodes = []
+        # The positions (in _nodes) of the nodes of each class.
+        self._positions = {}
+        for position, child in enumerate(iter_walk(node_list)):
+            self._nodes.append(child)
+            self._positions.setdefault(type(child), []).append(position)
+        # The results of previous queries, keyed on the requested types.
+        self._results = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def walk(self, types=None):
+        """
+        :param types: type or tuple of types of Node to return. (Default \
+                      is to return all nodes.)
+        :type types: type or tuple of types
+
+        :returns: the nodes in the tree with the specified type(s), in \
+            the same order as `walk` returns them.
+        :rtype: `list` of :py:class:`fparser.two.utils.Base`
+
+        """
+        if types is None:
+            return self._nodes[:]
+        try:
+            result = self._results[types]
+        except KeyError:
+            lists = [
+                positions
+                for cls, positions in self._positions.items()
+                if issubclass(cls, types)
+            ]
+            if len(lists) == 1:
+                result = [self._nodes[position] for position in lists[0]]
+            else:
+                result = [
+                    self._nodes[position]
+                    for position in sorted(itertools.chain.from_iterable(lists))
+                ]
+            self._results[types] = result
+        return result[:]
+
+
 def get_child(node, node_type):
     """
     Searches for the first, immediate child of the supplied node that is of
@@ -2044,3 +2571,83 @@ def get_child(node, node_type):
         if isinstance(child, node_type):
             return child
     return None
+
+
+class CompactItem:
+    """
+    Stands in for the :py:class:`fparser.common.readfortran.Line` of a
+    node in a parse tree that has been compacted with `compact_tree`. Only
+    the attributes that are used once parsing is complete are kept.
+
+    :param label: the label of the statement (if any).
+    :type label: Optional[int]
+    :param name: the construct name of the statement (if any).
+    :type name: Optional[str]
+    :param span: the first and last line numbers of the statement.
+    :type span: Tuple[int, int]
+
+    """
+
+    __slots__ = ("label", "name", "span")
+
+    def __init__(self, label, name, span):
+        self.label = label
+        self.name = name
+        self.span = span
+
+    def __repr__(self):
+        return f"CompactItem({self.label!r}, {self.name!r}, {self.span!r})"
+
+
+def compact_tree(node_list, drop_strings=False, drop_items=False):
+    """
+    Releases the memory that a parse tree retains only because it was
+    needed while parsing, so that large trees can be kept for analysis.
+    The cache of matches held by each source line (`Line.parse_cache`) is
+    always cleared. Optionally, the original string (or reader) given to
+    each node and the source lines themselves can also be discarded. The
+    Fortran generated from the tree is unchanged.
+
+    :param node_list: node or list of nodes to compact.
+    :type node_list: (list of) :py:class:`fparser.two.utils.Base`
+    :param bool drop_strings: whether or not to discard the `string` \
+        attribute of nodes that do not need it to generate Fortran (i.e. \
+        all but :py:class:`fparser.two.utils.StringBase` nodes). Block nodes \
+        hold the reader in this attribute so this also releases the reader \
+        and the source it holds.
+    :param bool drop_items: whether or not to replace the source line \
+        (`item`) of each statement with a :py:class:`CompactItem` holding \
+        just its label, construct name and line numbers.
+
+    :returns: the number of nodes that were visited.
+    :rtype: int
+
+    """
+    if isinstance(node_list, (list, tuple)):
+        stack = list(node_list)
+    else:
+        stack = [node_list]
+    count = 0
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+            continue
+        if not isinstance(node, Base):
+            continue
+        count += 1
+        item = getattr(node, "item", None)
+        if isinstance(item, readfortran.Line):
+            item.release_parse_cache()
+            if drop_items:
+                node.item = CompactItem(item.label, item.name, item.span)
+        # Nodes are updated in place (rather than having attributes
+        # deleted) as this keeps their attribute storage compact.
+        if (
+            drop_strings
+            and not isinstance(node, StringBase)
+            and getattr(node, "string", None) is not None
+        ):
+            node.string = None
+        stack.extend(node.children)
+    return count